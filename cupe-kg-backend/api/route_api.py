@@ -2,6 +2,7 @@
 from flask import Blueprint, jsonify, request
 from services.route_service import RouteService
 from models.route import Route, RouteLocation
+from utils.geo import parse_search_area
 
 route_bp = Blueprint('routes', __name__, url_prefix='/api/routes')
 route_service = RouteService()
@@ -57,26 +58,18 @@ def get_nearby_attractions():
         return jsonify({'error': 'Missing latitude or longitude'}), 400
     
     try:
-        lat = float(lat)
-        lng = float(lng)
-    except ValueError:
-        return jsonify({'error': 'Invalid latitude or longitude'}), 400
+        lat, lng, radius_km = parse_search_area(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    # This would use a more sophisticated algorithm to find nearby attractions
-    # For now, we'll return a placeholder
+    nearby = route_service.get_nearby_historical_places({'lat': lat, 'lng': lng}, radius_km)
     return jsonify([
         {
-            'id': 'nearby1',
-            'name': 'Nearby Attraction 1',
-            'description': 'A nearby attraction',
-            'distance': 5.2,  # km
-            'coordinates': {'lat': lat + 0.05, 'lng': lng + 0.05}
-        },
-        {
-            'id': 'nearby2',
-            'name': 'Nearby Attraction 2',
-            'description': 'Another nearby attraction',
-            'distance': 8.7,  # km
-            'coordinates': {'lat': lat - 0.08, 'lng': lng - 0.03}
+            'id': place['location']['id'],
+            'name': place['location']['name'],
+            'description': place['location']['description'],
+            'distance': place['distance_km'],  # km
+            'coordinates': place['location']['coordinates']
         }
+        for place in nearby
     ])
\ No newline at end of file
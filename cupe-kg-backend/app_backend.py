@@ -1,11 +1,19 @@
 import datetime
 import time
 import re
+from itertools import islice
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 from services.kg_service import KnowledgeGraphService
+from services.async_kg_service import AsyncKnowledgeGraphService
 from services.route_service import RouteService
 from services.chatbot_service import ChatbotService
+from utils.http_cache import conditional_get
+from utils.compression import init_compression
+from utils.helpers import content_hash
+from utils.pagination import parse_page_args, paginate, encode_cursor
+from utils.geo import parse_search_area
+from models.location import Location
 from services.translation_service import translate_text, translate_dict, translate_list, get_cache_stats, SUPPORTED_LANGUAGES
 import uuid
 import os
@@ -42,13 +50,15 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=['X-Next-Cursor'])
+init_compression(app)
 
 # Initialize services
 try:
     use_placeholder = os.environ.get('USE_PLACEHOLDER', 'true').lower() == 'true'
     logger.info(f"Initializing services with use_placeholder={use_placeholder}")
     kg_service = KnowledgeGraphService(use_placeholder=use_placeholder)
+    async_kg_service = AsyncKnowledgeGraphService(kg_service)
     route_service = RouteService(kg_service)
     chatbot_service = ChatbotService(kg_service, route_service)
     logger.info("Services initialized successfully")
@@ -58,6 +68,31 @@ except Exception as e:
 
 active_sessions = {}
 
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+def wants_ndjson():
+    """Whether the client asked for newline-delimited JSON over a JSON array"""
+    return request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+def locations_response(locations, fields=None, next_offset=None):
+    """
+    Location list response built from each location's cached encoding, instead of jsonify.
+    With Accept: application/x-ndjson the body is streamed one location per line from any
+    iterable, so memory stays flat; otherwise it is a JSON array.
+    When there is a further page its cursor is sent in the X-Next-Cursor header.
+    """
+    if wants_ndjson():
+        def generate():
+            for location in locations:
+                yield location.to_json_bytes(fields) + b'\n'
+        response = app.response_class(generate(), mimetype=NDJSON_MIMETYPE)
+    else:
+        body = b'[' + b','.join(location.to_json_bytes(fields) for location in locations) + b']\n'
+        response = app.response_class(body, mimetype='application/json')
+    if next_offset is not None:
+        response.headers['X-Next-Cursor'] = encode_cursor(next_offset)
+    return response
+
 @app.route('/api/health')
 def health_check():
     return jsonify({
@@ -68,10 +103,24 @@ def health_check():
 
 # ------------------ Location Endpoints ------------------
 @app.route('/api/locations', methods=['GET'])
+@conditional_get(kg_service.get_dataset_version, vary=('Accept',))
 def get_locations():
     try:
-        locations = kg_service.get_all_locations()
-        return jsonify([loc.to_dict() for loc in locations])
+        offset, limit, fields = parse_page_args(request.args, Location.API_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        if wants_ndjson():
+            # Streamed, so whether another page follows is unknown; an empty page ends paging
+            locations = kg_service.iter_locations(offset, limit, fields)
+            return locations_response(locations, fields, offset + limit if limit else None)
+        
+        # Ask for one extra location to learn whether another page follows
+        locations = kg_service.get_locations_page(offset, limit + 1 if limit else None, fields)
+        next_offset = None
+        if limit and len(locations) > limit:
+            locations, next_offset = locations[:limit], offset + limit
+        return locations_response(locations, fields, next_offset)
     except Exception as e:
         logger.error(f"Error fetching locations: {e}")
         return jsonify({'error': 'Failed to fetch locations'}), 500
@@ -82,10 +131,10 @@ def get_place_info():
     if not location_name:
         return jsonify({'error': 'No location name provided'}), 400
     try:
-        location = kg_service.get_location_by_id(location_name)
+        # The location and its related locations are independent graph reads; run them concurrently
+        location, related = async_kg_service.run(async_kg_service.get_place_info(location_name))
         if not location:
             return jsonify({'error': 'Location not found'}), 404
-        related = kg_service.get_related_locations(location_name)
         response = location.to_dict()
         response['relatedLocations'] = related
         return jsonify(response)
@@ -97,7 +146,7 @@ def get_place_info():
 def get_locations_by_period(period):
     try:
         locations = kg_service.get_locations_by_period(period)
-        return jsonify([loc.to_dict() for loc in locations])
+        return locations_response(locations)
     except Exception as e:
         logger.error(f"Error fetching locations by period {period}: {e}")
         return jsonify({'error': 'Failed to fetch locations by period'}), 500
@@ -106,7 +155,7 @@ def get_locations_by_period(period):
 def get_locations_by_category(category):
     try:
         locations = kg_service.get_locations_by_category(category)
-        return jsonify([location.to_dict() for location in locations])
+        return locations_response(locations)
     except Exception as e:
         logger.error(f"Error fetching locations by category {category}: {e}")
         return jsonify({'error': 'Failed to fetch locations by category'}), 500
@@ -122,6 +171,7 @@ def get_related_locations(location_id):
 
 # ------------------ Route Endpoints ------------------
 @app.route('/api/routes', methods=['GET'])
+@conditional_get(route_service.get_dataset_version)
 def get_routes():
     try:
         routes = route_service.get_all_routes()
@@ -150,6 +200,27 @@ def get_routes_by_theme(theme):
         logger.error(f"Error fetching routes by theme {theme}: {e}")
         return jsonify({'error': 'Failed to fetch routes by theme'}), 500
 
+@app.route('/api/routes/nearby-attractions', methods=['GET'])
+def get_nearby_attractions():
+    """Get attractions near a specific location, nearest first"""
+    try:
+        lat, lng, radius_km = parse_search_area(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        nearby = route_service.get_nearby_historical_places({'lat': lat, 'lng': lng}, radius_km)
+        return jsonify([{
+            'id': place['location']['id'],
+            'name': place['location']['name'],
+            'description': place['location']['description'],
+            'distance': place['distance_km'],
+            'coordinates': place['location']['coordinates']
+        } for place in nearby])
+    except Exception as e:
+        logger.error(f"Error fetching nearby attractions: {e}")
+        return jsonify({'error': 'Failed to fetch nearby attractions'}), 500
+
 @app.route('/api/personalized-route', methods=['POST'])
 def create_personalized_route():
     if not request.json:
@@ -201,9 +272,11 @@ def create_personalized_route_advanced():
 @app.route('/api/nearby-places', methods=['GET'])
 def get_nearby_places():
     try:
-        lat = float(request.args.get('lat'))
-        lng = float(request.args.get('lng'))
-        radius_km = int(request.args.get('radius', 50))
+        lat, lng, radius_km = parse_search_area(request.args, radius_type=int)
+    except ValueError:
+        return jsonify({'error': 'Invalid parameters provided'}), 400
+
+    try:
         interests = request.args.get('interests', '').split(',') if request.args.get('interests') else []
         location = {'lat': lat, 'lng': lng}
         interest_list = [i.strip() for i in interests if i.strip()]
@@ -215,14 +288,13 @@ def get_nearby_places():
             'nearby_places': nearby_places,
             'total_found': len(nearby_places)
         })
-    except (ValueError, TypeError):
-        return jsonify({'error': 'Invalid parameters provided'}), 400
     except Exception as e:
         logger.error(f"Error fetching nearby places: {e}")
         return jsonify({'error': 'Failed to fetch nearby places'}), 500
 
 # ------------------ Improved: Preference Suggestions ------------------
 @app.route('/api/preference-suggestions', methods=['GET'])
+@conditional_get(kg_service.get_dataset_version)
 def get_preference_suggestions():
     """Get suggestions for user preferences based on available data"""
     try:
@@ -361,8 +433,19 @@ def search():
     if not query:
         return jsonify({'error': 'No search query provided'}), 400
     try:
+        offset, limit, fields = parse_page_args(request.args, Location.API_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        if wants_ndjson():
+            # Streamed, so whether another page follows is unknown; an empty page ends paging
+            end = offset + limit if limit else None
+            results = islice(kg_service.iter_search_locations(query), offset, end)
+            return locations_response(results, fields, end)
+        
         results = kg_service.search_locations(query)
-        return jsonify([location.to_dict() for location in results])
+        page, next_offset = paginate(results, offset, limit)
+        return locations_response(page, fields, next_offset)
     except Exception as e:
         logger.error(f"Error searching locations with query '{query}': {e}")
         return jsonify({'error': 'Search operation failed'}), 500
@@ -371,22 +454,24 @@ def search():
 def advanced_search():
     if not request.json:
         return jsonify({'error': 'No search criteria provided'}), 400
+    criteria = request.json
     try:
-        criteria = request.json
-        all_locations = kg_service.get_all_locations()
-        results = all_locations
-        if 'category' in criteria and criteria['category']:
-            results = [loc for loc in results if loc.category == criteria['category']]
-        if 'period' in criteria and criteria['period']:
-            results = [loc for loc in results if criteria['period'] in loc.period]
-        if 'dynasty' in criteria and criteria['dynasty']:
-            results = [loc for loc in results if criteria['dynasty'] in loc.dynasty]
-        if 'tags' in criteria and criteria['tags']:
-            results = [loc for loc in results if any(tag in getattr(loc, 'tags', []) for tag in criteria['tags'])]
-        if 'query' in criteria and criteria['query']:
-            query = criteria['query'].lower()
-            results = [loc for loc in results if query in f"{loc.name} {loc.description} {loc.history}".lower()]
-        return jsonify([location.to_dict() for location in results])
+        # Paging options may come from the query string or the JSON body
+        page_args = dict(request.args.items())
+        page_args.update({key: criteria[key] for key in ('limit', 'cursor', 'fields') if key in criteria})
+        offset, limit, fields = parse_page_args(page_args, Location.API_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        results = kg_service.filter_locations(
+            category=criteria.get('category'),
+            period=criteria.get('period'),
+            dynasty=criteria.get('dynasty'),
+            tags=criteria.get('tags'),
+            query=criteria.get('query')
+        )
+        page, next_offset = paginate(results, offset, limit)
+        return locations_response(page, fields, next_offset)
     except Exception as e:
         logger.error(f"Error in advanced search: {e}")
         return jsonify({'error': 'Advanced search operation failed'}), 500
@@ -664,11 +749,9 @@ def find_cultural_connections_backend(location_id, dynasty, period):
     connections = []
     
     try:
-        # Get related locations from knowledge graph service
-        all_locations = kg_service.get_all_locations()
-        
-        # Find locations with same dynasty
-        dynasty_matches = [loc for loc in all_locations if loc.dynasty == dynasty and loc.id != location_id][:3]
+        # Find locations with same dynasty (the dynasty index narrows the candidates)
+        dynasty_matches = [loc for loc in kg_service.get_locations_by_dynasty(dynasty)
+                           if loc.dynasty == dynasty and loc.id != location_id][:3]
         if dynasty_matches:
             connections.append({
                 'type': 'dynasty',
@@ -679,7 +762,8 @@ def find_cultural_connections_backend(location_id, dynasty, period):
             })
         
         # Find locations with similar period
-        period_matches = [loc for loc in all_locations if loc.period == period and loc.id != location_id and loc.dynasty != dynasty][:3]
+        period_matches = [loc for loc in kg_service.get_locations_by_period(period)
+                          if loc.period == period and loc.id != location_id and loc.dynasty != dynasty][:3]
         if period_matches:
             connections.append({
                 'type': 'temporal',
@@ -734,6 +818,7 @@ def generate_exploration_guide(location_name):
 
 # ------------------ Timeline Endpoints ------------------
 @app.route('/api/timeline/periods', methods=['GET'])
+@conditional_get(kg_service.get_dataset_version)
 def get_timeline_periods():
     """
     Get all timeline periods with their associated locations
@@ -964,7 +1049,10 @@ def translate_location_endpoint():
         logger.error(f"Location translation error: {e}")
         return jsonify({'error': 'Location translation failed'}), 500
 
+SUPPORTED_LANGUAGES_VERSION = content_hash([repr(sorted(SUPPORTED_LANGUAGES.items())).encode('utf-8')])
+
 @app.route('/api/translate/languages', methods=['GET'])
+@conditional_get(lambda: SUPPORTED_LANGUAGES_VERSION)
 def get_supported_languages():
     """Get list of supported languages"""
     return jsonify({
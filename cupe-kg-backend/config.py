@@ -13,5 +13,55 @@ class Config:
     NEO4J_USER = os.environ.get('NEO4J_USER') or 'neo4j'
     NEO4J_PASSWORD = os.environ.get('NEO4J_PASSWORD') or 'password'
     
+    # Neo4j connection pool and fetch settings
+    NEO4J_MAX_CONNECTION_POOL_SIZE = int(os.environ.get('NEO4J_MAX_CONNECTION_POOL_SIZE', 50))
+    NEO4J_CONNECTION_ACQUISITION_TIMEOUT = float(os.environ.get('NEO4J_CONNECTION_ACQUISITION_TIMEOUT', 30.0))
+    NEO4J_MAX_CONNECTION_LIFETIME = float(os.environ.get('NEO4J_MAX_CONNECTION_LIFETIME', 3600.0))
+    NEO4J_FETCH_SIZE = int(os.environ.get('NEO4J_FETCH_SIZE', 1000))
+    NEO4J_FULLTEXT_INDEX = os.environ.get('NEO4J_FULLTEXT_INDEX') or 'location_search'
+    # Seconds before a missing or offline full-text index is looked up again
+    NEO4J_FULLTEXT_INDEX_RECHECK_INTERVAL = float(os.environ.get('NEO4J_FULLTEXT_INDEX_RECHECK_INTERVAL', 60))
+    NEO4J_IMPORT_BATCH_SIZE = int(os.environ.get('NEO4J_IMPORT_BATCH_SIZE', 5000))
+    # Tags / dynasties shared by more locations than this get no pairwise edges (n^2 edges, little signal)
+    NEO4J_RELATIONSHIP_MAX_BLOCK = int(os.environ.get('NEO4J_RELATIONSHIP_MAX_BLOCK', 2000))
+    
+    # Read-through cache in front of Neo4j location queries (seconds)
+    LOCATION_CACHE_TTL = float(os.environ.get('LOCATION_CACHE_TTL', 300))
+    LOCATION_CACHE_VERSION_CHECK_INTERVAL = float(os.environ.get('LOCATION_CACHE_VERSION_CHECK_INTERVAL', 5))
+    
     # API settings
-    API_PREFIX = '/api'
\ No newline at end of file
+    API_PREFIX = '/api'
+    # Cache-Control max-age (seconds) for read endpoints served with ETags
+    HTTP_CACHE_MAX_AGE = int(os.environ.get('HTTP_CACHE_MAX_AGE', 60))
+    # Largest page a list endpoint returns for ?limit=
+    MAX_PAGE_LIMIT = int(os.environ.get('MAX_PAGE_LIMIT', 1000))
+    # Response compression: bodies smaller than this are sent uncompressed
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 500))
+    GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', 6))
+    BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', 5))
+    # Compressed bodies kept for dataset-stable endpoints (one per URL, version and coding)
+    PRECOMPRESSED_CACHE_SIZE = int(os.environ.get('PRECOMPRESSED_CACHE_SIZE', 256))
+    
+    # Route planning settings
+    # Time budget (milliseconds) for 2-opt / Or-opt improvement of each route ordering
+    ROUTE_IMPROVEMENT_BUDGET_MS = float(os.environ.get('ROUTE_IMPROVEMENT_BUDGET_MS', 50))
+    # Routes with at most this many stops are ordered exactly (Held-Karp, O(2^n * n^2) time and
+    # O(2^n * n) memory); longer ones use nearest neighbour plus local search. Capped at 16.
+    EXACT_ROUTE_MAX_STOPS = min(int(os.environ.get('EXACT_ROUTE_MAX_STOPS', 12)), 16)
+    
+    # Knowledge graph settings
+    RELATED_LOCATIONS_TOP_K = int(os.environ.get('RELATED_LOCATIONS_TOP_K', 10))
+    # Cell size (degrees) of the lat/lng grid used for nearby-place queries
+    SPATIAL_GRID_CELL_DEG = float(os.environ.get('SPATIAL_GRID_CELL_DEG', 0.5))
+    # All-pairs float32 distance matrix is kept in memory up to this many locations (n^2 * 4 bytes,
+    # 4 MB at the default, built on first use); larger datasets compute route submatrices on demand
+    # or read the memory-mapped matrix from scripts/build_matrices.py
+    DISTANCE_MATRIX_MAX_LOCATIONS = int(os.environ.get('DISTANCE_MATRIX_MAX_LOCATIONS', 1000))
+    # Filter masks memoized per distinct interest / filter value (least recently used are dropped)
+    MASK_CACHE_SIZE = int(os.environ.get('MASK_CACHE_SIZE', 256))
+    # Memory-mapped distance matrix written by scripts/build_matrices.py
+    MATRIX_DIR = os.environ.get('MATRIX_DIR') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'data', 'matrices')
+    # Prebuilt dataset written by scripts/build_snapshot.py; used at startup when fresh
+    SNAPSHOT_PATH = os.environ.get('SNAPSHOT_PATH') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'data', 'locations.snapshot')
@@ -5,10 +5,15 @@ Location model for CuPe-KG project
 Represents a cultural heritage location with all relevant information
 """
 
+import json
+import sys
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, FrozenSet, Sequence, Tuple
 
-@dataclass
+# Projected JSON encodings kept per location (oldest dropped first)
+PROJECTION_CACHE_SIZE = 4
+
+@dataclass(slots=True)
 class Legend:
     """Represents a legend or story associated with a location"""
     title: str
@@ -27,7 +32,7 @@ class Legend:
             description=data.get('description', '')
         )
 
-@dataclass
+@dataclass(slots=True)
 class Coordinates:
     """Represents geographical coordinates"""
     lat: float
@@ -46,11 +51,68 @@ class Coordinates:
             lng=float(data.get('lng', 0.0))
         )
 
-@dataclass
+@dataclass(slots=True)
+class NormalizedFields:
+    """
+    Lowercased copies of the text fields used for matching and search.
+    Computed once per location so request handlers don't re-normalize strings.
+    """
+    name: str
+    description: str
+    history: str
+    period: str
+    dynasty: str  # interned
+    category: str  # interned
+    tags: Tuple[str, ...]
+    tag_set: FrozenSet[str]
+    search_text: str
+
+    @classmethod
+    def from_location(cls, location: 'Location') -> 'NormalizedFields':
+        name = location.name.lower().strip()
+        description = location.description.lower().strip()
+        history = location.history.lower().strip()
+        period = location.period.lower().strip()
+        dynasty = sys.intern(location.dynasty.lower().strip())
+        tags = tuple(sys.intern(tag.lower().strip()) for tag in location.tags)
+        cultural_facts = ' '.join(location.cultural_facts).lower()
+
+        return cls(
+            name=name,
+            description=description,
+            history=history,
+            period=period,
+            dynasty=dynasty,
+            category=sys.intern(location.category.lower().strip()),
+            tags=tags,
+            tag_set=frozenset(tags),
+            search_text=f"{name} {description} {history} {dynasty} {period} {cultural_facts} {' '.join(tags)}"
+        )
+
+@dataclass(frozen=True, eq=False, slots=True)
+class RelationshipGroup:
+    """
+    All locations sharing one attribute value (e.g. the same dynasty).
+    A single instance is shared by reference between every member location.
+    """
+    attribute: str
+    value: str
+    members: Tuple[str, ...]
+
+@dataclass(slots=True)
 class Location:
     """
-    Represents a cultural heritage location with comprehensive information
+    Represents a cultural heritage location with comprehensive information.
+    Slotted and compact: list fields are stored as tuples and categorical strings
+    (category, period, dynasty, tags) are interned so repeated values share one object.
     """
+    # Keys of the API representation, selectable with to_dict(fields=...)
+    API_FIELDS = (
+        'id', 'name', 'description', 'category', 'coordinates', 'history', 'period', 'dynasty',
+        'culturalFacts', 'legends', 'tags', 'images', 'bestTimeToVisit', 'entryFee',
+        'openingHours', 'accessibility', 'nearbyAttractions'
+    )
+    
     id: str
     name: str
     description: str
@@ -59,20 +121,97 @@ class Location:
     history: str = ""
     period: str = ""
     dynasty: str = ""
-    cultural_facts: List[str] = field(default_factory=list)
-    legends: List[Legend] = field(default_factory=list)
-    tags: List[str] = field(default_factory=list)
+    cultural_facts: Tuple[str, ...] = ()
+    legends: Tuple[Legend, ...] = ()
+    tags: Tuple[str, ...] = ()
     
     # Optional fields for enhanced functionality
-    images: List[str] = field(default_factory=list)
+    images: Tuple[str, ...] = ()
     best_time_to_visit: str = ""
     entry_fee: str = ""
     opening_hours: str = ""
     accessibility: str = ""
-    nearby_attractions: List[str] = field(default_factory=list)
+    nearby_attractions: Tuple[str, ...] = ()
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert location to dictionary for API responses"""
+    # Derived search fields, filled in by DataLoader at load time
+    normalized: Optional[NormalizedFields] = field(default=None, repr=False, compare=False)
+    
+    # Shared dynasty/period/category groups, filled in by DataLoader.enrich_with_relationships
+    relationship_groups: Tuple[RelationshipGroup, ...] = field(default=(), repr=False, compare=False)
+    
+    # API representations cached by to_dict / to_json_bytes. Locations are not modified after
+    # loading (a reload builds new instances); call invalidate_cache() after changing one.
+    _dict_cache: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    _json_cache: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    _projection_cache: Optional[Dict[Tuple[str, ...], bytes]] = field(default=None, init=False, repr=False,
+                                                                      compare=False)
+    
+    def __post_init__(self):
+        self.category = sys.intern(self.category or '')
+        self.period = sys.intern(self.period or '')
+        self.dynasty = sys.intern(self.dynasty or '')
+        self.tags = tuple(sys.intern(tag) for tag in self.tags or ())
+        self.cultural_facts = tuple(self.cultural_facts or ())
+        self.legends = tuple(self.legends or ())
+        self.images = tuple(self.images or ())
+        self.nearby_attractions = tuple(self.nearby_attractions or ())
+    
+    @property
+    def related_locations(self) -> List[str]:
+        """Ids of other locations sharing the dynasty, period or category"""
+        related = {}
+        for group in self.relationship_groups:
+            related.update(dict.fromkeys(group.members))
+        related.pop(self.id, None)
+        return list(related)
+    
+    def get_normalized(self) -> NormalizedFields:
+        """Return the normalized search fields, computing them if not yet loaded"""
+        if self.normalized is None:
+            self.normalized = NormalizedFields.from_location(self)
+        return self.normalized
+    
+    def invalidate_cache(self):
+        """Drop the cached dict and JSON encodings after modifying this location"""
+        self._dict_cache = None
+        self._json_cache = None
+        self._projection_cache = None
+    
+    def to_dict(self, fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Convert location to dictionary for API responses, optionally only the given API_FIELDS.
+        Returns a shallow copy of a cached dict; nested lists and dicts are shared.
+        """
+        if self._dict_cache is None:
+            self._dict_cache = self._build_dict()
+        if fields is None:
+            return dict(self._dict_cache)
+        return {name: self._dict_cache[name] for name in fields if name in self._dict_cache}
+    
+    def to_json_bytes(self, fields: Optional[Tuple[str, ...]] = None) -> bytes:
+        """
+        UTF-8 JSON encoding of to_dict(fields), cached; matches Flask's compact jsonify output.
+        Keys are sorted, so callers should pass fields in a canonical order to share cache entries.
+        """
+        if fields is None:
+            if self._json_cache is None:
+                self._json_cache = self._encode(self.to_dict())
+            return self._json_cache
+        
+        if self._projection_cache is None:
+            self._projection_cache = {}
+        encoded = self._projection_cache.get(fields)
+        if encoded is None:
+            if len(self._projection_cache) >= PROJECTION_CACHE_SIZE:
+                del self._projection_cache[next(iter(self._projection_cache))]
+            encoded = self._projection_cache[fields] = self._encode(self.to_dict(fields))
+        return encoded
+    
+    @staticmethod
+    def _encode(data: Dict[str, Any]) -> bytes:
+        return json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    
+    def _build_dict(self) -> Dict[str, Any]:
         return {
             'id': self.id,
             'name': self.name,
@@ -82,15 +221,15 @@ class Location:
             'history': self.history,
             'period': self.period,
             'dynasty': self.dynasty,
-            'culturalFacts': self.cultural_facts,  # Frontend expects camelCase
+            'culturalFacts': list(self.cultural_facts),  # Frontend expects camelCase
             'legends': [legend.to_dict() for legend in self.legends],
-            'tags': self.tags,
-            'images': self.images,
+            'tags': list(self.tags),
+            'images': list(self.images),
             'bestTimeToVisit': self.best_time_to_visit,
             'entryFee': self.entry_fee,
             'openingHours': self.opening_hours,
             'accessibility': self.accessibility,
-            'nearbyAttractions': self.nearby_attractions
+            'nearbyAttractions': list(self.nearby_attractions)
         }
     
     @classmethod
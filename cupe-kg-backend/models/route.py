@@ -1,6 +1,6 @@
 # models/route.py
 from dataclasses import dataclass, field
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 @dataclass
 class RouteLocation:
@@ -32,9 +32,11 @@ class Route:
     path: List[List[float]] = field(default_factory=list)
     locations: List[RouteLocation] = field(default_factory=list)
     dash_array: str = None
+    # Ordering statistics for generated routes (tour length before/after optimization)
+    metrics: Optional[Dict[str, Any]] = None
     
     def to_dict(self) -> Dict[str, Any]:
-        return {
+        data = {
             'id': self.id,
             'name': self.name,
             'description': self.description,
@@ -43,6 +45,9 @@ class Route:
             'locations': [loc.to_dict() for loc in self.locations],
             'dashArray': self.dash_array
         }
+        if self.metrics is not None:
+            data['metrics'] = self.metrics
+        return data
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Route':
@@ -53,5 +58,6 @@ class Route:
             color=data.get('color', '#3f51b5'),
             path=data.get('path', []),
             locations=[RouteLocation.from_dict(loc) for loc in data.get('locations', [])],
-            dash_array=data.get('dashArray')
+            dash_array=data.get('dashArray'),
+            metrics=data.get('metrics')
         )
\ No newline at end of file
@@ -0,0 +1,36 @@
+# scripts/build_matrices.py
+import argparse
+import logging
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from services.kg_service import KnowledgeGraphService
+from services import travel_matrix
+
+def build_matrices(directory, block_rows):
+    """Write the memory-mappable distance matrix for the loaded dataset"""
+    kg_service = KnowledgeGraphService(use_placeholder=True)
+    columns = kg_service.get_location_columns()
+
+    started = time.perf_counter()
+    sizes = travel_matrix.write_matrices(columns, directory, kg_service.get_dataset_version(), block_rows)
+    print(f"Wrote matrices for {len(columns)} locations in {time.perf_counter() - started:.3f}s")
+    for name, size in sizes.items():
+        print(f"  {os.path.join(directory, name)} ({size} bytes)")
+
+    store = travel_matrix.open_matrices(directory, kg_service.get_dataset_version(), len(columns))
+    if store is None:
+        sys.exit("Matrices could not be opened")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    parser = argparse.ArgumentParser(description="Write the memory-mapped distance matrix for CuPe-KG")
+    parser.add_argument('--output-dir', default=Config.MATRIX_DIR, help="Directory for the .npy files")
+    parser.add_argument('--block-rows', type=int, default=1024, help="Matrix rows computed per block")
+    args = parser.parse_args()
+    build_matrices(args.output_dir, args.block_rows)
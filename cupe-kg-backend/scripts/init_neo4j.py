@@ -1,82 +1,248 @@
 # scripts/init_neo4j.py
 from neo4j import GraphDatabase
+import argparse
 import json
 import os
 import sys
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from itertools import combinations
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import Config
 
-def init_database():
+def bump_dataset_version(session):
+    """Bump the dataset version so backend location caches drop stale entries"""
+    record = session.run("""
+        MERGE (v:DatasetVersion {id: 'locations'})
+        SET v.version = coalesce(v.version, 0) + 1, v.updated_at = timestamp()
+        RETURN v.version as version
+    """).single()
+    print(f"Dataset version is now {record['version']}")
+
+def create_indexes(session):
+    """
+    Create the uniqueness constraint on Location.id (which also backs id lookups and MERGE)
+    and the full-text index used by search_locations
+    """
+    # A constraint cannot be created over an existing plain index on the same property
+    session.run("DROP INDEX location_id IF EXISTS")
+    session.run("""
+        CREATE CONSTRAINT location_id_unique IF NOT EXISTS
+        FOR (l:Location) REQUIRE l.id IS UNIQUE
+    """)
+    session.run(f"""
+        CREATE FULLTEXT INDEX {Config.NEO4J_FULLTEXT_INDEX} IF NOT EXISTS
+        FOR (l:Location) ON EACH [l.name, l.description, l.history, l.dynasty, l.tags]
+    """)
+    print("Created location constraints and indexes")
+
+def location_row(location_data):
+    """Flatten one location record into the parameter map used by the bulk MERGE"""
+    coordinates = location_data.get('coordinates', {})
+    return {
+        'id': location_data['id'],
+        'name': location_data['name'],
+        'description': location_data.get('description', ''),
+        'category': location_data.get('category', ''),
+        'history': location_data.get('history', ''),
+        'period': location_data.get('period', ''),
+        'dynasty': location_data.get('dynasty', ''),
+        'lat': coordinates.get('lat'),
+        'lng': coordinates.get('lng'),
+        'tags': location_data.get('tags', [])
+    }
+
+def iter_location_files(locations_dir):
+    """Yield location records from a directory of JSON files, one file at a time"""
+    for file_name in sorted(os.listdir(locations_dir)):
+        if not file_name.endswith('.json'):
+            continue
+        with open(os.path.join(locations_dir, file_name), 'r', encoding='utf-8') as f:
+            yield json.load(f)
+
+def iter_jsonl(path):
+    """Yield location records from a JSONL file without reading it into memory"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def chunked(records, size):
+    """Group an iterable into lists of at most size items"""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _merge_locations(tx, rows):
+    tx.run("""
+        UNWIND $rows AS row
+        MERGE (l:Location {id: row.id})
+        SET l.name = row.name,
+            l.description = row.description,
+            l.category = row.category,
+            l.history = row.history,
+            l.period = row.period,
+            l.dynasty = row.dynasty,
+            l.lat = row.lat,
+            l.lng = row.lng,
+            l.tags = row.tags
+    """, rows=rows).consume()
+
+def bulk_load_locations(session, records, batch_size):
+    """
+    Upsert location records in chunks of batch_size, one explicit transaction per chunk.
+    Relies on the Location.id uniqueness constraint so each MERGE is an index lookup.
+    """
+    total = 0
+    started = time.perf_counter()
+    for batch in chunked((location_row(record) for record in records), batch_size):
+        session.execute_write(_merge_locations, batch)
+        total += len(batch)
+        elapsed = time.perf_counter() - started
+        print(f"Loaded {total} locations ({total / elapsed:.0f} rows/s)")
+
+    elapsed = time.perf_counter() - started
+    rate = total / elapsed if elapsed > 0 else 0
+    print(f"Loaded {total} locations in {elapsed:.2f}s ({rate:.0f} rows/s)")
+    return total
+
+def relationship_blocks(session, max_block=Config.NEO4J_RELATIONSHIP_MAX_BLOCK):
+    """
+    Block location ids by tag and by dynasty (each block sorted). Blocks larger than
+    max_block are skipped: they would produce O(n^2) edges that say little about similarity.
+    """
+    tag_blocks = defaultdict(list)
+    dynasty_blocks = defaultdict(list)
+    for record in session.run("MATCH (l:Location) RETURN l.id AS id, l.tags AS tags, l.dynasty AS dynasty"):
+        for tag in set(record["tags"] or []):
+            tag_blocks[tag].append(record["id"])
+        if record["dynasty"]:
+            dynasty_blocks[record["dynasty"]].append(record["id"])
+
+    blocks = []
+    for kind, grouped in (('tag', tag_blocks), ('dynasty', dynasty_blocks)):
+        kept = {}
+        for key, ids in grouped.items():
+            if len(ids) > max_block:
+                print(f"Skipping {kind} '{key}': shared by {len(ids)} locations (limit {max_block})")
+            else:
+                kept[key] = sorted(ids)
+        blocks.append(kept)
+    return blocks[0], blocks[1]
+
+def theme_pairs(tag_blocks):
+    """
+    Yield one SHARES_THEME row per pair of locations sharing a tag, with the smaller id as
+    the source. Pairs are generated one source location at a time, so only that location's
+    partners are held in memory rather than every pair in the dataset.
+    """
+    tags_by_id = defaultdict(list)
+    for tag in sorted(tag_blocks):
+        for location_id in tag_blocks[tag]:
+            tags_by_id[location_id].append(tag)
+
+    for source in sorted(tags_by_id):
+        shared = defaultdict(list)
+        for tag in tags_by_id[source]:
+            ids = tag_blocks[tag]
+            for target in ids[bisect_right(ids, source):]:
+                shared[target].append(tag)
+        for target in sorted(shared):
+            tags = shared[target]
+            yield {'source': source, 'target': target, 'theme': tags, 'strength': len(tags)}
+
+def dynasty_pairs(dynasty_blocks):
+    """Yield one SAME_DYNASTY row per pair of locations in the same dynasty block"""
+    for dynasty, ids in dynasty_blocks.items():
+        for source, target in combinations(ids, 2):
+            yield {'source': source, 'target': target, 'dynasty': dynasty}
+
+def _create_theme_edges(tx, pairs):
+    tx.run("""
+        UNWIND $pairs AS pair
+        MATCH (l1:Location {id: pair.source})
+        MATCH (l2:Location {id: pair.target})
+        CREATE (l1)-[:SHARES_THEME {theme: pair.theme, strength: pair.strength}]->(l2)
+    """, pairs=pairs).consume()
+
+def _create_dynasty_edges(tx, pairs):
+    tx.run("""
+        UNWIND $pairs AS pair
+        MATCH (l1:Location {id: pair.source})
+        MATCH (l2:Location {id: pair.target})
+        CREATE (l1)-[:SAME_DYNASTY {dynasty: pair.dynasty, strength: 3}]->(l2)
+    """, pairs=pairs).consume()
+
+def delete_relationships(session, batch_size):
+    """Remove previously materialized edges in bounded transactions"""
+    while True:
+        deleted = session.run("""
+            MATCH ()-[r:SHARES_THEME|SAME_DYNASTY]->()
+            WITH r LIMIT $limit
+            DELETE r
+            RETURN count(*) AS deleted
+        """, limit=batch_size).single()["deleted"]
+        if deleted == 0:
+            break
+
+def create_relationships(session, batch_size):
+    """
+    Materialize SHARES_THEME and SAME_DYNASTY edges, one direction per pair. Pairs are
+    streamed into UNWIND batches as they are generated, never collected up front.
+    """
+    delete_relationships(session, batch_size)
+    tag_blocks, dynasty_blocks = relationship_blocks(session)
+    theme_count = dynasty_count = 0
+    for batch in chunked(theme_pairs(tag_blocks), batch_size):
+        session.execute_write(_create_theme_edges, batch)
+        theme_count += len(batch)
+    for batch in chunked(dynasty_pairs(dynasty_blocks), batch_size):
+        session.execute_write(_create_dynasty_edges, batch)
+        dynasty_count += len(batch)
+    print(f"Created {theme_count} SHARES_THEME and {dynasty_count} SAME_DYNASTY relationships")
+
+def init_database(jsonl_path=None, batch_size=Config.NEO4J_IMPORT_BATCH_SIZE, keep_existing=False):
     driver = GraphDatabase.driver(
         Config.NEO4J_URI, 
         auth=(Config.NEO4J_USER, Config.NEO4J_PASSWORD)
     )
     
     with driver.session() as session:
-        # Clear existing data
-        session.run("MATCH (n) DETACH DELETE n")
+        if not keep_existing:
+            # Clear existing data (the version node survives so the counter keeps increasing)
+            session.run("MATCH (n) WHERE NOT n:DatasetVersion DETACH DELETE n")
+        create_indexes(session)
         
         # Load locations
-        locations_dir = os.path.join('data', 'locations')
-        location_files = [f for f in os.listdir(locations_dir) if f.endswith('.json')]
-        
-        for file_name in location_files:
-            file_path = os.path.join(locations_dir, file_name)
-            with open(file_path, 'r', encoding='utf-8') as f:
-                location_data = json.load(f)
-                
-                
-                # Create location node
-                session.run("""
-                    CREATE (l:Location {
-                        id: $id,
-                        name: $name,
-                        description: $description,
-                        category: $category,
-                        history: $history,
-                        period: $period,
-                        dynasty: $dynasty,
-                        lat: $lat,
-                        lng: $lng,
-                        tags: $tags
-                    })
-                """, 
-                id=location_data['id'],
-                name=location_data['name'],
-                description=location_data['description'],
-                category=location_data['category'],
-                history=location_data['history'],
-                period=location_data['period'],
-                dynasty=location_data['dynasty'],
-                lat=location_data['coordinates']['lat'],
-                lng=location_data['coordinates']['lng'],
-                tags=location_data['tags']
-                )
-                
-                print(f"Created location node for {location_data['name']}")
-        
-        # Create relationships based on shared tags, periods, dynasties
-        session.run("""
-            MATCH (l1:Location), (l2:Location) 
-            WHERE l1 <> l2
-            WITH l1, l2, [x IN l1.tags WHERE x IN l2.tags] AS commonTags
-            WHERE size(commonTags) > 0
-            CREATE (l1)-[r:SHARES_THEME {theme: commonTags, strength: size(commonTags)}]->(l2)
-        """)
+        if jsonl_path:
+            records = iter_jsonl(jsonl_path)
+        else:
+            records = iter_location_files(os.path.join('data', 'locations'))
+        bulk_load_locations(session, records, batch_size)
         
-        session.run("""
-            MATCH (l1:Location), (l2:Location) 
-            WHERE l1 <> l2 AND l1.dynasty = l2.dynasty
-            CREATE (l1)-[r:SAME_DYNASTY {dynasty: l1.dynasty, strength: 3}]->(l2)
-        """)
+        create_relationships(session, batch_size)
         
-        print("Created relationships between locations")
+        bump_dataset_version(session)
     
     driver.close()
     print("Database initialization complete")
 
 if __name__ == "__main__":
-    init_database()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Load CuPe-KG locations into Neo4j")
+    parser.add_argument('--jsonl', help="Load locations from a JSONL file instead of data/locations/*.json")
+    parser.add_argument('--batch-size', type=int, default=Config.NEO4J_IMPORT_BATCH_SIZE,
+                        help="Rows per UNWIND transaction")
+    parser.add_argument('--keep-existing', action='store_true',
+                        help="Upsert into the existing graph instead of clearing it first")
+    args = parser.parse_args()
+    init_database(jsonl_path=args.jsonl, batch_size=args.batch_size, keep_existing=args.keep_existing)
\ No newline at end of file
@@ -0,0 +1,47 @@
+# scripts/location_memory.py
+import argparse
+import gc
+import logging
+import os
+import sys
+import tracemalloc
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.location import Location
+from services.data_loader import DataLoader
+
+def measure(copies):
+    """Bytes allocated per Location, including normalized fields and relationship groups"""
+    from data.locations import get_expanded_locations
+    records = get_expanded_locations()
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    locations = {}
+    for copy in range(copies):
+        for record in records:
+            # Fresh string objects per copy, as if each record had been parsed from disk
+            location = Location.from_dict({**record, 'id': f"{record['id']}-{copy}",
+                                           'dynasty': ''.join(record.get('dynasty', '')),
+                                           'category': ''.join(record.get('category', '')),
+                                           'tags': [''.join(tag) for tag in record.get('tags', [])]})
+            locations[location.id] = location
+    DataLoader.normalize_locations(locations)
+    DataLoader.enrich_with_relationships(locations)
+
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return len(locations), used
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    parser = argparse.ArgumentParser(description="Measure the in-memory size of loaded locations")
+    parser.add_argument('--copies', type=int, default=100, help="Times to replicate the bundled dataset")
+    args = parser.parse_args()
+    count, used = measure(args.copies)
+    print(f"{count} locations use {used / 1024 / 1024:.1f} MiB ({used / count:.0f} bytes per location)")
@@ -0,0 +1,186 @@
+# cupe-kg-backend/services/async_kg_service.py
+
+"""
+Async access path to the CuPe-KG knowledge graph
+Coroutine versions of the KnowledgeGraphService reads, built on the neo4j async driver
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from models.location import Location
+from services.kg_service import (
+    KnowledgeGraphService,
+    ClientError,
+    ALL_LOCATIONS_QUERY,
+    LOCATION_BY_ID_QUERY,
+    RELATED_LOCATIONS_QUERY,
+    FULLTEXT_INDEX_STATE_QUERY,
+    FULLTEXT_SEARCH_QUERY,
+    CONTAINS_SEARCH_QUERY,
+    fulltext_recheck_due
+)
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncKnowledgeGraphService:
+    """
+    Wraps a KnowledgeGraphService. In Neo4j mode reads go through an AsyncDriver so
+    independent lookups can run concurrently; in placeholder mode, or when a query fails,
+    the wrapped service answers from memory. Location reads share the wrapped service's
+    location_cache and only query the driver on a miss.
+
+    Flask views are synchronous, so the service owns a background event loop and
+    run() submits a coroutine to it and waits for the result.
+    """
+
+    def __init__(self, kg_service: KnowledgeGraphService):
+        self.kg_service = kg_service
+        self.driver = None
+        self._fulltext_index_available = None
+        self._fulltext_index_checked_at = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+
+    @property
+    def use_placeholder(self) -> bool:
+        return self.kg_service.use_placeholder
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=self._loop.run_forever,
+                                          name='async-kg-service', daemon=True)
+                thread.start()
+            return self._loop
+
+    def run(self, coroutine, timeout: Optional[float] = None):
+        """Run a coroutine of this service on its event loop from synchronous code"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._get_loop()).result(timeout)
+
+    def _get_driver(self):
+        # Created lazily so the driver is bound to the loop it is used on
+        if self.driver is None:
+            from neo4j import AsyncGraphDatabase
+
+            self.driver = AsyncGraphDatabase.driver(
+                Config.NEO4J_URI,
+                auth=(Config.NEO4J_USER, Config.NEO4J_PASSWORD),
+                max_connection_pool_size=Config.NEO4J_MAX_CONNECTION_POOL_SIZE,
+                connection_acquisition_timeout=Config.NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+                max_connection_lifetime=Config.NEO4J_MAX_CONNECTION_LIFETIME
+            )
+        return self.driver
+
+    def _session(self):
+        return self._get_driver().session(fetch_size=Config.NEO4J_FETCH_SIZE)
+
+    async def _close(self):
+        if self.driver is not None:
+            await self.driver.close()
+            self.driver = None
+
+    def close(self):
+        if self._loop is None:
+            return
+        self.run(self._close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+
+    async def get_all_locations(self) -> List[Location]:
+        if self.use_placeholder:
+            return self.kg_service.get_all_locations()
+
+        try:
+            async with self._session() as session:
+                result = await session.run(ALL_LOCATIONS_QUERY)
+                return [KnowledgeGraphService._record_to_location(record) async for record in result]
+        except Exception as e:
+            logger.error(f"Error fetching locations from Neo4j: {e}")
+            return await asyncio.to_thread(self.kg_service.get_all_locations)
+
+    async def get_location_by_id(self, location_id: str) -> Optional[Location]:
+        if self.use_placeholder:
+            return self.kg_service.get_location_by_id(location_id)
+
+        cache = self.kg_service.location_cache
+        try:
+            found, missing = cache.lookup([location_id])
+            if not missing:
+                return found[location_id]
+            async with self._session() as session:
+                result = await session.run(LOCATION_BY_ID_QUERY, id=location_id)
+                record = await result.single()
+                if record:
+                    location = KnowledgeGraphService._node_to_location(record["l"])
+                    cache.store([location])
+                    return location
+                return None
+        except Exception as e:
+            logger.error(f"Error fetching location {location_id} from Neo4j: {e}")
+            return await asyncio.to_thread(self.kg_service.get_location_by_id, location_id)
+
+    async def get_related_locations(self, location_id, max_results=5) -> List[Dict[str, Any]]:
+        if self.use_placeholder:
+            return self.kg_service.get_related_locations(location_id, max_results)
+
+        cache = self.kg_service.location_cache
+        try:
+            related = cache.lookup_related(location_id, max_results)
+            if related is None:
+                async with self._session() as session:
+                    result = await session.run(RELATED_LOCATIONS_QUERY, location_id=location_id,
+                                               max_results=max_results)
+                    related = [KnowledgeGraphService._node_to_location(record["l2"]) async for record in result]
+                cache.store_related(location_id, max_results, related)
+            return [location.to_dict() for location in related]
+        except Exception as e:
+            logger.error(f"Error querying related locations from Neo4j: {e}")
+            return await asyncio.to_thread(self.kg_service.get_related_locations, location_id, max_results)
+
+    async def _fulltext_index_exists(self) -> bool:
+        if fulltext_recheck_due(self._fulltext_index_available, self._fulltext_index_checked_at):
+            self._fulltext_index_checked_at = time.monotonic()
+            try:
+                async with self._session() as session:
+                    result = await session.run(FULLTEXT_INDEX_STATE_QUERY, name=Config.NEO4J_FULLTEXT_INDEX)
+                    record = await result.single()
+            except ClientError as e:
+                logger.warning(f"Could not list full-text indexes: {e}")
+                record = None
+            self._fulltext_index_available = bool(record) and record["state"] == 'ONLINE'
+        return self._fulltext_index_available
+
+    async def search_locations(self, query: str) -> List[Location]:
+        if self.use_placeholder:
+            return self.kg_service.search_locations(query)
+
+        try:
+            async with self._session() as session:
+                if await self._fulltext_index_exists():
+                    try:
+                        result = await session.run(FULLTEXT_SEARCH_QUERY, index=Config.NEO4J_FULLTEXT_INDEX,
+                                                   query=KnowledgeGraphService._to_lucene_query(query))
+                        return [KnowledgeGraphService._node_to_location(record["l"]) async for record in result]
+                    except ClientError as e:
+                        logger.warning(f"Full-text search failed, falling back to CONTAINS scan: {e}")
+                        self._fulltext_index_available = None
+
+                result = await session.run(CONTAINS_SEARCH_QUERY, query=query)
+                return [KnowledgeGraphService._node_to_location(record["l"]) async for record in result]
+        except Exception as e:
+            logger.error(f"Error searching locations with query '{query}': {e}")
+            return await asyncio.to_thread(self.kg_service.search_locations, query)
+
+    async def get_place_info(self, location_id: str,
+                             max_related: int = 5) -> Tuple[Optional[Location], List[Dict[str, Any]]]:
+        """A location and its related locations, fetched concurrently"""
+        return await asyncio.gather(
+            self.get_location_by_id(location_id),
+            self.get_related_locations(location_id, max_related)
+        )
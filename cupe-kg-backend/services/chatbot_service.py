@@ -106,14 +106,20 @@ class ChatbotService:
         # Add the current query to history
         self.conversation_history[session_id].append({"role": "user", "text": query})
         
+        # Look up the current location once for the whole request
+        current_location = None
+        if location_id:
+            found = self.kg_service.get_locations_by_ids([location_id])
+            current_location = found[0] if found else None
+        
         # Get context for the question
-        context = self._get_context(session_id, location_id)
+        context = self._get_context(session_id, current_location)
         
         # Process the query through multiple strategies
-        response = self._process_query_intelligently(query, context, location_id)
+        response = self._process_query_intelligently(query, context, location_id, current_location)
         
         # Generate follow-up suggestions based on the conversation
-        suggestions = self._generate_dynamic_suggestions(query, response['answer'], location_id)
+        suggestions = self._generate_dynamic_suggestions(query, response['answer'], current_location)
         
         # Add response to conversation history
         self.conversation_history[session_id].append({"role": "assistant", "text": response['answer']})
@@ -125,13 +131,13 @@ class ChatbotService:
             'followUpQuestions': suggestions
         }
     
-    def _process_query_intelligently(self, query, context, location_id):
+    def _process_query_intelligently(self, query, context, location_id, current_location=None):
         """Intelligently process query using multiple strategies"""
         
         # Strategy 1: Intent-based processing first (prioritize specific user actions)
         intent = self._detect_intent(query)
         if intent:
-            intent_response = self._handle_intent(intent, query, location_id, context)
+            intent_response = self._handle_intent(intent, query, location_id, context, current_location)
             if intent_response and intent_response.get('confidence', 0) > 0.7:
                 return intent_response
         
@@ -147,7 +153,7 @@ class ChatbotService:
             
         # Strategy 4: Handle intents with medium confidence
         if intent:
-            intent_response = self._handle_intent(intent, query, location_id, context)
+            intent_response = self._handle_intent(intent, query, location_id, context, current_location)
             if intent_response and intent_response.get('confidence', 0) > 0.5:
                 return intent_response
             
@@ -164,23 +170,21 @@ class ChatbotService:
         # Strategy 7: Fallback response
         return self._generate_contextual_fallback(query, context)
     
-    def _get_context(self, session_id, location_id=None):
+    def _get_context(self, session_id, location=None):
         """Get relevant context for responding to the query"""
         context = ""
         
         # Add location-specific context if available
-        if location_id:
-            location = self.kg_service.get_location_by_id(location_id)
-            if location:
-                context += f"Current location: {location.name}. "
-                context += f"Description: {location.description}. "
-                context += f"Historical period: {location.period}. "
-                context += f"Dynasty: {location.dynasty}. "
-                context += f"History: {location.history}. "
-                
-                # Add cultural facts if available
-                if hasattr(location, 'cultural_facts') and location.cultural_facts:
-                    context += "Cultural facts: " + " ".join(location.cultural_facts[:2]) + ". "
+        if location:
+            context += f"Current location: {location.name}. "
+            context += f"Description: {location.description}. "
+            context += f"Historical period: {location.period}. "
+            context += f"Dynasty: {location.dynasty}. "
+            context += f"History: {location.history}. "
+            
+            # Add cultural facts if available
+            if hasattr(location, 'cultural_facts') and location.cultural_facts:
+                context += "Cultural facts: " + " ".join(location.cultural_facts[:2]) + ". "
         
         # Add conversation history context (last 4 exchanges)
         if session_id in self.conversation_history:
@@ -200,7 +204,7 @@ class ChatbotService:
         last_location = None
 
         for location in all_locations:
-            location_name_lower = location.name.lower()
+            location_name_lower = location.get_normalized().name
             # Find last occurrence of this location name
             pos = context_lower.rfind(location_name_lower)
             if pos > last_position:
@@ -262,7 +266,7 @@ class ChatbotService:
         # Return the most specific intent or the first one found
         return detected_intents[0] if detected_intents else None
     
-    def _handle_intent(self, intent, query, location_id, context):
+    def _handle_intent(self, intent, query, location_id, context, current_location=None):
         """Handle specific intents with appropriate responses"""
         
         if intent == 'greeting':
@@ -284,8 +288,7 @@ class ChatbotService:
                 return self._get_location_info(location_name, location_id)
             elif location_id:
                 # Use current location
-                location = self.kg_service.get_location_by_id(location_id)
-                return self._get_location_info(location.name if location else "", location_id)
+                return self._get_location_info(current_location.name if current_location else "", location_id)
                 
         elif intent == 'best_time':
             location_name = self._extract_location_name(query)
@@ -319,13 +322,12 @@ class ChatbotService:
         """Extract location names from the query"""
         # Get all known locations from our database
         all_locations = self.kg_service.get_all_locations()
-        location_names = [loc.name.lower() for loc in all_locations]
         
         query_lower = query.lower()
         
         # First, try direct name matching in the query
         for location in all_locations:
-            location_name_lower = location.name.lower()
+            location_name_lower = location.get_normalized().name
             if location_name_lower in query_lower:
                 return location.name
         
@@ -340,10 +342,11 @@ class ChatbotService:
         for pattern in location_patterns:
             match = re.search(pattern, query, re.IGNORECASE)
             if match:
-                extracted = match.group(1).strip()
+                extracted = match.group(1).strip().lower()
                 # Check if extracted text matches any known location
                 for location in all_locations:
-                    if location.name.lower() in extracted.lower() or extracted.lower() in location.name.lower():
+                    location_name_lower = location.get_normalized().name
+                    if location_name_lower in extracted or extracted in location_name_lower:
                         return location.name
         
         return None
@@ -365,18 +368,14 @@ class ChatbotService:
             query_lower = query.lower()
             best_matches = []
             
+            query_words = query_lower.split()
+            
             for location in all_locations:
                 score = 0
-                search_text = f"{location.name} {location.description} {location.history} {location.dynasty} {location.period}".lower()
-                
-                # Add cultural facts and tags to search text
-                if hasattr(location, 'cultural_facts'):
-                    search_text += " " + " ".join(location.cultural_facts).lower()
-                if hasattr(location, 'tags'):
-                    search_text += " " + " ".join(location.tags).lower()
+                # Lowercased name, description, history, dynasty, period, facts and tags
+                search_text = location.get_normalized().search_text
                 
                 # Calculate relevance score
-                query_words = query_lower.split()
                 for word in query_words:
                     if len(word) > 2:  # Ignore short words
                         if word in search_text:
@@ -418,20 +417,18 @@ class ChatbotService:
         
         return {'answer': '', 'confidence': 0.0}
     
-    def _generate_dynamic_suggestions(self, query, answer, location_id):
+    def _generate_dynamic_suggestions(self, query, answer, location=None):
         """Generate dynamic follow-up suggestions based on context"""
         suggestions = []
         
         # Location-specific suggestions
-        if location_id:
-            location = self.kg_service.get_location_by_id(location_id)
-            if location:
-                suggestions.extend([
-                    f"Best time to visit {location.name}",
-                    f"How to reach {location.name}",
-                    f"Cultural significance of {location.name}",
-                    f"Architecture of {location.name}"
-                ])
+        if location:
+            suggestions.extend([
+                f"Best time to visit {location.name}",
+                f"How to reach {location.name}",
+                f"Cultural significance of {location.name}",
+                f"Architecture of {location.name}"
+            ])
         
         # Query-based suggestions
         query_lower = query.lower()
@@ -481,10 +478,12 @@ class ChatbotService:
             # Try to find the location in our database
             all_locations = self.kg_service.get_all_locations()
             matching_location = None
+            location_name_lower = location_name.lower()
             
             for location in all_locations:
-                if (location_name.lower() in location.name.lower() or 
-                    location.name.lower() in location_name.lower()):
+                normalized_name = location.get_normalized().name
+                if (location_name_lower in normalized_name or 
+                    normalized_name in location_name_lower):
                     matching_location = location
                     break
             
@@ -4,14 +4,17 @@ Handles loading and processing of cultural heritage data
 """
 
 import logging
-from typing import Dict, List, Any
-from models.location import Location, Legend, Coordinates
+from typing import Dict, List, Any, Tuple
+from models.location import Location, Legend, Coordinates, NormalizedFields, RelationshipGroup
 
 logger = logging.getLogger(__name__)
 
 class DataLoader:
     """Service for loading and managing cultural heritage data"""
     
+    # Attributes that relate two locations when their values are equal
+    RELATIONSHIP_ATTRIBUTES = ('dynasty', 'period', 'category')
+    
     @staticmethod
     def load_placeholder_locations() -> Dict[str, Location]:
         """
@@ -32,6 +35,7 @@ class DataLoader:
                 logger.error(f"Error creating location from data: {e}")
                 continue
         
+        DataLoader.normalize_locations(locations)
         logger.info(f"Successfully loaded {len(locations)} placeholder locations")
         return locations
 
@@ -79,6 +83,7 @@ class DataLoader:
             for loc_data in locations_data:
                 location = Location.from_dict(loc_data)
                 locations[location.id] = location
+            DataLoader.normalize_locations(locations)
             logger.info(f"Loaded {len(locations)} locations from data module")
             return locations
         except ImportError:
@@ -128,23 +133,39 @@ class DataLoader:
         logger.info(f"Created {len(locations)} sample locations")
         return locations
 
+    @staticmethod
+    def normalize_locations(locations: Dict[str, Location]) -> None:
+        """
+        Precompute the lowercased search fields of every location once at load time
+        """
+        for location in locations.values():
+            location.normalized = NormalizedFields.from_location(location)
+
     @staticmethod
     def enrich_with_relationships(locations: Dict[str, Location]) -> None:
         """
         Add relationship information between locations for knowledge graph.
-        ENHANCED: Adds related_locations attribute based on dynasty, period, or category.
+        Locations are bucketed by dynasty, period and category in a single pass; each
+        location references the shared groups it belongs to instead of holding its own
+        list of related ids (see Location.related_locations).
         """
         try:
+            members: Dict[Tuple[str, str], List[str]] = {}
+            for location in locations.values():
+                for attribute in DataLoader.RELATIONSHIP_ATTRIBUTES:
+                    key = (attribute, getattr(location, attribute, ''))
+                    members.setdefault(key, []).append(location.id)
+            
+            groups = {
+                key: RelationshipGroup(attribute=key[0], value=key[1], members=tuple(ids))
+                for key, ids in members.items()
+            }
             for location in locations.values():
-                if not hasattr(location, 'related_locations'):
-                    location.related_locations = []
-                for other_id, other_location in locations.items():
-                    if (location.id != other_id and 
-                        (location.dynasty == other_location.dynasty or
-                         location.period == other_location.period or
-                         location.category == other_location.category)):
-                        location.related_locations.append(other_id)
-            logger.info("Enriched locations with relationship data")
+                location.relationship_groups = tuple(
+                    groups[(attribute, getattr(location, attribute, ''))]
+                    for attribute in DataLoader.RELATIONSHIP_ATTRIBUTES
+                )
+            logger.info(f"Enriched locations with relationship data ({len(groups)} groups)")
         except Exception as e:
             logger.error(f"Error enriching with relationships: {e}")
 
@@ -1,24 +1,127 @@
 # cupe-kg-backend/services/kg_service.py
 
 import logging
-from typing import List, Dict, Any, Optional
+import re
+import time
+import numpy as np
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from models.location import Location
 from services.data_loader import DataLoader
+from services.location_index import InvertedIndex, AttributeIndex, RelatedLocationsTable
+from services.location_cache import LocationCache
+from services.location_columns import LocationColumns
+from services import snapshot
+from utils.helpers import content_hash
+from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Characters with special meaning in Lucene query syntax
+LUCENE_SPECIAL_CHARACTERS = re.compile(r'[+\-&|!(){}\[\]^"~*?:\\/]')
+
+# Cypher shared by the sync service and services/async_kg_service.py
+ALL_LOCATIONS_QUERY = """
+    MATCH (l:Location)
+    RETURN l.id as id, l.name as name, l.description as description,
+           l.category as category, l.history as history, 
+           l.period as period, l.dynasty as dynasty,
+           l.lat as lat, l.lng as lng, l.tags as tags
+"""
+
+# Node properties needed for each projectable API field (see Location.API_FIELDS);
+# fields not stored on the node project to nothing
+NEO4J_FIELD_PROPERTIES = {
+    'id': ('id',),
+    'name': ('name',),
+    'description': ('description',),
+    'category': ('category',),
+    'coordinates': ('lat', 'lng'),
+    'history': ('history',),
+    'period': ('period',),
+    'dynasty': ('dynasty',),
+    'tags': ('tags',)
+}
+
+LOCATION_BY_ID_QUERY = """
+    MATCH (l:Location {id: $id})
+    RETURN l
+"""
+
+# Traverse the edges materialized by scripts/init_neo4j.py; both directions
+# are matched because each pair is stored only once
+RELATED_LOCATIONS_QUERY = """
+    MATCH (l1:Location {id: $location_id})-[r:SAME_DYNASTY|SHARES_THEME]-(l2:Location)
+    WITH l2, sum(r.strength) AS similarity
+    RETURN l2, similarity
+    ORDER BY similarity DESC, l2.id
+    LIMIT $max_results
+"""
+
+FULLTEXT_INDEX_STATE_QUERY = """
+    SHOW FULLTEXT INDEXES YIELD name, state
+    WHERE name = $name
+    RETURN state
+"""
+
+FULLTEXT_SEARCH_QUERY = """
+    CALL db.index.fulltext.queryNodes($index, $query) YIELD node, score
+    RETURN node AS l, score
+    ORDER BY score DESC
+"""
+
+CONTAINS_SEARCH_QUERY = """
+    MATCH (l:Location)
+    WHERE toLower(l.name) CONTAINS toLower($query)
+       OR toLower(l.description) CONTAINS toLower($query)
+       OR toLower(l.history) CONTAINS toLower($query)
+       OR toLower(l.dynasty) CONTAINS toLower($query)
+       OR ANY(tag IN l.tags WHERE toLower(tag) CONTAINS toLower($query))
+    RETURN l
+"""
+
+try:
+    from neo4j.exceptions import ClientError
+except ImportError:
+    # Placeholder-only deployments may not have the driver installed
+    class ClientError(Exception):
+        pass
+
+
+def fulltext_recheck_due(available: Optional[bool], checked_at: float) -> bool:
+    """Whether the full-text index state needs (re)checking: never checked, or missing and the interval passed"""
+    if available is None:
+        return True
+    return not available and time.monotonic() - checked_at >= Config.NEO4J_FULLTEXT_INDEX_RECHECK_INTERVAL
+
+
 class KnowledgeGraphService:
-    def __init__(self, use_placeholder=True):
+    # Everything reload_locations() builds; this is what a dataset snapshot holds
+    SNAPSHOT_ATTRIBUTES = (
+        'placeholder_locations', 'statistics', '_ordered_locations', '_ordinal_by_id',
+        'search_index', 'category_index', 'dynasty_index', 'period_index',
+        'related_table', 'columns', 'dataset_version'
+    )
+    
+    def __init__(self, use_placeholder=True, use_snapshot=True):
         self.use_placeholder = use_placeholder
+        self._fulltext_index_available = None
+        self._fulltext_index_checked_at = 0.0
         
         if not use_placeholder:
             try:
                 from neo4j import GraphDatabase
-                from config import Config
                 
                 self.driver = GraphDatabase.driver(
                     Config.NEO4J_URI, 
-                    auth=(Config.NEO4J_USER, Config.NEO4J_PASSWORD)
+                    auth=(Config.NEO4J_USER, Config.NEO4J_PASSWORD),
+                    max_connection_pool_size=Config.NEO4J_MAX_CONNECTION_POOL_SIZE,
+                    connection_acquisition_timeout=Config.NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+                    max_connection_lifetime=Config.NEO4J_MAX_CONNECTION_LIFETIME
+                )
+                self.location_cache = LocationCache(
+                    ttl=Config.LOCATION_CACHE_TTL,
+                    version_check_interval=Config.LOCATION_CACHE_VERSION_CHECK_INTERVAL,
+                    version_loader=self._fetch_dataset_version
                 )
                 logger.info("Connected to Neo4j database")
             except Exception as e:
@@ -26,165 +129,276 @@ class KnowledgeGraphService:
                 logger.warning("Falling back to placeholder data")
                 self.use_placeholder = True
         
+        if self.use_placeholder and not (use_snapshot and self.load_snapshot()):
+            self.reload_locations()
+    
+    def reload_locations(self):
+        """(Re)load the placeholder dataset and rebuild every index derived from it"""
+        self.placeholder_locations = DataLoader.load_from_data_module()
+        DataLoader.enrich_with_relationships(self.placeholder_locations)
+        logger.info(f"Loaded {len(self.placeholder_locations)} locations")
+        self.statistics = DataLoader.get_statistics(self.placeholder_locations)
+        logger.info(f"Location statistics: {self.statistics}")
+        self._build_indexes()
+    
+    @staticmethod
+    def _snapshot_key() -> bytes:
+        return snapshot.source_hash(Config.RELATED_LOCATIONS_TOP_K, Config.SPATIAL_GRID_CELL_DEG,
+                                  Config.DISTANCE_MATRIX_MAX_LOCATIONS)
+    
+    def save_snapshot(self, path: Optional[str] = None) -> int:
+        """Write the loaded dataset and its indexes to a snapshot file; returns its size"""
+        path = path or Config.SNAPSHOT_PATH
+        state = {name: getattr(self, name) for name in self.SNAPSHOT_ATTRIBUTES}
+        size = snapshot.write_snapshot(path, state, self._snapshot_key())
+        logger.info(f"Wrote dataset snapshot {path} ({size} bytes)")
+        return size
+    
+    def load_snapshot(self, path: Optional[str] = None) -> bool:
+        """Restore the dataset from a snapshot if one exists for the current source data"""
+        path = path or Config.SNAPSHOT_PATH
+        state = snapshot.read_snapshot(path, self._snapshot_key())
+        if not state:
+            return False
+        for name in self.SNAPSHOT_ATTRIBUTES:
+            setattr(self, name, state[name])
+        logger.info(f"Loaded {len(self.placeholder_locations)} locations from snapshot {path}")
+        return True
+    
+    def _build_indexes(self):
+        """Build the in-memory lookup structures over placeholder_locations"""
+        self._ordered_locations = list(self.placeholder_locations.values())
+        self._ordinal_by_id = {location.id: ordinal for ordinal, location in enumerate(self._ordered_locations)}
+        self.search_index = InvertedIndex.build(self.placeholder_locations)
+        self.category_index = AttributeIndex.build(self.placeholder_locations, 'category')
+        self.dynasty_index = AttributeIndex.build(self.placeholder_locations, 'dynasty')
+        self.period_index = AttributeIndex.build(self.placeholder_locations, 'period')
+        self.related_table = RelatedLocationsTable.build(
+            self._ordered_locations, self.dynasty_index, self.period_index, self.category_index,
+            k=Config.RELATED_LOCATIONS_TOP_K
+        )
+        self.columns = LocationColumns.build(self._ordered_locations)
+        # Content hash of the API representation; also warms each location's JSON cache
+        self.dataset_version = content_hash(location.to_json_bytes() for location in self._ordered_locations)
+    
+    def get_dataset_version(self) -> Optional[str]:
+        """
+        Version of the location data, changing whenever any location changes: a content
+        hash in placeholder mode, the :DatasetVersion counter in Neo4j mode (None if unknown)
+        """
         if self.use_placeholder:
-            self.placeholder_locations = DataLoader.load_from_data_module()
-            DataLoader.enrich_with_relationships(self.placeholder_locations)
-            logger.info(f"Loaded {len(self.placeholder_locations)} locations")
-            stats = DataLoader.get_statistics(self.placeholder_locations)
-            logger.info(f"Location statistics: {stats}")
+            return self.dataset_version
+        try:
+            version = self.location_cache.current_version()
+        except Exception as e:
+            logger.error(f"Error reading dataset version: {e}")
+            return None
+        return f"neo4j-{version}" if version is not None else None
+    
+    def get_location_columns(self) -> Optional[LocationColumns]:
+        """Columnar view of the in-memory dataset; None when locations are served from Neo4j"""
+        return self.columns if self.use_placeholder else None
+    
+    def _locations_at(self, ordinals: List[int]) -> List[Location]:
+        return [self._ordered_locations[ordinal] for ordinal in ordinals]
     
     def close(self):
         if not self.use_placeholder and hasattr(self, 'driver'):
             self.driver.close()
     
+    def _session(self):
+        """Open a pooled Neo4j session with the configured fetch size"""
+        return self.driver.session(fetch_size=Config.NEO4J_FETCH_SIZE)
+    
+    @staticmethod
+    def _node_to_location(node) -> Location:
+        """Convert a :Location node (flat lat/lng properties) into a Location"""
+        location_data = dict(node.items())
+        if 'lat' in location_data and 'lng' in location_data:
+            location_data['coordinates'] = {
+                'lat': location_data.pop('lat'),
+                'lng': location_data.pop('lng')
+            }
+        return Location.from_dict(location_data)
+    
+    @staticmethod
+    def _record_to_location(record) -> Location:
+        """Convert a row of ALL_LOCATIONS_QUERY into a Location"""
+        location_data = {
+            'id': record['id'],
+            'name': record['name'],
+            'description': record['description'],
+            'category': record['category'],
+            'coordinates': {
+                'lat': record['lat'],
+                'lng': record['lng']
+            },
+            'history': record['history'] or '',
+            'period': record['period'] or '',
+            'dynasty': record['dynasty'] or '',
+            'tags': record['tags'] or []
+        }
+        return Location.from_dict(location_data)
+    
+    def _fetch_dataset_version(self) -> Optional[int]:
+        """Current dataset version, bumped by writers on the :DatasetVersion node"""
+        with self._session() as session:
+            record = session.run("""
+                MATCH (v:DatasetVersion {id: 'locations'})
+                RETURN v.version as version
+            """).single()
+            return record["version"] if record else None
+    
     def get_all_locations(self) -> List[Location]:
         if self.use_placeholder:
             return list(self.placeholder_locations.values())
         
         try:
-            with self.driver.session() as session:
-                result = session.run("""
-                    MATCH (l:Location)
-                    RETURN l.id as id, l.name as name, l.description as description,
-                           l.category as category, l.history as history, 
-                           l.period as period, l.dynasty as dynasty,
-                           l.lat as lat, l.lng as lng, l.tags as tags
-                """)
-                
-                locations = []
-                for record in result:
-                    location_data = {
-                        'id': record['id'],
-                        'name': record['name'],
-                        'description': record['description'],
-                        'category': record['category'],
-                        'coordinates': {
-                            'lat': record['lat'],
-                            'lng': record['lng']
-                        },
-                        'history': record['history'] or '',
-                        'period': record['period'] or '',
-                        'dynasty': record['dynasty'] or '',
-                        'tags': record['tags'] or []
-                    }
-                    location = Location.from_dict(location_data)
-                    locations.append(location)
-                
-                return locations
+            return self.location_cache.get_all(self._fetch_all_locations)
         except Exception as e:
             logger.error(f"Error fetching locations from Neo4j: {e}")
             logger.warning("Falling back to placeholder data")
             return list(self.placeholder_locations.values())
     
+    def _fetch_all_locations(self) -> List[Location]:
+        with self._session() as session:
+            result = session.run(ALL_LOCATIONS_QUERY)
+            return [self._record_to_location(record) for record in result]
+
+    def get_locations_page(self, offset: int = 0, limit: Optional[int] = None,
+                           fields: Optional[Tuple[str, ...]] = None) -> List[Location]:
+        """
+        One page of all locations in a stable order. In Neo4j mode paging and the field
+        projection are pushed into the query, so only the requested properties are read.
+        """
+        end = offset + limit if limit is not None else None
+        if self.use_placeholder:
+            return self._ordered_locations[offset:end]
+        
+        if fields is None and limit is None and offset == 0:
+            return self.get_all_locations()
+        try:
+            return self._fetch_locations_page(offset, limit, fields)
+        except Exception as e:
+            logger.error(f"Error fetching locations page from Neo4j: {e}")
+            return []
+    
+    @staticmethod
+    def _locations_page_query(limit: Optional[int], fields: Optional[Tuple[str, ...]]) -> str:
+        if fields is None:
+            projection = 'l'
+        else:
+            properties = dict.fromkeys(prop for name in fields for prop in NEO4J_FIELD_PROPERTIES.get(name, ()))
+            projection = 'l {' + ', '.join(f'.{prop}' for prop in properties) + '}'
+        return f"""
+            MATCH (l:Location)
+            RETURN {projection} AS l
+            ORDER BY l.id
+            SKIP $offset
+        """ + ("LIMIT $limit" if limit is not None else "")
+    
+    def _fetch_locations_page(self, offset: int, limit: Optional[int],
+                              fields: Optional[Tuple[str, ...]]) -> List[Location]:
+        with self._session() as session:
+            result = session.run(self._locations_page_query(limit, fields), offset=offset, limit=limit)
+            return [self._node_to_location(record["l"]) for record in result]
+    
+    def iter_locations(self, offset: int = 0, limit: Optional[int] = None,
+                       fields: Optional[Tuple[str, ...]] = None) -> Iterator[Location]:
+        """
+        Like get_locations_page, but yields locations as they are read. In Neo4j mode rows
+        are streamed from the driver (fetch_size at a time) instead of collected into a list;
+        a query error ends the stream early.
+        """
+        if self.use_placeholder:
+            yield from self.get_locations_page(offset, limit, fields)
+            return
+        
+        try:
+            with self._session() as session:
+                result = session.run(self._locations_page_query(limit, fields), offset=offset, limit=limit)
+                for record in result:
+                    yield self._node_to_location(record["l"])
+        except Exception as e:
+            logger.error(f"Error streaming locations from Neo4j: {e}")
+    
     def get_location_by_id(self, location_id: str) -> Optional[Location]:
         if self.use_placeholder:
             return self.placeholder_locations.get(location_id)
         
         try:
-            with self.driver.session() as session:
-                result = session.run("""
-                    MATCH (l:Location {id: $id})
-                    RETURN l
-                """, id=location_id)
-                
-                record = result.single()
-                if record:
-                    node = record["l"]
-                    location_data = dict(node.items())
-                    if 'lat' in location_data and 'lng' in location_data:
-                        location_data['coordinates'] = {
-                            'lat': location_data.pop('lat'),
-                            'lng': location_data.pop('lng')
-                        }
-                    return Location.from_dict(location_data)
-                return None
+            return self.location_cache.get(location_id, self._fetch_location_by_id)
         except Exception as e:
             logger.error(f"Error fetching location {location_id} from Neo4j: {e}")
             return self.placeholder_locations.get(location_id)
+    
+    def _fetch_location_by_id(self, location_id: str) -> Optional[Location]:
+        with self._session() as session:
+            result = session.run(LOCATION_BY_ID_QUERY, id=location_id)
+            
+            record = result.single()
+            if record:
+                return self._node_to_location(record["l"])
+            return None
+
+    def get_locations_by_ids(self, location_ids: List[str]) -> List[Location]:
+        """
+        Fetch several locations in one round trip. Results follow the order of
+        location_ids; unknown ids are skipped.
+        """
+        if not location_ids:
+            return []
+        
+        if self.use_placeholder:
+            return [self.placeholder_locations[location_id] for location_id in location_ids
+                    if location_id in self.placeholder_locations]
+        
+        try:
+            return self.location_cache.get_many(location_ids, self._fetch_locations_by_ids)
+        except Exception as e:
+            logger.error(f"Error fetching locations {location_ids} from Neo4j: {e}")
+            return []
+    
+    def _fetch_locations_by_ids(self, location_ids: List[str]) -> List[Location]:
+        with self._session() as session:
+            result = session.run("""
+                UNWIND $ids AS id
+                MATCH (l:Location {id: id})
+                RETURN l
+            """, ids=location_ids)
+            return [self._node_to_location(record["l"]) for record in result]
 
     def get_related_locations(self, location_id, max_results=5):
         if self.use_placeholder:
             try:
-                current_location = self.placeholder_locations.get(location_id)
-                if not current_location:
+                ordinal = self._ordinal_by_id.get(location_id)
+                if ordinal is None:
                     return []
                 
-                related = []
-                for loc_id, location in self.placeholder_locations.items():
-                    if loc_id != location_id:
-                        similarity_score = 0
-                        if (hasattr(current_location, 'dynasty') and hasattr(location, 'dynasty') and
-                            current_location.dynasty == location.dynasty):
-                            similarity_score += 3
-                        if (hasattr(current_location, 'period') and hasattr(location, 'period') and
-                            current_location.period == location.period):
-                            similarity_score += 2
-                        if (hasattr(current_location, 'category') and hasattr(location, 'category') and
-                            current_location.category == location.category):
-                            similarity_score += 1
-                        
-                        if similarity_score > 0:
-                            related.append({
-                                'location': location.to_dict(),
-                                'similarity_score': similarity_score
-                            })
-                
-                related.sort(key=lambda x: x['similarity_score'], reverse=True)
-                return [item['location'] for item in related[:max_results]]
+                related = self.related_table.neighbours(ordinal, max_results)
+                return [location.to_dict() for location in self._locations_at(related)]
             except Exception as e:
                 logger.error(f"Error getting related locations: {e}")
                 return []
         
         try:
-            with self.driver.session() as session:
-                result = session.run("""
-                    MATCH (l1:Location {id: $location_id})
-                    MATCH (l2:Location)
-                    WHERE l1 <> l2 AND (
-                        l1.dynasty = l2.dynasty OR 
-                        l1.period = l2.period OR 
-                        l1.category = l2.category
-                    )
-                    RETURN l2, 
-                    CASE 
-                        WHEN l1.dynasty = l2.dynasty THEN 3
-                        WHEN l1.period = l2.period THEN 2  
-                        WHEN l1.category = l2.category THEN 1
-                        ELSE 0
-                    END as similarity
-                    ORDER BY similarity DESC
-                    LIMIT $max_results
-                """, location_id=location_id, max_results=max_results)
-                
-                related_locations = []
-                for record in result:
-                    location_data = record["l2"]
-                    location = Location(
-                        id=location_data["id"],
-                        name=location_data["name"],
-                        description=location_data.get("description", ""),
-                        category=location_data.get("category", ""),
-                        coordinates={"lat": location_data.get("lat"), "lng": location_data.get("lng")},
-                        history=location_data.get("history", ""),
-                        period=location_data.get("period", ""),
-                        dynasty=location_data.get("dynasty", "")
-                    )
-                    related_locations.append(location.to_dict())
-                
-                return related_locations
+            related = self.location_cache.get_related(location_id, max_results, self._fetch_related_locations)
+            return [location.to_dict() for location in related]
         except Exception as e:
             logger.error(f"Error querying related locations from Neo4j: {e}")
             return []
 
+    def _fetch_related_locations(self, location_id: str, max_results: int) -> List[Location]:
+        with self._session() as session:
+            result = session.run(RELATED_LOCATIONS_QUERY, location_id=location_id, max_results=max_results)
+            return [self._node_to_location(record["l2"]) for record in result]
+
     def get_locations_by_category(self, category: str) -> List[Location]:
         if self.use_placeholder:
-            return [
-                loc for loc in self.placeholder_locations.values()
-                if hasattr(loc, 'category') and loc.category and category.lower() in loc.category.lower()
-            ]
+            return self._locations_at(self.category_index.containing(category))
         
         try:
-            with self.driver.session() as session:
+            with self._session() as session:
                 result = session.run("""
                     MATCH (l:Location {category: $category})
                     RETURN l
@@ -192,15 +406,7 @@ class KnowledgeGraphService:
                 
                 locations = []
                 for record in result:
-                    node = record["l"]
-                    location_data = dict(node.items())
-                    if 'lat' in location_data and 'lng' in location_data:
-                        location_data['coordinates'] = {
-                            'lat': location_data.pop('lat'),
-                            'lng': location_data.pop('lng')
-                        }
-                    location = Location.from_dict(location_data)
-                    locations.append(location)
+                    locations.append(self._node_to_location(record["l"]))
                 return locations
         except Exception as e:
             logger.error(f"Error fetching locations by category {category}: {e}")
@@ -211,14 +417,10 @@ class KnowledgeGraphService:
 
     def get_locations_by_period(self, period: str) -> List[Location]:
         if self.use_placeholder:
-            filtered_locations = []
-            for location in self.placeholder_locations.values():
-                if hasattr(location, 'period') and location.period and period.lower() in location.period.lower():
-                    filtered_locations.append(location)
-            return filtered_locations
+            return self._locations_at(self.period_index.containing(period))
         
         try:
-            with self.driver.session() as session:
+            with self._session() as session:
                 result = session.run("""
                     MATCH (l:Location)
                     WHERE toLower(l.period) CONTAINS toLower($period)
@@ -227,15 +429,7 @@ class KnowledgeGraphService:
                 
                 locations = []
                 for record in result:
-                    node = record["l"]
-                    location_data = dict(node.items())
-                    if 'lat' in location_data and 'lng' in location_data:
-                        location_data['coordinates'] = {
-                            'lat': location_data.pop('lat'),
-                            'lng': location_data.pop('lng')
-                        }
-                    location = Location.from_dict(location_data)
-                    locations.append(location)
+                    locations.append(self._node_to_location(record["l"]))
                 return locations
         except Exception as e:
             logger.error(f"Error getting locations by period: {e}")
@@ -243,11 +437,10 @@ class KnowledgeGraphService:
 
     def get_locations_by_dynasty(self, dynasty: str) -> List[Location]:
         if self.use_placeholder:
-            return [loc for loc in self.placeholder_locations.values() 
-                   if dynasty.lower() in loc.dynasty.lower()]
+            return self._locations_at(self.dynasty_index.containing(dynasty))
         
         try:
-            with self.driver.session() as session:
+            with self._session() as session:
                 result = session.run("""
                     MATCH (l:Location)
                     WHERE toLower(l.dynasty) CONTAINS toLower($dynasty)
@@ -256,61 +449,165 @@ class KnowledgeGraphService:
                 
                 locations = []
                 for record in result:
-                    node = record["l"]
-                    location_data = dict(node.items())
-                    if 'lat' in location_data and 'lng' in location_data:
-                        location_data['coordinates'] = {
-                            'lat': location_data.pop('lat'),
-                            'lng': location_data.pop('lng')
-                        }
-                    location = Location.from_dict(location_data)
-                    locations.append(location)
+                    locations.append(self._node_to_location(record["l"]))
                 return locations
         except Exception as e:
             logger.error(f"Error fetching locations by dynasty {dynasty}: {e}")
             return [loc for loc in self.placeholder_locations.values() 
                    if dynasty.lower() in loc.dynasty.lower()]
 
+    def filter_locations(self, category: Optional[str] = None, period: Optional[str] = None,
+                         dynasty: Optional[str] = None, tags: Optional[List[str]] = None,
+                         query: Optional[str] = None) -> List[Location]:
+        """
+        Locations with exactly the given category, a period/dynasty containing the given
+        text, any of the given tags and the query (case-insensitive) in the name, description
+        or history. Empty criteria are ignored.
+        """
+        query_lower = query.lower() if query else None
+        
+        if not self.use_placeholder:
+            checks = []
+            if category:
+                checks.append(lambda loc: loc.category == category)
+            if period:
+                checks.append(lambda loc: period in loc.period)
+            if dynasty:
+                checks.append(lambda loc: dynasty in loc.dynasty)
+            if tags:
+                checks.append(lambda loc: any(tag in loc.tags for tag in tags))
+            if query_lower:
+                checks.append(lambda loc: query_lower in loc.get_normalized().name
+                              or query_lower in loc.get_normalized().description
+                              or query_lower in loc.get_normalized().history)
+            return [loc for loc in self.get_all_locations() if all(check(loc) for check in checks)]
+        
+        # Categorical criteria are evaluated once per distinct value and combined as masks
+        columns = self.columns
+        mask = columns.all()
+        if category:
+            mask &= columns.category.mask(lambda value: value == category, normalized=False)
+        if period:
+            mask &= columns.era.mask(lambda value: period in value, normalized=False)
+        if dynasty:
+            mask &= columns.dynasty.mask(lambda value: dynasty in value, normalized=False)
+        if tags:
+            mask &= columns.tag_mask(lambda tag: tag in tags, normalized=False)
+        if query_lower:
+            def contains_query(text):
+                return query_lower in text
+            mask &= (columns.text_mask(columns.names, contains_query) |
+                     columns.text_mask(columns.descriptions, contains_query) |
+                     columns.text_mask(columns.histories, contains_query))
+        return columns.locations_at(np.flatnonzero(mask))
+
+    def _fulltext_index_exists(self) -> bool:
+        """
+        Whether the full-text index from scripts/init_neo4j.py is online. A found index is
+        remembered; a missing one is looked up again every NEO4J_FULLTEXT_INDEX_RECHECK_INTERVAL
+        seconds so an index created (or brought online) later gets picked up.
+        """
+        if fulltext_recheck_due(self._fulltext_index_available, self._fulltext_index_checked_at):
+            self._fulltext_index_checked_at = time.monotonic()
+            try:
+                with self._session() as session:
+                    record = session.run(FULLTEXT_INDEX_STATE_QUERY, name=Config.NEO4J_FULLTEXT_INDEX).single()
+            except ClientError as e:
+                logger.warning(f"Could not list full-text indexes: {e}")
+                record = None
+            self._fulltext_index_available = bool(record) and record["state"] == 'ONLINE'
+            if not self._fulltext_index_available:
+                logger.warning(f"Full-text index '{Config.NEO4J_FULLTEXT_INDEX}' not available, "
+                               f"search will scan all locations")
+        return self._fulltext_index_available
+    
+    @staticmethod
+    def _to_lucene_query(query: str) -> str:
+        """All query words must match; the last one may be a prefix of an indexed word"""
+        terms = [LUCENE_SPECIAL_CHARACTERS.sub(r'\\\g<0>', term) for term in query.lower().split()]
+        if not terms:
+            return '""'
+        terms[-1] += '*'
+        return ' AND '.join(terms)
+    
+    def _fulltext_search(self, query: str) -> List[Location]:
+        with self._session() as session:
+            result = session.run(FULLTEXT_SEARCH_QUERY, index=Config.NEO4J_FULLTEXT_INDEX,
+                                 query=self._to_lucene_query(query))
+            return [self._node_to_location(record["l"]) for record in result]
+
+    def _placeholder_search(self, query: str) -> List[Location]:
+        """
+        Token / prefix matches from the inverted index. When it finds nothing, fall back to
+        matching the query as a substring of each location's searchable text (the original
+        scan), so queries starting inside a word or spanning punctuation still find results.
+        """
+        ids = self.search_index.search(query)
+        if ids:
+            return [self.placeholder_locations[location_id] for location_id in ids]
+        query_lower = query.lower()
+        return [location for location in self._ordered_locations
+                if query_lower in InvertedIndex.searchable_text(location).lower()]
+
     def search_locations(self, query: str) -> List[Location]:
         if self.use_placeholder:
-            query_lower = query.lower()
-            results = []
-            for location in self.placeholder_locations.values():
-                searchable_text = f"{location.name} {location.description} {location.history} {location.dynasty} {' '.join(location.tags)} {' '.join(location.cultural_facts)}"
-                if query_lower in searchable_text.lower():
-                    results.append(location)
-            return results
+            return self._placeholder_search(query)
         
         try:
-            with self.driver.session() as session:
-                result = session.run("""
-                    MATCH (l:Location)
-                    WHERE toLower(l.name) CONTAINS toLower($query)
-                       OR toLower(l.description) CONTAINS toLower($query)
-                       OR toLower(l.history) CONTAINS toLower($query)
-                       OR toLower(l.dynasty) CONTAINS toLower($query)
-                       OR ANY(tag IN l.tags WHERE toLower(tag) CONTAINS toLower($query))
-                    RETURN l
-                """, query=query)
+            if self._fulltext_index_exists():
+                try:
+                    return self._fulltext_search(query)
+                except ClientError as e:
+                    logger.warning(f"Full-text search failed, falling back to CONTAINS scan: {e}")
+                    self._fulltext_index_available = None
+            
+            with self._session() as session:
+                result = session.run(CONTAINS_SEARCH_QUERY, query=query)
                 
                 locations = []
                 for record in result:
-                    node = record["l"]
-                    location_data = dict(node.items())
-                    if 'lat' in location_data and 'lng' in location_data:
-                        location_data['coordinates'] = {
-                            'lat': location_data.pop('lat'),
-                            'lng': location_data.pop('lng')
-                        }
-                    location = Location.from_dict(location_data)
-                    locations.append(location)
+                    locations.append(self._node_to_location(record["l"]))
                 return locations
         except Exception as e:
             logger.error(f"Error searching locations with query '{query}': {e}")
             query_lower = query.lower()
             return [loc for loc in self.placeholder_locations.values() 
-                   if query_lower in f"{loc.name} {loc.description} {loc.history}".lower()]
+                   if query_lower in loc.get_normalized().name
+                   or query_lower in loc.get_normalized().description
+                   or query_lower in loc.get_normalized().history]
 
+    def iter_search_locations(self, query: str) -> Iterator[Location]:
+        """
+        Like search_locations, but yields matches as they are read. In Neo4j mode rows are
+        streamed from the driver; an error after the first row ends the stream early.
+        """
+        if self.use_placeholder:
+            yield from self._placeholder_search(query)
+            return
+        
+        yielded = False
+        try:
+            with self._session() as session:
+                if self._fulltext_index_exists():
+                    try:
+                        result = session.run(FULLTEXT_SEARCH_QUERY, index=Config.NEO4J_FULLTEXT_INDEX,
+                                             query=self._to_lucene_query(query))
+                        for record in result:
+                            yielded = True
+                            yield self._node_to_location(record["l"])
+                        return
+                    except ClientError as e:
+                        if yielded:
+                            raise
+                        logger.warning(f"Full-text search failed, falling back to CONTAINS scan: {e}")
+                        self._fulltext_index_available = None
+                
+                result = session.run(CONTAINS_SEARCH_QUERY, query=query)
+                for record in result:
+                    yield self._node_to_location(record["l"])
+        except Exception as e:
+            logger.error(f"Error streaming search results for '{query}': {e}")
+    
     def get_cultural_themes(self) -> List[str]:
         if self.use_placeholder:
             all_themes = set()
@@ -320,7 +617,7 @@ class KnowledgeGraphService:
             return sorted(list(all_themes))
         
         try:
-            with self.driver.session() as session:
+            with self._session() as session:
                 result = session.run("""
                     MATCH (l:Location)
                     UNWIND l.tags as tag
@@ -345,7 +642,7 @@ class KnowledgeGraphService:
             return sorted(list(dynasties))
         
         try:
-            with self.driver.session() as session:
+            with self._session() as session:
                 result = session.run("""
                     MATCH (l:Location)
                     WHERE l.dynasty IS NOT NULL AND l.dynasty <> ''
@@ -367,7 +664,7 @@ class KnowledgeGraphService:
             return DataLoader.get_statistics(self.placeholder_locations)
         
         try:
-            with self.driver.session() as session:
+            with self._session() as session:
                 location_count = session.run("MATCH (l:Location) RETURN count(l) as count").single()["count"]
                 category_result = session.run("""
                     MATCH (l:Location)
@@ -0,0 +1,155 @@
+# cupe-kg-backend/services/location_cache.py
+
+"""
+Read-through cache for location reads from the Neo4j knowledge graph
+Entries expire after a TTL and are dropped as soon as the dataset version changes
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from models.location import Location
+
+logger = logging.getLogger(__name__)
+
+
+class LocationCache:
+    """
+    Caches the full location list, individual locations by id and the related-location ids
+    of each location. The list and by-id entries are filled separately: list entries are
+    partial (list columns only) while by-id entries are full nodes.
+
+    get/get_many/get_related take synchronous loaders; async callers use lookup/store and
+    lookup_related/store_related around their own awaited queries.
+
+    Writers bump a dataset version (see scripts/init_neo4j.py); the cache polls it at
+    most once per version_check_interval seconds, so steady-state reads are served
+    without touching the database.
+    """
+
+    def __init__(self, ttl: float, version_check_interval: float,
+                 version_loader: Callable[[], Optional[int]]):
+        self.ttl = ttl
+        self.version_check_interval = version_check_interval
+        self._version_loader = version_loader
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._version_checked_at = 0.0
+        self._all: Optional[Tuple[float, List[Location]]] = None
+        self._by_id: Dict[str, Tuple[float, Location]] = {}
+        self._related: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+
+    def invalidate(self):
+        with self._lock:
+            self._all = None
+            self._by_id = {}
+            self._related = {}
+
+    def _check_version(self):
+        """Drop every entry if the dataset version moved since the last check"""
+        now = time.monotonic()
+        if now - self._version_checked_at < self.version_check_interval:
+            return
+        self._version_checked_at = now
+        try:
+            version = self._version_loader()
+        except Exception as e:
+            logger.warning(f"Could not read dataset version, keeping cached locations: {e}")
+            return
+        with self._lock:
+            if version != self._version:
+                if self._version is not None:
+                    logger.info(f"Dataset version changed {self._version} -> {version}, clearing location cache")
+                self._version = version
+                self._all = None
+                self._by_id = {}
+                self._related = {}
+
+    def current_version(self) -> Optional[int]:
+        """Dataset version the cached entries belong to (re-polled at most once per interval)"""
+        self._check_version()
+        return self._version
+
+    def get_all(self, loader: Callable[[], List[Location]]) -> List[Location]:
+        self._check_version()
+        now = time.monotonic()
+        cached = self._all
+        if cached and cached[0] > now:
+            return list(cached[1])
+
+        locations = loader()
+        with self._lock:
+            # List rows carry only the list columns, so they must not answer by-id lookups
+            self._all = (now + self.ttl, locations)
+        return list(locations)
+
+    def lookup(self, location_ids: List[str]) -> Tuple[Dict[str, Location], List[str]]:
+        """Cached locations for location_ids by id, and the (de-duplicated) ids that missed"""
+        self._check_version()
+        now = time.monotonic()
+        found: Dict[str, Location] = {}
+        missing = []
+        for location_id in dict.fromkeys(location_ids):
+            cached = self._by_id.get(location_id)
+            if cached and cached[0] > now:
+                found[location_id] = cached[1]
+            else:
+                missing.append(location_id)
+        return found, missing
+
+    def store(self, locations: List[Location]):
+        """Cache full location nodes by id"""
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            for location in locations:
+                self._by_id[location.id] = (expires, location)
+
+    def get(self, location_id: str, loader: Callable[[str], Optional[Location]]) -> Optional[Location]:
+        found, missing = self.lookup([location_id])
+        if not missing:
+            return found[location_id]
+
+        location = loader(location_id)
+        if location is not None:
+            self.store([location])
+        return location
+
+    def get_many(self, location_ids: List[str],
+                 loader: Callable[[List[str]], List[Location]]) -> List[Location]:
+        """Cached lookup of several ids; only the misses are passed to loader in one call"""
+        found, missing = self.lookup(location_ids)
+        if missing:
+            loaded = loader(missing)
+            self.store(loaded)
+            found.update((location.id, location) for location in loaded)
+        return [found[location_id] for location_id in location_ids if location_id in found]
+
+    def lookup_related(self, location_id: str, max_results: int) -> Optional[List[Location]]:
+        """
+        Cached related locations of location_id, or None on a miss. A hit needs both the
+        related id list and every location in it to still be cached.
+        """
+        self._check_version()
+        cached = self._related.get((location_id, max_results))
+        if not cached or cached[0] <= time.monotonic():
+            return None
+        found, missing = self.lookup(cached[1])
+        if missing:
+            return None
+        return [found[related_id] for related_id in cached[1]]
+
+    def store_related(self, location_id: str, max_results: int, related: List[Location]):
+        """Cache the related locations of location_id, in order, along with the nodes themselves"""
+        self.store(related)
+        with self._lock:
+            self._related[(location_id, max_results)] = (time.monotonic() + self.ttl,
+                                                          [location.id for location in related])
+
+    def get_related(self, location_id: str, max_results: int,
+                    loader: Callable[[str, int], List[Location]]) -> List[Location]:
+        related = self.lookup_related(location_id, max_results)
+        if related is None:
+            related = loader(location_id, max_results)
+            self.store_related(location_id, max_results, related)
+        return related
@@ -0,0 +1,231 @@
+# cupe-kg-backend/services/location_columns.py
+
+"""
+Columnar (NumPy) view of the loaded location set for CuPe-KG
+Filters and scores are evaluated once per distinct value and broadcast to every
+location as boolean masks, instead of walking Location objects one at a time
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional
+import numpy as np
+from config import Config
+from models.location import Location
+from services.spatial_index import GridIndex
+from utils.geo import coordinate_arrays, haversine_km, haversine_matrix_km
+
+logger = logging.getLogger(__name__)
+
+
+class CodedColumn:
+    """
+    A categorical column stored as integer codes into a vocabulary of distinct values.
+    The vocabulary keeps first-seen order; a lowercased copy is kept for matching.
+    """
+
+    def __init__(self, values: List[str]):
+        codes_by_value: Dict[str, int] = {}
+        self.codes = np.fromiter(
+            (codes_by_value.setdefault(value or '', len(codes_by_value)) for value in values),
+            dtype=np.int32, count=len(values)
+        )
+        self.vocabulary = list(codes_by_value)
+        self.normalized_vocabulary = [value.lower().strip() for value in self.vocabulary]
+
+    def mask(self, predicate: Callable[[str], bool], normalized: bool = True) -> np.ndarray:
+        """Rows whose value satisfies predicate (evaluated once per distinct value)"""
+        vocabulary = self.normalized_vocabulary if normalized else self.vocabulary
+        hits = np.fromiter((bool(predicate(value)) for value in vocabulary),
+                           dtype=bool, count=len(vocabulary))
+        return hits[self.codes]
+
+
+class LocationColumns:
+    """
+    Column arrays parallel to the load order of the locations (row i is ordinal i):
+    float64 lat/lng, integer-coded category, dynasty and era (period) columns, a boolean
+    location x tag matrix and the lowercased per-row text fields, plus a GridIndex over
+    lat/lng for radius queries and an all-pairs float32 distance matrix (km) that route
+    code slices with distance_submatrix().
+    Masks that depend only on the dataset can be memoized with cached_mask().
+    """
+
+    def __init__(self):
+        self.locations: List[Location] = []
+        self.ids: List[str] = []
+        self.row_by_id: Dict[str, int] = {}
+        self.lat = np.empty(0)
+        self.lng = np.empty(0)
+        self.grid: Optional[GridIndex] = None
+        # Built on first use by all_pairs_distances()
+        self.distance_matrix: Optional[np.ndarray] = None
+        self._distance_matrix_ready = False
+        self.category: Optional[CodedColumn] = None
+        self.dynasty: Optional[CodedColumn] = None
+        self.era: Optional[CodedColumn] = None
+        self.tag_vocabulary: List[str] = []
+        self.normalized_tag_vocabulary: List[str] = []
+        self.tag_matrix = np.zeros((0, 0), dtype=bool)
+        self.names: List[str] = []
+        self.descriptions: List[str] = []
+        self.histories: List[str] = []
+        self._mask_cache: 'OrderedDict[Hashable, np.ndarray]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getstate__(self):
+        # Masks and the distance matrix are cheap to rebuild; the lock cannot be pickled into a snapshot
+        state = self.__dict__.copy()
+        state['_mask_cache'] = OrderedDict()
+        state['distance_matrix'] = None
+        state['_distance_matrix_ready'] = False
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, locations: List[Location]) -> 'LocationColumns':
+        columns = cls()
+        count = len(locations)
+        columns.locations = list(locations)
+        columns.ids = [location.id for location in locations]
+        columns.row_by_id = {location_id: row for row, location_id in enumerate(columns.ids)}
+
+        columns.lat, columns.lng = coordinate_arrays(locations)
+        for row in np.flatnonzero(np.isnan(columns.lat)):
+            logger.warning(f"Location {columns.ids[row]} has no usable coordinates")
+        columns.grid = GridIndex.build(columns.lat, columns.lng, Config.SPATIAL_GRID_CELL_DEG)
+
+        columns.category = CodedColumn([location.category for location in locations])
+        columns.dynasty = CodedColumn([location.dynasty for location in locations])
+        columns.era = CodedColumn([location.period for location in locations])
+
+        tag_codes: Dict[str, int] = {}
+        rows, cols = [], []
+        for row, location in enumerate(locations):
+            for tag in location.tags:
+                rows.append(row)
+                cols.append(tag_codes.setdefault(tag, len(tag_codes)))
+        columns.tag_vocabulary = list(tag_codes)
+        columns.normalized_tag_vocabulary = [tag.lower().strip() for tag in columns.tag_vocabulary]
+        columns.tag_matrix = np.zeros((count, len(tag_codes)), dtype=bool)
+        columns.tag_matrix[rows, cols] = True
+
+        normalized = [location.get_normalized() for location in locations]
+        columns.names = [fields.name for fields in normalized]
+        columns.descriptions = [fields.description for fields in normalized]
+        columns.histories = [fields.history for fields in normalized]
+
+        logger.info(f"Built location columns: {count} locations, {len(tag_codes)} tags, "
+                    f"{len(columns.category.vocabulary)} categories, {len(columns.dynasty.vocabulary)} dynasties, "
+                    f"{len(columns.era.vocabulary)} eras")
+        return columns
+
+    def all_pairs_distances(self) -> Optional[np.ndarray]:
+        """
+        The all-pairs float32 distance matrix, built on the first call so processes that never
+        plan a route (or read the memory-mapped store instead) do not pay for it.
+        None above Config.DISTANCE_MATRIX_MAX_LOCATIONS.
+        """
+        if not self._distance_matrix_ready:
+            with self._lock:
+                if not self._distance_matrix_ready:
+                    self.distance_matrix = self._build_distance_matrix()
+                    self._distance_matrix_ready = True
+        return self.distance_matrix
+
+    def _build_distance_matrix(self, block_rows: int = 1024) -> Optional[np.ndarray]:
+        count = len(self.ids)
+        if count > Config.DISTANCE_MATRIX_MAX_LOCATIONS:
+            logger.info(f"Skipping the all-pairs distance matrix for {count} locations "
+                        f"(limit {Config.DISTANCE_MATRIX_MAX_LOCATIONS})")
+            return None
+        matrix = np.empty((count, count), dtype=np.float32)
+        # Row blocks keep the float64 intermediates small
+        for start in range(0, count, block_rows):
+            stop = min(start + block_rows, count)
+            block = haversine_matrix_km(self.lat[start:stop], self.lng[start:stop], self.lat, self.lng)
+            matrix[start:stop] = np.where(np.isnan(block), np.inf, block)
+        logger.info(f"Built {count}x{count} distance matrix ({matrix.nbytes} bytes)")
+        return matrix
+
+    def locations_at(self, rows) -> List[Location]:
+        return [self.locations[row] for row in rows]
+
+    def all(self) -> np.ndarray:
+        return np.ones(len(self.ids), dtype=bool)
+
+    def none(self) -> np.ndarray:
+        return np.zeros(len(self.ids), dtype=bool)
+
+    def tag_mask(self, predicate: Callable[[str], bool], normalized: bool = True) -> np.ndarray:
+        """Rows carrying at least one tag that satisfies predicate"""
+        vocabulary = self.normalized_tag_vocabulary if normalized else self.tag_vocabulary
+        hits = np.fromiter((bool(predicate(tag)) for tag in vocabulary),
+                           dtype=bool, count=len(vocabulary))
+        if not hits.any():
+            return self.none()
+        return self.tag_matrix[:, hits].any(axis=1)
+
+    @staticmethod
+    def text_mask(texts: List[str], predicate: Callable[[str], bool]) -> np.ndarray:
+        """Rows of a per-row text column (names, descriptions, histories) satisfying predicate"""
+        return np.fromiter((bool(predicate(text)) for text in texts), dtype=bool, count=len(texts))
+
+    def cached_mask(self, key: Hashable, build: Callable[[], np.ndarray]) -> np.ndarray:
+        """
+        Memoize a mask that only depends on the dataset; callers must not modify it.
+        Keys can come from client input, so only the MASK_CACHE_SIZE most recently used are kept.
+        """
+        with self._lock:
+            mask = self._mask_cache.get(key)
+            if mask is not None:
+                self._mask_cache.move_to_end(key)
+                return mask
+        mask = build()
+        mask.setflags(write=False)
+        with self._lock:
+            self._mask_cache[key] = mask
+            self._mask_cache.move_to_end(key)
+            while len(self._mask_cache) > Config.MASK_CACHE_SIZE:
+                self._mask_cache.popitem(last=False)
+        return mask
+
+    def distances_from(self, lat: float, lng: float) -> np.ndarray:
+        """Haversine distance in km from a point to every location (inf without coordinates)"""
+        distances = haversine_km(lat, lng, self.lat, self.lng)
+        return np.where(np.isnan(distances), np.inf, distances)
+
+    def rows_within(self, lat: float, lng: float, radius_km: float):
+        """
+        Rows within radius_km of a point, in row order, with their haversine distances.
+        Only rows in grid cells the search circle reaches are measured.
+        """
+        rows = self.grid.candidates(lat, lng, radius_km)
+        distances = haversine_km(lat, lng, self.lat[rows], self.lng[rows])
+        within = distances <= radius_km
+        return rows[within], distances[within]
+
+    def rows_for(self, locations) -> Optional[np.ndarray]:
+        """Rows of the given locations, or None if any of them is not part of the dataset"""
+        rows = [self.row_by_id.get(location.id) for location in locations]
+        if any(row is None for row in rows):
+            return None
+        return np.array(rows, dtype=np.int64)
+
+    def distance_submatrix(self, rows_a: np.ndarray, rows_b: Optional[np.ndarray] = None) -> np.ndarray:
+        """float32 km between rows_a (matrix rows) and rows_b (columns, default rows_a); inf without coordinates"""
+        if rows_b is None:
+            rows_b = rows_a
+        matrix = self.all_pairs_distances()
+        if matrix is not None:
+            return matrix[np.ix_(rows_a, rows_b)]
+        block = haversine_matrix_km(self.lat[rows_a], self.lng[rows_a], self.lat[rows_b], self.lng[rows_b])
+        return np.where(np.isnan(block), np.inf, block).astype(np.float32)
@@ -0,0 +1,249 @@
+# cupe-kg-backend/services/location_index.py
+
+"""
+In-memory indexes over the loaded location set for CuPe-KG
+Built once after the data is loaded so request handlers never scan every location
+"""
+
+import logging
+import re
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Set
+from models.location import Location
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens"""
+    if not text:
+        return []
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class InvertedIndex:
+    """
+    Positional inverted index: token -> {location ordinal: [positions]}
+    Ordinals follow the load order of the locations so results keep a stable order.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, List[int]]] = {}
+        self._vocabulary: List[str] = []
+        self._location_ids: List[str] = []
+
+    @staticmethod
+    def _searchable_fields(location: Location) -> List[str]:
+        """Fields covered by text search, in the order they are tokenized"""
+        return [
+            location.name,
+            location.description,
+            location.history,
+            location.dynasty,
+            ' '.join(location.tags),
+            ' '.join(location.cultural_facts)
+        ]
+
+    @classmethod
+    def searchable_text(cls, location: Location) -> str:
+        """The searchable fields joined into one string, as matched by substring search"""
+        return ' '.join(cls._searchable_fields(location))
+
+    @classmethod
+    def build(cls, locations: Dict[str, Location]) -> 'InvertedIndex':
+        index = cls()
+        for ordinal, location in enumerate(locations.values()):
+            index._location_ids.append(location.id)
+            position = 0
+            for text in cls._searchable_fields(location):
+                for token in tokenize(text):
+                    index._postings.setdefault(token, {}).setdefault(ordinal, []).append(position)
+                    position += 1
+
+        index._vocabulary = sorted(index._postings)
+        logger.info(f"Built search index: {len(index._location_ids)} locations, "
+                    f"{len(index._vocabulary)} distinct tokens")
+        return index
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        """All indexed tokens starting with prefix (binary search over the sorted vocabulary)"""
+        start = bisect_left(self._vocabulary, prefix)
+        matches = []
+        for token in self._vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            matches.append(token)
+        return matches
+
+    def search(self, query: str) -> List[str]:
+        """
+        Return ids of locations matching the query, in load order.
+        Multi-word queries are matched as a phrase; the last word also matches
+        as a prefix so partially typed queries ("temp") still find results.
+        Only whole tokens (and that prefix) match: a query starting inside a word
+        ("ahal" for "mahal") finds nothing here.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        head_postings = []
+        for term in terms[:-1]:
+            postings = self._postings.get(term)
+            if not postings:
+                return []
+            head_postings.append(postings)
+
+        # Merge postings of every token the last term is a prefix of
+        tail_postings: Dict[int, Set[int]] = {}
+        for token in self._expand_prefix(terms[-1]):
+            for ordinal, positions in self._postings[token].items():
+                tail_postings.setdefault(ordinal, set()).update(positions)
+        if not tail_postings:
+            return []
+
+        if not head_postings:
+            return [self._location_ids[ordinal] for ordinal in sorted(tail_postings)]
+
+        # Intersect starting from the rarest term, then verify phrase adjacency
+        all_postings = head_postings + [tail_postings]
+        candidates = set(min(all_postings, key=len))
+        for postings in all_postings:
+            candidates.intersection_update(postings)
+            if not candidates:
+                return []
+
+        matches = []
+        for ordinal in sorted(candidates):
+            following = [set(postings[ordinal]) for postings in all_postings[1:]]
+            for start in head_postings[0][ordinal]:
+                if all(start + offset in positions
+                       for offset, positions in enumerate(following, start=1)):
+                    matches.append(self._location_ids[ordinal])
+                    break
+        return matches
+
+
+def normalize_key(value: str) -> str:
+    """Canonical form of a categorical value: lowercase with collapsed whitespace"""
+    return ' '.join(value.lower().split()) if value else ''
+
+
+class AttributeIndex:
+    """
+    Hash index from a normalized attribute value (category, dynasty, period, tag)
+    to the ordinals of the locations carrying it, in load order.
+    Substring lookups scan the distinct-value vocabulary rather than the locations.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[str, List[int]] = {}
+
+    @classmethod
+    def build(cls, locations: Dict[str, Location], attribute: str) -> 'AttributeIndex':
+        index = cls()
+        for ordinal, location in enumerate(locations.values()):
+            value = getattr(location, attribute, '')
+            values = value if isinstance(value, (list, tuple)) else [value]
+            for key in {normalize_key(v) for v in values}:
+                if key:
+                    index._buckets.setdefault(key, []).append(ordinal)
+        return index
+
+    def keys(self) -> List[str]:
+        return list(self._buckets)
+
+    def exact(self, value: str) -> List[int]:
+        """Ordinals of locations whose value equals value (case-insensitive)"""
+        return list(self._buckets.get(normalize_key(value), []))
+
+    def containing(self, value: str) -> List[int]:
+        """Ordinals of locations whose value contains value (case-insensitive)"""
+        key = normalize_key(value)
+        matching = [bucket for existing, bucket in self._buckets.items() if key in existing]
+        if len(matching) == 1:
+            return list(matching[0])
+        ordinals = set()
+        for bucket in matching:
+            ordinals.update(bucket)
+        return sorted(ordinals)
+
+
+class RelatedLocationsTable:
+    """
+    Precomputed top-k related locations for every location, stored as one flat
+    array of ordinals with per-location offsets.
+    Relatedness uses the same weights as the knowledge graph: dynasty 3, period 2, category 1.
+    """
+    DYNASTY_WEIGHT = 3
+    PERIOD_WEIGHT = 2
+    CATEGORY_WEIGHT = 1
+
+    def __init__(self, locations: List[Location], dynasty_index: AttributeIndex,
+                 period_index: AttributeIndex, category_index: AttributeIndex, k: int):
+        self.k = k
+        self._locations = locations
+        self._dynasty_index = dynasty_index
+        self._period_index = period_index
+        self._category_index = category_index
+        self._neighbours = array('l')
+        self._offsets = array('l', [0])
+
+    @classmethod
+    def build(cls, locations: List[Location], dynasty_index: AttributeIndex,
+              period_index: AttributeIndex, category_index: AttributeIndex,
+              k: int = 10) -> 'RelatedLocationsTable':
+        table = cls(locations, dynasty_index, period_index, category_index, k)
+        for ordinal in range(len(locations)):
+            table._neighbours.extend(table.compute(ordinal, k))
+            table._offsets.append(len(table._neighbours))
+        logger.info(f"Built related-locations table: top {k} for {len(locations)} locations")
+        return table
+
+    def compute(self, ordinal: int, limit: int) -> List[int]:
+        """
+        Rank related locations for one location without scanning the whole set.
+        Every location scoring 2 or more shares the dynasty or period bucket, so only those
+        buckets are scored; category-only matches (score 1) fill any remaining slots.
+        """
+        location = self._locations[ordinal]
+        candidates = set(self._dynasty_index.exact(location.dynasty))
+        candidates.update(self._period_index.exact(location.period))
+        candidates.discard(ordinal)
+
+        scored = []
+        for other_ordinal in candidates:
+            other = self._locations[other_ordinal]
+            score = 0
+            if location.dynasty == other.dynasty:
+                score += self.DYNASTY_WEIGHT
+            if location.period == other.period:
+                score += self.PERIOD_WEIGHT
+            if location.category == other.category:
+                score += self.CATEGORY_WEIGHT
+            if score > 0:
+                scored.append((-score, other_ordinal))
+        scored.sort()
+        related = [other_ordinal for _, other_ordinal in scored[:limit]]
+
+        if len(related) < limit:
+            for other_ordinal in self._category_index.exact(location.category):
+                if other_ordinal == ordinal or other_ordinal in candidates:
+                    continue
+                if self._locations[other_ordinal].category != location.category:
+                    continue
+                related.append(other_ordinal)
+                if len(related) >= limit:
+                    break
+        return related
+
+    def neighbours(self, ordinal: int, limit: int) -> List[int]:
+        """Top related ordinals for a location, best first"""
+        if limit > self.k:
+            return self.compute(ordinal, limit)
+        start = self._offsets[ordinal]
+        end = min(self._offsets[ordinal + 1], start + limit)
+        return list(self._neighbours[start:end])
@@ -3,11 +3,16 @@
 import numpy as np
 from scipy.spatial.distance import pdist, squareform
 from scipy.optimize import linear_sum_assignment
+import json
 import random
 import math
 from typing import List, Dict, Any, Optional, Tuple
+from config import Config
 from models.route import Route, RouteLocation
 from models.location import Location
+from utils.helpers import content_hash
+from utils.geo import to_latlng, distance_km, coordinate_arrays, haversine_km, haversine_matrix_km
+from services import travel_matrix, tour_optimizer
 
 # Import the new UserPreferences model if it exists, otherwise use basic dict
 try:
@@ -18,9 +23,33 @@ except ImportError:
     print("UserPreferences model not found. Using basic preference handling.")
 
 class RouteService:
+    # Keywords that broadly indicate each interest type
+    BROAD_INTEREST_MATCHES = {
+        'historical': ['history', 'historic', 'heritage', 'ancient', 'medieval', 'monument', 'fort', 'palace', 'temple'],
+        'religious': ['temple', 'mosque', 'church', 'spiritual', 'sacred', 'holy', 'pilgrimage', 'worship', 'deity'],
+        'architectural': ['architecture', 'building', 'structure', 'design', 'construction', 'monument', 'palace', 'fort'],
+        'cultural': ['culture', 'art', 'tradition', 'festival', 'heritage', 'custom', 'community'],
+        'archaeological': ['archaeology', 'excavation', 'ruins', 'ancient', 'artifact', 'site'],
+        'royal_heritage': ['royal', 'king', 'queen', 'emperor', 'palace', 'kingdom', 'dynasty', 'maharaja'],
+        'ancient_temples': ['temple', 'ancient', 'deity', 'worship', 'shrine', 'sacred'],
+        'forts_palaces': ['fort', 'palace', 'citadel', 'stronghold', 'castle', 'fortification'],
+        'unesco_sites': ['unesco', 'world heritage', 'protected', 'international']
+    }
+    
     def __init__(self, kg_service):
         self.kg_service = kg_service
         self._initialize_predefined_routes()
+        self.dataset_version = content_hash(
+            json.dumps(route.to_dict(), sort_keys=True).encode('utf-8') for route in self.predefined_routes
+        )
+        self.matrices = self._open_matrices()
+        
+    def _open_matrices(self):
+        """Memory-map the prebuilt distance matrix for the loaded dataset, if any"""
+        columns = self.kg_service.get_location_columns()
+        if columns is None:
+            return None
+        return travel_matrix.open_matrices(Config.MATRIX_DIR, self.kg_service.get_dataset_version(), len(columns))
         
     def _initialize_predefined_routes(self):
         """Initialize predefined cultural routes"""
@@ -168,6 +197,10 @@ class RouteService:
         
         return routes
         
+    def get_dataset_version(self) -> str:
+        """Content hash of the predefined routes"""
+        return self.dataset_version
+    
     def get_all_routes(self):
         """Get all predefined routes"""
         return self.predefined_routes
@@ -204,18 +237,33 @@ class RouteService:
             # Convert dict to pseudo-UserPreferences for compatibility
             prefs = self._dict_to_preferences(preferences)
         
-        # Step 1: Get all locations and filter by preferences
-        all_locations = self.kg_service.get_all_locations()
-        suitable_locations = self._filter_locations_by_preferences(all_locations, prefs)
-        
-        if not suitable_locations:
-            raise ValueError("No suitable locations found for your preferences")
-        
-        # Step 2: Score and rank locations
-        scored_locations = self._score_locations(suitable_locations, prefs)
+        columns = self.kg_service.get_location_columns()
+        if columns is not None:
+            # Steps 1 and 2 as mask and array operations over the whole dataset
+            rows = np.flatnonzero(self._preference_mask(columns, prefs))
+            if len(rows) == 0:
+                raise ValueError("No suitable locations found for your preferences")
+            # Distances from the start point are computed once and shared by scoring and ordering
+            start_distances = self._start_distances(prefs.start_location, columns.lat, columns.lng)
+            scored_locations, scored_rows = self._score_rows(columns, rows, prefs, start_distances)
+            if start_distances is not None:
+                start_distances = start_distances[scored_rows]
+        else:
+            # Step 1: Get all locations and filter by preferences
+            all_locations = self.kg_service.get_all_locations()
+            suitable_locations = self._filter_locations_by_preferences(all_locations, prefs)
+            
+            if not suitable_locations:
+                raise ValueError("No suitable locations found for your preferences")
+            
+            # Step 2: Score and rank locations
+            lats, lngs = coordinate_arrays(suitable_locations)
+            scored_locations = self._score_locations(suitable_locations, prefs,
+                                                     self._start_distances(prefs.start_location, lats, lngs))
+            start_distances = None
         
         # Step 3: Create optimal route
-        optimal_route = self._create_optimal_route(scored_locations, prefs)
+        optimal_route = self._create_optimal_route(scored_locations, prefs, start_distances)
         
         return optimal_route
     
@@ -285,12 +333,13 @@ class RouteService:
         if not interests:
             return True
 
-        # Get location data with better handling
-        location_tags = [tag.lower().strip() for tag in getattr(location, 'tags', [])]
-        location_category = getattr(location, 'category', '').lower().strip()
-        location_description = getattr(location, 'description', '').lower().strip()
-        location_name = getattr(location, 'name', '').lower().strip()
-        location_dynasty = getattr(location, 'dynasty', '').lower().strip()
+        # Lowercased fields are precomputed once per location at load time
+        normalized = location.get_normalized()
+        location_tags = normalized.tags
+        location_category = normalized.category
+        location_description = normalized.description
+        location_name = normalized.name
+        location_dynasty = normalized.dynasty
 
         for interest in interests:
             interest_lower = str(interest).lower().strip()
@@ -321,25 +370,16 @@ class RouteService:
                 return True
 
             # 7. BROAD MATCHING - This is the key fix!
-            broad_matches = {
-                'historical': ['history', 'historic', 'heritage', 'ancient', 'medieval', 'monument', 'fort', 'palace', 'temple'],
-                'religious': ['temple', 'mosque', 'church', 'spiritual', 'sacred', 'holy', 'pilgrimage', 'worship', 'deity'],
-                'architectural': ['architecture', 'building', 'structure', 'design', 'construction', 'monument', 'palace', 'fort'],
-                'cultural': ['culture', 'art', 'tradition', 'festival', 'heritage', 'custom', 'community'],
-                'archaeological': ['archaeology', 'excavation', 'ruins', 'ancient', 'artifact', 'site'],
-                'royal_heritage': ['royal', 'king', 'queen', 'emperor', 'palace', 'kingdom', 'dynasty', 'maharaja'],
-                'ancient_temples': ['temple', 'ancient', 'deity', 'worship', 'shrine', 'sacred'],
-                'forts_palaces': ['fort', 'palace', 'citadel', 'stronghold', 'castle', 'fortification'],
-                'unesco_sites': ['unesco', 'world heritage', 'protected', 'international']
-            }
+            broad_matches = self.BROAD_INTEREST_MATCHES
 
             # Check broad matches
             if interest_lower in broad_matches:
                 keywords = broad_matches[interest_lower]
-                search_text = f"{location_name} {location_description} {location_category} {' '.join(location_tags)} {location_dynasty}"
+                searchable_fields = (location_name, location_description, location_category,
+                                     location_dynasty, *location_tags)
                 
                 for keyword in keywords:
-                    if keyword in search_text:
+                    if any(keyword in text for text in searchable_fields):
                         return True
 
             # 8. Reverse broad matching - check if location keywords match interest categories
@@ -353,6 +393,117 @@ class RouteService:
                             return True
         return False
     
+    # ===== COLUMNAR (VECTORIZED) MATCHING AND SCORING =====
+    # Same rules as _matches_interests / _score_locations, evaluated over LocationColumns
+    
+    def _keyword_mask(self, columns, keywords, include_dynasty: bool) -> np.ndarray:
+        """Rows where any keyword occurs in the name, description, category, tags (or dynasty)"""
+        def contains_keyword(text):
+            return any(keyword in text for keyword in keywords)
+        
+        mask = (columns.text_mask(columns.names, contains_keyword) |
+                columns.text_mask(columns.descriptions, contains_keyword) |
+                columns.category.mask(contains_keyword) |
+                columns.tag_mask(contains_keyword))
+        if include_dynasty:
+            mask |= columns.dynasty.mask(contains_keyword)
+        return mask
+    
+    def _interest_mask(self, columns, interest) -> np.ndarray:
+        """Vectorized _matches_interests(location, [interest]), memoized per interest"""
+        interest_lower = str(interest).lower().strip()
+        return columns.cached_mask(('interest', interest_lower),
+                                   lambda: self._build_interest_mask(columns, interest_lower))
+    
+    def _build_interest_mask(self, columns, interest_lower: str) -> np.ndarray:
+        def overlaps(value):
+            return interest_lower in value or value in interest_lower
+        
+        # Category, tags, name and dynasty match in either direction; description one way
+        mask = (columns.category.mask(overlaps) |
+                columns.tag_mask(overlaps) |
+                columns.text_mask(columns.names, overlaps) |
+                columns.text_mask(columns.descriptions, lambda text: interest_lower in text) |
+                columns.dynasty.mask(overlaps))
+        
+        broad_matches = self.BROAD_INTEREST_MATCHES
+        if interest_lower in broad_matches:
+            mask |= self._keyword_mask(columns, broad_matches[interest_lower], include_dynasty=True)
+        
+        for category, keywords in broad_matches.items():
+            if category != interest_lower and (interest_lower in category or category in interest_lower):
+                mask |= self._keyword_mask(columns, keywords, include_dynasty=False)
+        return mask
+    
+    def _preference_mask(self, columns, prefs) -> np.ndarray:
+        """Vectorized _filter_locations_by_preferences: rows matching any interest"""
+        if not prefs.interests:
+            return columns.all()
+        mask = columns.none()
+        for interest in prefs.interests:
+            mask |= self._interest_mask(columns, interest)
+        return mask
+    
+    def _interest_scores(self, columns, interests, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Vectorized _calculate_interest_score for every row, or only for the given rows"""
+        count = len(columns) if rows is None else len(rows)
+        if not interests:
+            return np.full(count, 0.5)
+        matches = np.zeros(count)
+        for interest in interests:
+            mask = self._interest_mask(columns, interest)
+            matches += mask if rows is None else mask[rows]
+        return np.minimum(matches / len(interests), 1.0)
+    
+    def _historical_scores(self, columns, prefs) -> np.ndarray:
+        """Vectorized _calculate_historical_score for every row"""
+        scores = np.full(len(columns), 0.5)
+        if prefs.preferred_periods:
+            periods = [period.lower() for period in prefs.preferred_periods]
+            scores[columns.era.mask(lambda value: any(period in value for period in periods))] += 0.3
+        if prefs.preferred_dynasties:
+            dynasties = [dynasty.lower() for dynasty in prefs.preferred_dynasties]
+            scores[columns.dynasty.mask(lambda value: any(dynasty in value for dynasty in dynasties))] += 0.2
+        return np.minimum(scores, 1.0)
+    
+    def _start_distances(self, start, lats: np.ndarray, lngs: np.ndarray) -> Optional[np.ndarray]:
+        """Distance in km from a {'lat', 'lng'} start point to each coordinate (inf where unusable), or None without a usable start"""
+        if not isinstance(start, dict) or 'lat' not in start or 'lng' not in start:
+            return None
+        start = to_latlng(start)
+        if start is None:
+            return None
+        distances = haversine_km(start[0], start[1], lats, lngs)
+        return np.where(np.isnan(distances), np.inf, distances)
+    
+    def _distance_scores(self, columns, prefs, start_distances: Optional[np.ndarray] = None) -> np.ndarray:
+        """Vectorized _calculate_distance_score for every row"""
+        if not prefs.start_location:
+            return np.full(len(columns), 0.5)
+        distances = start_distances
+        if distances is None:
+            distances = self._start_distances(prefs.start_location, columns.lat, columns.lng)
+        if distances is None:
+            return np.zeros(len(columns))
+        
+        max_preferred_distance = prefs.max_distance_km or 500
+        return np.maximum(0, 1 - (distances / max_preferred_distance))
+    
+    def _score_rows(self, columns, rows: np.ndarray, prefs,
+                    start_distances: Optional[np.ndarray] = None) -> Tuple[List[Tuple[Location, float]], np.ndarray]:
+        """Vectorized _score_locations for the given rows, best first, plus the rows in that order"""
+        accessibility_score = 0.3 if prefs.accessibility_required else 0.7
+        
+        scores = np.zeros(len(columns))
+        scores += self._interest_scores(columns, prefs.interests) * 0.4
+        scores += self._historical_scores(columns, prefs) * 0.2
+        scores += accessibility_score * 0.2
+        scores += self._distance_scores(columns, prefs, start_distances) * 0.2
+        
+        row_scores = scores[rows]
+        order = np.argsort(-row_scores, kind='stable')
+        return [(columns.locations[rows[i]], float(row_scores[i])) for i in order], rows[order]
+    
     def _get_interest_keywords(self, interest) -> List[str]:
         """Get keywords associated with each interest type - IMPROVED VERSION"""
         
@@ -382,7 +533,7 @@ class RouteService:
     
     def _matches_periods(self, location: Location, preferred_periods: List[str]) -> bool:
         """Check if location matches preferred historical periods"""
-        location_period = getattr(location, 'period', '').lower() if hasattr(location, 'period') else ""
+        location_period = location.get_normalized().period
         
         for period in preferred_periods:
             if period.lower() in location_period:
@@ -392,7 +543,7 @@ class RouteService:
     
     def _matches_dynasties(self, location: Location, preferred_dynasties: List[str]) -> bool:
         """Check if location matches preferred dynasties"""
-        location_dynasty = getattr(location, 'dynasty', '').lower() if hasattr(location, 'dynasty') else ""
+        location_dynasty = location.get_normalized().dynasty
         
         for dynasty in preferred_dynasties:
             if dynasty.lower() in location_dynasty:
@@ -407,69 +558,17 @@ class RouteService:
         return True
     
     def _calculate_distance(self, point1: Dict[str, float], location) -> float:
-        """Calculate Haversine distance between two points"""
-        import math
-        
-        # Handle point1 (should be a dictionary with lat/lng)
+        """Haversine distance in km from a {'lat', 'lng'} point to a location in any coordinate format (inf if unusable)"""
         if not isinstance(point1, dict) or 'lat' not in point1 or 'lng' not in point1:
             return float('inf')
-        
-        lat1, lon1 = point1['lat'], point1['lng']
-        
-        # Handle location parameter (could be Location object or coordinate dict)
-        if hasattr(location, 'coordinates'):
-            # Location object - extract coordinates
-            coords = location.coordinates
-            if hasattr(coords, 'lat') and hasattr(coords, 'lng'):
-                # Coordinates object with lat/lng attributes
-                lat2, lon2 = float(coords.lat), float(coords.lng)
-            elif isinstance(coords, dict) and 'lat' in coords and 'lng' in coords:
-                lat2, lon2 = coords['lat'], coords['lng']
-            elif isinstance(coords, (list, tuple)) and len(coords) >= 2:
-                lat2, lon2 = coords[0], coords[1]
-            else:
-                print(f"Warning: Invalid coordinates format for {getattr(location, 'name', 'unknown')}: {coords}")
-                return float('inf')
-        elif isinstance(location, dict):
-            # Dictionary with coordinates
-            if 'coordinates' in location:
-                coords = location['coordinates']
-                if isinstance(coords, dict):
-                    lat2, lon2 = coords.get('lat', 0), coords.get('lng', 0)
-                elif isinstance(coords, (list, tuple)) and len(coords) >= 2:
-                    lat2, lon2 = coords[0], coords[1]
-                else:
-                    return float('inf')
-            elif 'lat' in location and 'lng' in location:
-                lat2, lon2 = location['lat'], location['lng']
-            else:
-                return float('inf')
-        else:
-            print(f"Warning: Unhandled location format: {type(location)} - {location}")
-            return float('inf')
-        
-        # Haversine formula
-        R = 6371  # Earth's radius in kilometers
-        
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        delta_lat = math.radians(lat2 - lat1)
-        delta_lon = math.radians(lon2 - lon1)
-        
-        a = (math.sin(delta_lat/2) * math.sin(delta_lat/2) +
-            math.cos(lat1_rad) * math.cos(lat2_rad) *
-            math.sin(delta_lon/2) * math.sin(delta_lon/2))
-        
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        distance = R * c
-        
-        return distance
+        return distance_km(point1, location)
     
-    def _score_locations(self, locations: List[Location], prefs) -> List[Tuple[Location, float]]:
-        """Score locations based on preference alignment"""
+    def _score_locations(self, locations: List[Location], prefs,
+                         start_distances: Optional[np.ndarray] = None) -> List[Tuple[Location, float]]:
+        """Score locations based on preference alignment (start_distances is parallel to locations)"""
         scored = []
         
-        for location in locations:
+        for i, location in enumerate(locations):
             score = 0.0
             
             # Interest alignment score (40% weight)
@@ -485,7 +584,8 @@ class RouteService:
             score += accessibility_score * 0.2
             
             # Distance score (20% weight)
-            distance_score = self._calculate_distance_score(location, prefs)
+            distance_score = self._calculate_distance_score(
+                location, prefs, None if start_distances is None else float(start_distances[i]))
             score += distance_score * 0.2
             
             scored.append((location, score))
@@ -532,20 +632,22 @@ class RouteService:
         
         return base_score
     
-    def _calculate_distance_score(self, location: Location, prefs) -> float:
+    def _calculate_distance_score(self, location: Location, prefs, distance: Optional[float] = None) -> float:
         """Calculate distance score - closer locations get higher scores"""
         if not prefs.start_location:
             return 0.5
         
-        distance = self._calculate_distance(prefs.start_location, location)
+        if distance is None:
+            distance = self._calculate_distance(prefs.start_location, location)
         max_preferred_distance = prefs.max_distance_km or 500
         
         # Score decreases with distance
         score = max(0, 1 - (distance / max_preferred_distance))
         return score
     
-    def _create_optimal_route(self, scored_locations: List[Tuple[Location, float]], prefs) -> Route:
-        """Create optimal route from scored locations"""
+    def _create_optimal_route(self, scored_locations: List[Tuple[Location, float]], prefs,
+                              start_distances: Optional[np.ndarray] = None) -> Route:
+        """Create optimal route from scored locations (start_distances is parallel to scored_locations)"""
         
         # Select top locations based on travel days
         max_locations = min(prefs.max_travel_days * 2, len(scored_locations))  # 2 locations per day max
@@ -559,16 +661,9 @@ class RouteService:
         path = []  # This will store the coordinate path
         for location, score in selected_locations:
             coords = location.coordinates
-            # FIXED: Proper coordinate extraction
-            if hasattr(coords, 'lat') and hasattr(coords, 'lng'):
-                # Coordinates object with lat/lng properties
-                coord_list = [float(coords.lat), float(coords.lng)]
-            elif isinstance(coords, dict):
-                # Dictionary format
-                coord_list = [float(coords.get('lat', 0)), float(coords.get('lng', 0))]
-            elif isinstance(coords, (list, tuple)) and len(coords) >= 2:
-                # Array format
-                coord_list = [float(coords[0]), float(coords[1])]
+            latlng = to_latlng(coords)
+            if latlng is not None:
+                coord_list = list(latlng)
             else:
                 # Fallback - this should not happen if data is correct
                 print(f"Warning: Could not extract coordinates for {location.name}: {coords}")
@@ -585,7 +680,11 @@ class RouteService:
             )
             route_locations.append(route_location)
         # Optimize order based on geographical proximity
-        optimized_locations = self._optimize_route_order(route_locations, prefs.start_location)
+        if start_distances is not None:
+            start_distances = start_distances[:max_locations]
+        distances = self._travel_matrix([location for location, _ in selected_locations])
+        optimized_locations, metrics = self._optimize_route_order(route_locations, prefs.start_location,
+                                                                  start_distances, distances)
         # Create optimized path (reorder path to match optimized locations)
         optimized_path = []
         for loc in optimized_locations:
@@ -600,79 +699,70 @@ class RouteService:
             description=f"Custom route for {prefs.max_travel_days} days based on your preferences",
             color="#e91e63",  # Pink color for personalized routes
             path=optimized_path,  # Use optimized path
-            locations=optimized_locations
+            locations=optimized_locations,
+            metrics=metrics
         )
         return route
     
-    def _optimize_route_order(self, locations: List[RouteLocation], start_point: Optional[Dict[str, float]]) -> List[RouteLocation]:
-        """Optimize the order of locations to minimize travel distance"""
+    def _optimize_route_order(self, locations: List[RouteLocation], start_point: Optional[Dict[str, float]],
+                              start_distances: Optional[np.ndarray] = None,
+                              distances: Optional[np.ndarray] = None
+                              ) -> Tuple[List[RouteLocation], Optional[Dict[str, Any]]]:
+        """
+        Optimize the order of locations to minimize travel distance: nearest neighbour from
+        the stop closest to start_point, then an exact or 2-opt / Or-opt ordering that keeps
+        that stop first and leaves the last stop free. Without a usable start_point the first
+        stop is free as well.
+        start_distances and the pairwise distances matrix, both parallel to locations, are
+        reused when given instead of being measured again.
+        Returns the ordered locations and the route metrics.
+        """
         if len(locations) <= 2:
-            return locations
+            return locations, None
         
-        # Create distance matrix
         n = len(locations)
-        distances = np.zeros((n, n))
-        
-        for i in range(n):
-            for j in range(n):
-                if i != j:
-                    # Handle coordinate format
-                    coord_i = locations[i].coordinates
-                    coord_j = locations[j].coordinates
-                    
-                    if isinstance(coord_i, (list, tuple)) and isinstance(coord_j, (list, tuple)):
-                        point_i = {'lat': coord_i[0], 'lng': coord_i[1]}
-                        point_j = {'lat': coord_j[0], 'lng': coord_j[1]}
-                        dist = self._calculate_distance(point_i, point_j)
-                        distances[i][j] = dist
-        
-        # Simple nearest neighbor heuristic
-        visited = [False] * n
-        route_order = []
+        if distances is None:
+            distances = self._calculate_travel_matrix(locations)
         
         # Start from location closest to start_point if provided
-        if start_point:
-            start_idx = 0
-            min_start_dist = float('inf')
-            for i in range(n):
-                coord = locations[i].coordinates
-                if isinstance(coord, (list, tuple)) and len(coord) >= 2:
-                    point = {'lat': coord[0], 'lng': coord[1]}
-                    dist = self._calculate_distance(start_point, point)
-                    if dist < min_start_dist:
-                        min_start_dist = dist
-                        start_idx = i
-        else:
-            start_idx = 0
+        start_idx = 0
+        if not start_point:
+            start_distances = None
+        elif start_distances is None:
+            start_distances = self._start_distances(start_point, *coordinate_arrays(locations))
+        if start_distances is not None:
+            start_idx = int(np.argmin(start_distances))
         
+        # Simple nearest neighbor heuristic
+        visited = np.zeros(n, dtype=bool)
         current = start_idx
         visited[current] = True
-        route_order.append(current)
+        route_order = [current]
         
         while len(route_order) < n:
-            next_idx = None
-            min_dist = float('inf')
-            
-            for i in range(n):
-                if not visited[i] and distances[current][i] < min_dist:
-                    min_dist = distances[current][i]
-                    next_idx = i
-            
-            if next_idx is not None:
-                visited[next_idx] = True
-                route_order.append(next_idx)
-                current = next_idx
+            unvisited = np.flatnonzero(~visited)
+            current = int(unvisited[np.argmin(distances[current, unvisited])])
+            visited[current] = True
+            route_order.append(current)
         
-        return [locations[i] for i in route_order]
+        improvement = tour_optimizer.optimize_order(route_order, distances, free_start=start_distances is None)
+        return [locations[i] for i in improvement.order], improvement.to_metrics()
     
     def get_nearby_historical_places(self, location: Dict[str, float], radius_km: int = 50, 
                                 interests = None) -> List[Dict[str, Any]]:
         """Get nearby historical places based on location and interests"""
+        columns = self.kg_service.get_location_columns()
+        if columns is not None:
+            return self._nearby_from_columns(columns, location, radius_km, interests)
+        
         all_locations = self.kg_service.get_all_locations()
         nearby = []
+        if not isinstance(location, dict) or 'lat' not in location or 'lng' not in location:
+            return nearby
         
-        for loc in all_locations:
-            distance = self._calculate_distance(location, loc)
+        lats, lngs = coordinate_arrays(all_locations)
+        distances = haversine_km(location['lat'], location['lng'], lats, lngs)
+        for loc, distance in zip(all_locations, distances.tolist()):
             
             if distance <= radius_km:
                 # Check interest match if specified
@@ -691,6 +781,29 @@ class RouteService:
         nearby.sort(key=lambda x: x['distance_km'])
         return nearby
         
+    def _nearby_from_columns(self, columns, location: Dict[str, float], radius_km,
+                             interests) -> List[Dict[str, Any]]:
+        """get_nearby_historical_places over the grid cells within radius, using interest masks"""
+        if not isinstance(location, dict) or 'lat' not in location or 'lng' not in location:
+            return []
+        
+        rows, distances = columns.rows_within(location['lat'], location['lng'], radius_km)
+        if interests:
+            keep = np.zeros(len(rows), dtype=bool)
+            for interest in interests:
+                keep |= self._interest_mask(columns, interest)[rows]
+            rows, distances = rows[keep], distances[keep]
+        
+        interest_scores = self._interest_scores(columns, interests or [], rows)
+        nearby = [{
+            'location': columns.locations[row].to_dict(),
+            'distance_km': round(float(distance), 1),
+            'interest_match': float(score)
+        } for row, distance, score in zip(rows, distances, interest_scores)]
+        
+        nearby.sort(key=lambda x: x['distance_km'])
+        return nearby
+        
     def create_personalized_route(self, preferences):
         """
         Create a personalized route based on user preferences using
@@ -721,16 +834,22 @@ class RouteService:
         max_days = preferences.get('maxDays', 7)
         must_visit = preferences.get('mustVisit', [])
         
-        # Get all locations
-        all_locations = self.kg_service.get_all_locations()
-        
         # Filter locations based on interests and must-visit locations
-        candidate_locations = self._filter_locations_by_interests(all_locations, interests)
+        columns = self.kg_service.get_location_columns()
+        if columns is not None:
+            candidate_locations = self._filter_rows_by_interests(columns, interests)
+        else:
+            all_locations = self.kg_service.get_all_locations()
+            candidate_locations = self._filter_locations_by_interests(all_locations, interests)
+        
+        # Fetch must-visit, start and end locations in a single lookup
+        requested_ids = list(must_visit) + [loc_id for loc_id in (start_location_id, end_location_id) if loc_id]
+        requested = {loc.id: loc for loc in self.kg_service.get_locations_by_ids(requested_ids)}
         
         # Ensure must-visit locations are included
         must_visit_locations = []
         for loc_id in must_visit:
-            location = self.kg_service.get_location_by_id(loc_id)
+            location = requested.get(loc_id)
             if location and location not in candidate_locations:
                 must_visit_locations.append(location)
         
@@ -741,18 +860,15 @@ class RouteService:
         end_location = None
         
         if start_location_id:
-            start_location = self.kg_service.get_location_by_id(start_location_id)
+            start_location = requested.get(start_location_id)
             if start_location and start_location not in candidate_locations:
                 candidate_locations.append(start_location)
                 
         if end_location_id:
-            end_location = self.kg_service.get_location_by_id(end_location_id)
+            end_location = requested.get(end_location_id)
             if end_location and end_location not in candidate_locations:
                 candidate_locations.append(end_location)
         
-        # Calculate travel time matrix between locations
-        distances = self._calculate_travel_matrix(candidate_locations)
-        
         # Determine how many locations can be realistically visited in the given time
         avg_visit_duration = 1.0  # Average days to visit a location
         avg_travel_time = 0.5  # Average days to travel between locations
@@ -772,8 +888,11 @@ class RouteService:
         if end_location and end_location not in priority_locations:
             priority_locations.append(end_location)
             
+        # Distance matrix between the selected locations, sliced from the dataset matrix
+        distances = self._travel_matrix(priority_locations)
+        
         # Get optimal route through selected locations
-        optimal_route = self._find_optimal_route(priority_locations, distances, start_location, end_location)
+        optimal_route, metrics = self._find_optimal_route(priority_locations, distances, start_location, end_location)
         
         # Create a Route object
         route_name = f"Personalized {', '.join(interests[:2])} Route"
@@ -813,7 +932,8 @@ class RouteService:
             description=route_description,
             color=route_color,
             path=path,
-            locations=route_locations
+            locations=route_locations,
+            metrics=metrics
         )
         
         return personalized_route
@@ -824,42 +944,35 @@ class RouteService:
             # If no interests provided, return a limited selection of diverse locations
             return random.sample(locations, min(8, len(locations)))
             
+        interests_lower = [interest.lower() for interest in interests]
         scored_locations = []
         
         for location in locations:
             score = 0
+            normalized = location.get_normalized()
             
             # Score based on tags matching interests
-            location_tags = getattr(location, 'tags', [])
-            for interest in interests:
-                interest_lower = interest.lower()
-                for tag in location_tags:
-                    if interest_lower in tag.lower():
+            for interest in interests_lower:
+                for tag in normalized.tags:
+                    if interest in tag:
                         score += 2
                         break
             
             # Score based on category
-            location_category = getattr(location, 'category', '')
-            for interest in interests:
-                if interest.lower() in location_category.lower():
+            for interest in interests_lower:
+                if interest in normalized.category:
                     score += 2
                     break
                     
             # Score based on dynasty/period match
-            location_dynasty = getattr(location, 'dynasty', '')
-            location_period = getattr(location, 'period', '')
-            for interest in interests:
-                if (interest.lower() in location_dynasty.lower() or 
-                    interest.lower() in location_period.lower()):
+            for interest in interests_lower:
+                if interest in normalized.dynasty or interest in normalized.period:
                     score += 1.5
                     break
                     
             # Score based on description and history (text matching)
-            location_description = getattr(location, 'description', '')
-            location_history = getattr(location, 'history', '')
-            text = f"{location_description} {location_history}"
-            for interest in interests:
-                if interest.lower() in text.lower():
+            for interest in interests_lower:
+                if interest in normalized.description or interest in normalized.history:
                     score += 1
                     break
                     
@@ -877,6 +990,34 @@ class RouteService:
         
         return top_locations
     
+    def _filter_rows_by_interests(self, columns, interests):
+        """Vectorized _filter_locations_by_interests over the whole dataset"""
+        if not interests:
+            return random.sample(columns.locations, min(8, len(columns)))
+        
+        interests_lower = [interest.lower() for interest in interests]
+        
+        def any_interest_in(text):
+            return any(interest in text for interest in interests_lower)
+        
+        scores = np.zeros(len(columns))
+        # Every interest matching some tag counts, as in the per-location loop
+        for interest in interests_lower:
+            scores += 2 * columns.tag_mask(lambda tag: interest in tag)
+        scores += 2 * columns.category.mask(any_interest_in)
+        scores += 1.5 * (columns.dynasty.mask(any_interest_in) | columns.era.mask(any_interest_in))
+        scores += 1 * (columns.text_mask(columns.descriptions, any_interest_in) |
+                       columns.text_mask(columns.histories, any_interest_in))
+        
+        # Add a small random factor for diversity, drawn from `random` in row order so
+        # random.seed() reproduces the same picks as the per-location scoring
+        scores += np.fromiter((random.uniform(0, 0.5) for _ in range(len(columns))),
+                              dtype=np.float64, count=len(columns))
+        
+        # Take top 10 for route planning feasibility
+        top_rows = np.argsort(-scores, kind='stable')[:10]
+        return columns.locations_at(top_rows)
+    
     def _prioritize_locations(self, locations, interests, must_visit, max_count):
         """Prioritize locations based on significance and relevance to interests"""
         # Must-visit locations have highest priority
@@ -890,31 +1031,29 @@ class RouteService:
         remaining_locations = [loc for loc in locations if loc.id not in must_visit]
         scored_locations = []
         
+        interests_lower = [interest.lower() for interest in interests]
+        
         for location in remaining_locations:
             score = 0
+            normalized = location.get_normalized()
             
             # UNESCO sites get a significance boost
-            location_tags = getattr(location, 'tags', [])
-            if any('unesco' in tag.lower() for tag in location_tags):
+            location_tags = normalized.tags
+            if any('unesco' in tag for tag in location_tags):
                 score += 3
                 
             # Score based on interest match
-            for interest in interests:
-                interest_lower = interest.lower()
+            for interest_lower in interests_lower:
                 # Check tags
-                if any(interest_lower in tag.lower() for tag in location_tags):
+                if any(interest_lower in tag for tag in location_tags):
                     score += 2
                 
                 # Check category, dynasty, description
-                location_category = getattr(location, 'category', '')
-                location_dynasty = getattr(location, 'dynasty', '')
-                location_description = getattr(location, 'description', '')
-                
-                if interest_lower in location_category.lower():
+                if interest_lower in normalized.category:
                     score += 1.5
-                if interest_lower in location_dynasty.lower():
+                if interest_lower in normalized.dynasty:
                     score += 1
-                if interest_lower in location_description.lower():
+                if interest_lower in normalized.description:
                     score += 0.5
             
             # Add a small random factor for diversity
@@ -929,52 +1068,44 @@ class RouteService:
         prioritized = must_visit_locations + top_remaining
         return prioritized
     
+    def _dataset_rows(self, locations) -> Optional[np.ndarray]:
+        """Dataset rows of locations, or None when they are not all part of the in-memory dataset"""
+        columns = self.kg_service.get_location_columns()
+        if columns is None or not locations:
+            return None
+        return columns.rows_for(locations)
+    
+    def _travel_matrix(self, locations) -> np.ndarray:
+        """
+        Pairwise km between locations, sliced from the memory-mapped matrix or the in-memory
+        dataset matrix when they all belong to the dataset
+        """
+        rows = self._dataset_rows(locations)
+        if rows is None:
+            return self._calculate_travel_matrix(locations)
+        if self.matrices is not None:
+            return self.matrices.distances(rows)
+        return self.kg_service.get_location_columns().distance_submatrix(rows)
+    
     def _calculate_travel_matrix(self, locations):
-        """Calculate travel time matrix between locations using Haversine distance"""
+        """Calculate the pairwise Haversine distance matrix (km) for locations in any coordinate format"""
         if not locations:
             return np.array([])
-            
-        n = len(locations)
-        coords = np.zeros((n, 2))
         
-        for i, loc in enumerate(locations):
-            location_coords = loc.coordinates
-            if isinstance(location_coords, dict):
-                coords[i, 0] = location_coords['lat']
-                coords[i, 1] = location_coords['lng']
-            elif isinstance(location_coords, (list, tuple)) and len(location_coords) >= 2:
-                coords[i, 0] = location_coords[0]
-                coords[i, 1] = location_coords[1]
-            
-        # Calculate pairwise distances
-        distances = np.zeros((n, n))
-        
-        for i in range(n):
-            for j in range(n):
-                if i == j:
-                    distances[i, j] = 0
-                else:
-                    # Haversine formula for distance between two points on a sphere
-                    lat1, lon1 = coords[i]
-                    lat2, lon2 = coords[j]
-                    
-                    # Convert to radians
-                    lat1, lon1, lat2, lon2 = map(np.radians, [lat1, lon1, lat2, lon2])
-                    
-                    # Haversine formula
-                    dlon = lon2 - lon1
-                    dlat = lat2 - lat1
-                    a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
-                    c = 2 * np.arcsin(np.sqrt(a))
-                    r = 6371  # Radius of Earth in kilometers
-                    distances[i, j] = c * r
-                    
+        lats, lngs = coordinate_arrays(locations)
+        distances = haversine_matrix_km(lats, lngs)
+        distances[np.isnan(distances)] = np.inf
         return distances
     
     def _find_optimal_route(self, locations, distances, start_location=None, end_location=None):
-        """Find optimal route through locations, respecting start and end constraints"""
+        """
+        Find optimal route through locations, respecting start and end constraints.
+        Up to Config.EXACT_ROUTE_MAX_STOPS locations the order is solved exactly (Held-Karp);
+        above that the greedy tour is improved by local search.
+        Returns the ordered locations and the route metrics (None when there was nothing to order).
+        """
         if len(locations) <= 2:
-            return locations
+            return locations, None
             
         # If start and end are specified, solve an open TSP
         if start_location and end_location and start_location != end_location:
@@ -991,10 +1122,10 @@ class RouteService:
         return self._solve_tsp(locations, distances, start_idx)
     
     def _solve_tsp(self, locations, distances, start_idx=None):
-        """Solve a Traveling Salesperson Problem"""
+        """Solve a Traveling Salesperson Problem (round trip): nearest neighbour, then exact or 2-opt / Or-opt"""
         n = len(locations)
         if n <= 1:
-            return locations
+            return locations, None
             
         # If start index is not specified, use a simple heuristic
         if start_idx is None:
@@ -1013,15 +1144,17 @@ class RouteService:
             next_idx = min(unvisited, key=lambda i: distances[last, i])
             path.append(next_idx)
             unvisited.remove(next_idx)
+        
+        improvement = tour_optimizer.optimize_order(path, distances, closed=True)
             
         # Return locations in the computed path order
-        return [locations[i] for i in path]
+        return [locations[i] for i in improvement.order], improvement.to_metrics()
     
     def _solve_open_tsp(self, locations, distances, start_location, end_location):
-        """Solve an open TSP with fixed start and end points"""
+        """Solve an open TSP with fixed start and end points: nearest neighbour, then exact or 2-opt / Or-opt"""
         n = len(locations)
         if n <= 2:
-            return locations
+            return locations, None
             
         # Find indices of start and end locations
         start_idx = None
@@ -1039,7 +1172,7 @@ class RouteService:
             
         # Handle special case: only start and end
         if n == 2:
-            return [locations[start_idx], locations[end_idx]]
+            return [locations[start_idx], locations[end_idx]], None
             
         # Solve with start and end fixed
         unvisited = set(range(n))
@@ -1058,8 +1191,10 @@ class RouteService:
         # Add end location
         path.append(end_idx)
         
+        improvement = tour_optimizer.optimize_order(path, distances, fixed_end=True)
+        
         # Return locations in the computed path order
-        return [locations[i] for i in path]
+        return [locations[i] for i in improvement.order], improvement.to_metrics()
     
     def _get_theme_color(self, interests):
         """Get an appropriate color based on interests"""
@@ -0,0 +1,103 @@
+# cupe-kg-backend/services/snapshot.py
+
+"""
+Binary snapshot of the loaded CuPe-KG dataset
+Lets worker processes skip importing, enriching and indexing data/locations.py at startup
+"""
+
+import hashlib
+import importlib.util
+import logging
+import os
+import pickle
+import struct
+import tempfile
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b'CUPEKGSNAP'
+# Bump whenever the snapshot layout changes; changes to the pickled classes are caught by
+# the code fingerprint in the key
+SNAPSHOT_FORMAT_VERSION = 7
+
+# Modules defining the pickled classes or building their contents
+CODE_MODULES = (
+    'models.location',
+    'services.data_loader',
+    'services.location_columns',
+    'services.location_index',
+    'services.spatial_index'
+)
+
+# magic, format version, sha256 of the source data and code
+_HEADER = struct.Struct('>10sH32s')
+
+
+def module_path(name: str) -> Optional[str]:
+    """Path of a module's source file, without importing it"""
+    spec = importlib.util.find_spec(name)
+    return spec.origin if spec else None
+
+
+def source_path() -> Optional[str]:
+    """Path of the data/locations.py module the dataset is built from, without importing it"""
+    return module_path('data.locations')
+
+
+def source_hash(*settings: Any) -> bytes:
+    """
+    Content hash of the source data, the code in CODE_MODULES and any settings that shape
+    the built indexes, so a snapshot goes stale when any of them changes
+    """
+    digest = hashlib.sha256()
+    for path in [source_path()] + [module_path(name) for name in CODE_MODULES]:
+        if path:
+            with open(path, 'rb') as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+    for setting in settings:
+        digest.update(repr(setting).encode('utf-8'))
+    return digest.digest()
+
+
+def write_snapshot(path: str, payload: Any, key: bytes) -> int:
+    """Atomically write payload to path; returns the file size in bytes"""
+    body = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.snapshot-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, key))
+            f.write(body)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    return _HEADER.size + len(body)
+
+
+def read_snapshot(path: str, key: bytes) -> Optional[Any]:
+    """
+    Load the payload of a snapshot written by write_snapshot.
+    Returns None when the file is missing, from another format version or built from
+    different source data. Snapshots are pickles, so only load files this app wrote.
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                logger.warning(f"Snapshot {path} is truncated, ignoring it")
+                return None
+            magic, version, snapshot_key = _HEADER.unpack(header)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_FORMAT_VERSION:
+                logger.info(f"Snapshot {path} has an incompatible format, ignoring it")
+                return None
+            if snapshot_key != key:
+                logger.info(f"Snapshot {path} is stale, source data or code changed")
+                return None
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Could not read snapshot {path}: {e}")
+        return None
@@ -0,0 +1,100 @@
+# cupe-kg-backend/services/spatial_index.py
+
+"""
+Fixed-size lat/lng grid over the loaded locations for CuPe-KG
+Radius queries only look at the cells a search circle can reach, instead of every location
+"""
+
+import logging
+import numpy as np
+from utils.geo import EARTH_RADIUS_KM
+
+logger = logging.getLogger(__name__)
+
+
+class GridIndex:
+    """
+    Bucket index of row numbers by (lat, lng) cell, stored CSR style: rows sorted by
+    cell key, the distinct occupied keys, and each key's start offset into the rows.
+    Rows without coordinates are left out (they are never within any radius).
+    """
+
+    def __init__(self, cell_deg: float):
+        self.cell_deg = cell_deg
+        self.lat_cells = int(np.ceil(180 / cell_deg)) + 1
+        self.lng_cells = int(np.ceil(360 / cell_deg))
+        self.rows = np.empty(0, dtype=np.int64)
+        self.keys = np.empty(0, dtype=np.int64)
+        self.starts = np.zeros(1, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @classmethod
+    def build(cls, lat: np.ndarray, lng: np.ndarray, cell_deg: float) -> 'GridIndex':
+        index = cls(cell_deg)
+        rows = np.flatnonzero(~(np.isnan(lat) | np.isnan(lng)))
+        cell_keys = index._cell_key(index._lat_cell(lat[rows]), index._lng_cell(lng[rows]))
+        order = np.argsort(cell_keys, kind='stable')
+        index.rows = rows[order]
+        index.keys, starts = np.unique(cell_keys[order], return_index=True)
+        index.starts = np.append(starts, len(index.rows)).astype(np.int64)
+        logger.info(f"Built spatial grid: {len(index.rows)} locations in {len(index.keys)} cells of {cell_deg} degrees")
+        return index
+
+    def _lat_cell(self, lat):
+        return np.floor((np.asarray(lat) + 90) / self.cell_deg).astype(np.int64)
+
+    def _lng_cell(self, lng):
+        return np.floor((np.asarray(lng) + 180) / self.cell_deg).astype(np.int64) % self.lng_cells
+
+    def _cell_key(self, lat_cell, lng_cell):
+        return lat_cell * self.lng_cells + lng_cell
+
+    def candidates(self, lat: float, lng: float, radius_km: float) -> np.ndarray:
+        """
+        Sorted rows in every cell that intersects the bounding box of the search circle.
+        A superset of the rows within radius_km; callers still check exact distances.
+        """
+        if len(self.keys) == 0 or not radius_km >= 0:
+            # Also rejects a NaN radius
+            return np.empty(0, dtype=np.int64)
+
+        angular_radius = radius_km / EARTH_RADIUS_KM
+        if angular_radius >= np.pi:
+            return np.sort(self.rows)
+        delta_lat = np.degrees(angular_radius)
+        lat_low = max(lat - delta_lat, -90.0)
+        lat_high = min(lat + delta_lat, 90.0)
+        lat_cells = np.arange(self._lat_cell(lat_low), self._lat_cell(lat_high) + 1)
+
+        # Widest longitude offset of the circle; it wraps every meridian near the poles
+        cos_lat = np.cos(np.radians(lat))
+        if lat_low <= -90.0 or lat_high >= 90.0 or np.sin(angular_radius) >= cos_lat:
+            lng_cells = np.arange(self.lng_cells)
+        else:
+            delta_lng = np.degrees(np.arcsin(np.sin(angular_radius) / cos_lat))
+            first = int(np.floor((lng - delta_lng + 180) / self.cell_deg))
+            last = int(np.floor((lng + delta_lng + 180) / self.cell_deg))
+            if last - first + 1 >= self.lng_cells:
+                lng_cells = np.arange(self.lng_cells)
+            else:
+                lng_cells = np.arange(first, last + 1) % self.lng_cells
+
+        if len(lat_cells) * len(lng_cells) >= len(self.keys):
+            # Probing would visit more cells than are occupied; scan them all instead
+            return np.sort(self.rows)
+
+        probe = self._cell_key(lat_cells[:, None], lng_cells[None, :]).ravel()
+        slots = np.searchsorted(self.keys, probe)
+        found = slots < len(self.keys)
+        slots, probe = slots[found], probe[found]
+        hits = slots[self.keys[slots] == probe]
+        if len(hits) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        # Gather the row runs of all hit cells in one shot
+        starts = self.starts[hits]
+        lengths = self.starts[hits + 1] - starts
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return np.sort(self.rows[offsets + np.arange(lengths.sum())])
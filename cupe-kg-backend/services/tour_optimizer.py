@@ -0,0 +1,259 @@
+# cupe-kg-backend/services/tour_optimizer.py
+
+"""
+Route ordering optimization for CuPe-KG
+Small itineraries are solved exactly with Held-Karp bitmask DP; larger ones get vectorized
+2-opt and Or-opt moves applied to a greedy tour until no move shortens it or the time
+budget runs out
+"""
+
+import logging
+import math
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Longest segment Or-opt relocates
+OR_OPT_MAX_SEGMENT = 3
+# Moves must gain more than this (km) so float noise cannot cycle
+MIN_GAIN = 1e-7
+
+
+@dataclass
+class TourImprovement:
+    """Result of improve_tour / solve_exact: the new visiting order and the tour length before and after"""
+    order: List[int]
+    initial_length: float
+    final_length: float
+    moves: int
+    closed: bool
+    exact: bool = False
+
+    def to_metrics(self) -> Dict[str, Any]:
+        """
+        Route.metrics representation. A length over a missing (inf) distance is reported as
+        None, as is the improvement it would feed, so the metrics always serialize as JSON.
+        """
+        initial = round(self.initial_length, 1) if math.isfinite(self.initial_length) else None
+        final = round(self.final_length, 1) if math.isfinite(self.final_length) else None
+        if initial is None or final is None:
+            improvement = None
+        else:
+            saved = self.initial_length - self.final_length
+            improvement = round(100 * saved / self.initial_length, 1) if self.initial_length else 0.0
+        return {
+            'initialLengthKm': initial,
+            'optimizedLengthKm': final,
+            'improvementPercent': improvement,
+            'roundTrip': self.closed,
+            'optimal': self.exact
+        }
+
+
+def tour_length(order: Sequence[int], distances: np.ndarray, closed: bool = False) -> float:
+    """Length of visiting order under distances, including the return leg when closed"""
+    if len(order) < 2:
+        return 0.0
+    order = np.asarray(order)
+    length = float(distances[order[:-1], order[1:]].sum())
+    if closed:
+        length += float(distances[order[-1], order[0]])
+    return length
+
+
+def _finite(distances: np.ndarray) -> np.ndarray:
+    """float64 copy with missing (inf/nan) distances replaced by a prohibitive finite cost"""
+    matrix = np.asarray(distances, dtype=np.float64)
+    finite = np.isfinite(matrix)
+    if finite.all():
+        return matrix.copy()
+    penalty = (matrix[finite].max() + 1) * len(matrix) if finite.any() else 1.0
+    return np.where(finite, matrix, penalty)
+
+
+def _best_two_opt(seq: np.ndarray, dist: np.ndarray):
+    """
+    Best reversal of seq[i+1..j] over all 0 <= i < j <= len-2; both ends of seq stay fixed.
+    Returns (gain, i, j).
+    """
+    heads, tails = seq[:-1], seq[1:]
+    edges = dist[heads, tails]
+    delta = (dist[heads[:, None], heads[None, :]] + dist[tails[:, None], tails[None, :]]
+             - edges[:, None] - edges[None, :])
+    delta[np.tril_indices(len(heads), 1)] = 0
+    i, j = np.unravel_index(np.argmin(delta), delta.shape)
+    return -delta[i, j], int(i), int(j)
+
+
+def _best_or_opt(seq: np.ndarray, dist: np.ndarray):
+    """
+    Best relocation of an interior segment of 1..OR_OPT_MAX_SEGMENT stops to another edge,
+    forwards or reversed. Returns (gain, start, length, edge, reversed).
+    """
+    best = (0.0, 0, 0, 0, False)
+    last_pos = len(seq) - 1
+    edge_heads, edge_tails = seq[:-1], seq[1:]
+    edge_costs = dist[edge_heads, edge_tails]
+    edge_index = np.arange(len(edge_heads))
+    for length in range(1, min(OR_OPT_MAX_SEGMENT, last_pos - 1) + 1):
+        starts = np.arange(1, last_pos - length + 1)
+        prev, first = seq[starts - 1], seq[starts]
+        last, nxt = seq[starts + length - 1], seq[starts + length]
+        removal_gain = dist[prev, first] + dist[last, nxt] - dist[prev, nxt]
+
+        forward = (dist[edge_heads[None, :], first[:, None]] + dist[last[:, None], edge_tails[None, :]]
+                   - edge_costs[None, :])
+        backward = (dist[edge_heads[None, :], last[:, None]] + dist[first[:, None], edge_tails[None, :]]
+                    - edge_costs[None, :])
+        # Edges touching the segment itself are not insertion points
+        touching = ((edge_index[None, :] >= starts[:, None] - 1) &
+                    (edge_index[None, :] <= starts[:, None] + length - 1))
+        for reverse, insertion in ((False, forward), (True, backward)):
+            gain = removal_gain[:, None] - insertion
+            gain[touching] = 0
+            row, edge = np.unravel_index(np.argmax(gain), gain.shape)
+            if gain[row, edge] > best[0]:
+                best = (gain[row, edge], int(starts[row]), length, int(edge), reverse)
+    return best
+
+
+def _apply_or_opt(seq: np.ndarray, start: int, length: int, edge: int, reverse: bool) -> np.ndarray:
+    segment = seq[start:start + length]
+    if reverse:
+        segment = segment[::-1]
+    rest = np.concatenate([seq[:start], seq[start + length:]])
+    # Edge (seq[edge], seq[edge + 1]) in the original; its head shifts left if it was after the segment
+    insert_at = edge + 1 if edge < start else edge + 1 - length
+    return np.concatenate([rest[:insert_at], segment, rest[insert_at:]])
+
+
+def improve_tour(order: Sequence[int], distances: np.ndarray, closed: bool = False,
+                 fixed_end: bool = False, time_budget_ms: Optional[float] = None) -> TourImprovement:
+    """
+    Improve a visiting order (indices into distances) with 2-opt and Or-opt moves,
+    taking the best move of either kind each round, until none shortens the tour or the
+    time budget (Config.ROUTE_IMPROVEMENT_BUDGET_MS by default) is spent.
+
+    The first stop always stays first. closed scores the return leg to it (round trip);
+    otherwise the tour is a path whose last stop is free unless fixed_end is set.
+    """
+    if time_budget_ms is None:
+        time_budget_ms = Config.ROUTE_IMPROVEMENT_BUDGET_MS
+    order = [int(index) for index in order]
+    initial_length = tour_length(order, distances, closed)
+
+    # Every variant becomes a sequence with both ends pinned. A round trip repeats the first
+    # stop at the end; a free end is pinned to a virtual stop at zero distance from all others.
+    dist = _finite(distances)
+    if closed:
+        seq = np.array(order + [order[0]])
+    elif fixed_end:
+        seq = np.array(order)
+    else:
+        virtual = len(dist)
+        dist = np.pad(dist, ((0, 1), (0, 1)))
+        seq = np.array(order + [virtual])
+    if len(seq) < 4 or time_budget_ms <= 0:
+        # Fewer than two movable stops: nothing to improve
+        return TourImprovement(order, initial_length, initial_length, 0, closed)
+
+    deadline = time.perf_counter() + time_budget_ms / 1000
+    moves = 0
+    while time.perf_counter() < deadline:
+        two_opt_gain, i, j = _best_two_opt(seq, dist)
+        or_opt_gain, start, length, edge, reverse = _best_or_opt(seq, dist)
+        if max(two_opt_gain, or_opt_gain) <= MIN_GAIN:
+            break
+        if two_opt_gain >= or_opt_gain:
+            seq[i + 1:j + 1] = seq[i + 1:j + 1][::-1]
+        else:
+            seq = _apply_or_opt(seq, start, length, edge, reverse)
+        moves += 1
+    else:
+        logger.info(f"Route improvement stopped at the {time_budget_ms}ms budget after {moves} moves")
+
+    improved = [int(index) for index in (seq if fixed_end and not closed else seq[:-1])]
+    return TourImprovement(improved, initial_length, tour_length(improved, distances, closed), moves, closed)
+
+
+def solve_exact(order: Sequence[int], distances: np.ndarray, closed: bool = False,
+                fixed_end: bool = False) -> TourImprovement:
+    """
+    Optimal visiting order of the stops in order (indices into distances) by Held-Karp
+    dynamic programming over bitmasks of the movable stops, one subset size at a time.
+    Same conventions as improve_tour: the first stop stays first, closed adds the return
+    leg, and fixed_end keeps the last stop last. Time is O(2^m * m^2) and memory
+    O(2^m * m) for m movable stops, so callers bound the size (Config.EXACT_ROUTE_MAX_STOPS).
+    """
+    order = [int(index) for index in order]
+    initial_length = tour_length(order, distances, closed)
+    start = order[0]
+    end = order[-1] if fixed_end and not closed and len(order) > 1 else None
+    middle = np.array(order[1:-1] if end is not None else order[1:], dtype=np.int64)
+    count = len(middle)
+    if count <= 1:
+        return TourImprovement(order, initial_length, initial_length, 0, closed, exact=True)
+
+    dist = _finite(distances)
+    between = dist[np.ix_(middle, middle)]
+    if closed:
+        to_finish = dist[middle, start]
+    elif end is not None:
+        to_finish = dist[middle, end]
+    else:
+        to_finish = np.zeros(count)
+
+    # cost[mask, j]: shortest path from start through the stops in mask, ending at stop j
+    size = 1 << count
+    cost = np.full((size, count), np.inf)
+    parent = np.full((size, count), -1, dtype=np.int8)
+    cost[1 << np.arange(count), np.arange(count)] = dist[start, middle]
+
+    masks = np.arange(size)
+    bits = (masks[:, None] >> np.arange(count)[None, :]) & 1
+    popcount = bits.sum(axis=1)
+    for subset_size in range(2, count + 1):
+        layer = masks[popcount == subset_size]
+        layer_bits = bits[layer]
+        for j in range(count):
+            with_j = layer[layer_bits[:, j] == 1]
+            # Masks without j are finished (one size smaller); cost is inf wherever i is not in them
+            candidates = cost[with_j ^ (1 << j)] + between[:, j]
+            best = np.argmin(candidates, axis=1)
+            cost[with_j, j] = candidates[np.arange(len(with_j)), best]
+            parent[with_j, j] = best
+
+    full = size - 1
+    last = int(np.argmin(cost[full] + to_finish))
+    path = []
+    mask, stop = full, last
+    while stop >= 0:
+        path.append(stop)
+        mask, stop = mask ^ (1 << stop), int(parent[mask, stop])
+    path.reverse()
+
+    best_order = [start] + [int(middle[stop]) for stop in path] + ([end] if end is not None else [])
+    return TourImprovement(best_order, initial_length, tour_length(best_order, distances, closed), 0, closed,
+                           exact=True)
+
+
+def optimize_order(order: Sequence[int], distances: np.ndarray, closed: bool = False,
+                   fixed_end: bool = False, free_start: bool = False) -> TourImprovement:
+    """
+    Solve exactly up to Config.EXACT_ROUTE_MAX_STOPS stops, otherwise improve with local search.
+    free_start lets any stop come first on a path (it is ignored for round trips): the stops
+    are ordered after a virtual depot at zero distance from all of them, which is dropped again.
+    The depot does not count towards the stop limit.
+    """
+    exact = len(order) <= Config.EXACT_ROUTE_MAX_STOPS
+    solve = solve_exact if exact else improve_tour
+    if free_start and not closed and len(order) > 1:
+        virtual = len(distances)
+        padded = np.pad(np.asarray(distances, dtype=np.float64), ((0, 1), (0, 1)))
+        result = solve([virtual] + [int(index) for index in order], padded, fixed_end=fixed_end)
+        return replace(result, order=result.order[1:])
+    return solve(order, distances, closed=closed, fixed_end=fixed_end)
@@ -0,0 +1,119 @@
+# cupe-kg-backend/services/travel_matrix.py
+
+"""
+On-disk distance matrix for CuPe-KG
+The matrix is a plain .npy file opened with np.load(mmap_mode='r'), so every worker process
+shares the same page-cache pages and only the rows a request touches are read from disk
+"""
+
+import json
+import logging
+import os
+import tempfile
+from typing import Dict, Optional
+import numpy as np
+from utils.geo import haversine_matrix_km
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'matrices.json'
+DISTANCE_FILE = 'distance_km.npy'
+
+class MatrixStore:
+    """Memory-mapped distance matrix (km) in dataset row order"""
+
+    def __init__(self, directory: str, distance: np.ndarray):
+        self.directory = directory
+        self.distance = distance
+
+    def __len__(self) -> int:
+        return self.distance.shape[0]
+
+    def distances(self, rows_a: np.ndarray, rows_b: Optional[np.ndarray] = None) -> np.ndarray:
+        """Submatrix of distances; fancy indexing copies only the touched rows out of the map"""
+        if rows_b is None:
+            rows_b = rows_a
+        return self.distance[np.ix_(rows_a, rows_b)]
+
+
+def _temp_path(directory: str, name: str) -> str:
+    """New empty temp file next to name in directory, so os.replace onto it stays atomic"""
+    fd, path = tempfile.mkstemp(prefix=f".{name}.", suffix='.tmp', dir=directory)
+    os.close(fd)
+    # mkstemp files are private; the renamed file must stay readable by every worker
+    os.chmod(path, 0o644)
+    return path
+
+
+def write_matrices(columns, directory: str, dataset_version: str, block_rows: int = 1024) -> Dict[str, int]:
+    """
+    Write the distance matrix for columns as a .npy file, one block of rows at a time so
+    the full matrix never has to fit in memory.
+
+    Everything is written to temp files in directory first and then renamed into place
+    with os.replace, the manifest last. Processes that already mapped the old matrix keep
+    reading the old file, and a failed build leaves the previous one intact.
+    Returns the size of every file written.
+    """
+    count = len(columns)
+    os.makedirs(directory, exist_ok=True)
+    distance_path = os.path.join(directory, DISTANCE_FILE)
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+
+    temp_distance = _temp_path(directory, DISTANCE_FILE)
+    temp_manifest = _temp_path(directory, MANIFEST_FILE)
+    try:
+        distance = np.lib.format.open_memmap(temp_distance, mode='w+', dtype=np.float32, shape=(count, count))
+        for start in range(0, count, block_rows):
+            stop = min(start + block_rows, count)
+            block = haversine_matrix_km(columns.lat[start:stop], columns.lng[start:stop], columns.lat, columns.lng)
+            distance[start:stop] = np.where(np.isnan(block), np.inf, block)
+        distance.flush()
+        del distance
+        with open(temp_manifest, 'w', encoding='utf-8') as f:
+            json.dump({'dataset_version': dataset_version, 'count': count}, f, indent=2)
+
+        # Drop the old manifest first so no reader pairs it with the new matrix
+        if os.path.exists(manifest_path):
+            os.unlink(manifest_path)
+        os.replace(temp_distance, distance_path)
+        os.replace(temp_manifest, manifest_path)
+    finally:
+        for path in (temp_distance, temp_manifest):
+            if os.path.exists(path):
+                os.unlink(path)
+    return {name: os.path.getsize(os.path.join(directory, name)) for name in (DISTANCE_FILE, MANIFEST_FILE)}
+
+
+def open_matrices(directory: Optional[str], dataset_version: Optional[str], count: int) -> Optional[MatrixStore]:
+    """
+    Memory-map the matrices in directory if they were built for this dataset version.
+    Returns None when there are none, or they are stale or unreadable.
+    """
+    if not directory or dataset_version is None:
+        return None
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    try:
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read matrix manifest {manifest_path}: {e}")
+        return None
+
+    if manifest.get('dataset_version') != dataset_version or manifest.get('count') != count:
+        logger.info(f"Matrices in {directory} were built for another dataset version, ignoring them")
+        return None
+
+    try:
+        distance = np.load(os.path.join(directory, DISTANCE_FILE), mmap_mode='r')
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not open matrices in {directory}: {e}")
+        return None
+    if distance.shape != (count, count):
+        logger.warning(f"Matrices in {directory} do not match {count} locations, ignoring them")
+        return None
+
+    logger.info(f"Memory-mapped {count}x{count} distance matrix from {directory}")
+    return MatrixStore(directory, distance)
@@ -0,0 +1,76 @@
+# cupe-kg-backend/tests/test_async_kg_service.py
+
+import asyncio
+import pytest
+from models.location import Location
+from services.async_kg_service import AsyncKnowledgeGraphService
+from services.location_cache import LocationCache
+
+
+def make_location(location_id):
+    return Location.from_dict({'id': location_id, 'name': location_id.title(),
+                               'coordinates': {'lat': 12.0, 'lng': 77.0}})
+
+
+class SyncService:
+    """Stands in for a Neo4j-mode KnowledgeGraphService whose sync reads still answer"""
+    use_placeholder = False
+
+    def __init__(self):
+        self.location_cache = LocationCache(ttl=60, version_check_interval=60, version_loader=lambda: 1)
+        self.calls = []
+
+    def get_all_locations(self):
+        self.calls.append('all')
+        return [make_location('hampi')]
+
+    def get_location_by_id(self, location_id):
+        self.calls.append(('by_id', location_id))
+        return make_location(location_id)
+
+    def get_related_locations(self, location_id, max_results=5):
+        self.calls.append(('related', location_id, max_results))
+        return [make_location('badami').to_dict()]
+
+    def search_locations(self, query):
+        self.calls.append(('search', query))
+        return [make_location('hampi')]
+
+
+@pytest.fixture
+def service(monkeypatch):
+    async_service = AsyncKnowledgeGraphService(SyncService())
+
+    def unavailable():
+        raise ConnectionError("Neo4j is down")
+
+    monkeypatch.setattr(async_service, '_session', unavailable)
+    return async_service
+
+
+def test_failed_async_reads_fall_back_to_the_sync_service(service):
+    sync = service.kg_service
+    assert [loc.id for loc in asyncio.run(service.get_all_locations())] == ['hampi']
+    assert asyncio.run(service.get_location_by_id('hampi')).id == 'hampi'
+    assert [loc['id'] for loc in asyncio.run(service.get_related_locations('hampi', 3))] == ['badami']
+    assert [loc.id for loc in asyncio.run(service.search_locations('ham'))] == ['hampi']
+    assert sync.calls == ['all', ('by_id', 'hampi'), ('related', 'hampi', 3), ('search', 'ham')]
+
+
+def test_place_info_falls_back_for_both_halves(service):
+    location, related = asyncio.run(service.get_place_info('hampi', 2))
+    assert location.id == 'hampi'
+    assert [loc['id'] for loc in related] == ['badami']
+
+
+def test_cached_locations_are_served_without_the_driver(service):
+    cache = service.kg_service.location_cache
+    hampi, badami = make_location('hampi'), make_location('badami')
+    # The first version check clears the cache, so take it before storing
+    cache.current_version()
+    cache.store([hampi])
+    cache.store_related('hampi', 5, [badami])
+
+    assert asyncio.run(service.get_location_by_id('hampi')) is hampi
+    assert [loc['id'] for loc in asyncio.run(service.get_related_locations('hampi'))] == ['badami']
+    assert service.kg_service.calls == []
@@ -0,0 +1,22 @@
+# cupe-kg-backend/tests/test_fulltext_recheck.py
+
+from config import Config
+from services.kg_service import fulltext_recheck_due
+
+
+def test_unchecked_index_is_checked(monkeypatch):
+    monkeypatch.setattr('services.kg_service.time.monotonic', lambda: 0.0)
+    assert fulltext_recheck_due(None, 0.0)
+
+
+def test_found_index_is_never_rechecked(monkeypatch):
+    monkeypatch.setattr('services.kg_service.time.monotonic', lambda: 1e9)
+    assert not fulltext_recheck_due(True, 0.0)
+
+
+def test_missing_index_is_rechecked_after_interval(monkeypatch):
+    interval = Config.NEO4J_FULLTEXT_INDEX_RECHECK_INTERVAL
+    monkeypatch.setattr('services.kg_service.time.monotonic', lambda: 100.0 + interval / 2)
+    assert not fulltext_recheck_due(False, 100.0)
+    monkeypatch.setattr('services.kg_service.time.monotonic', lambda: 100.0 + interval)
+    assert fulltext_recheck_due(False, 100.0)
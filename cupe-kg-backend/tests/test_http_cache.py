@@ -0,0 +1,71 @@
+# cupe-kg-backend/tests/test_http_cache.py
+
+import gzip
+import pytest
+from flask import Flask
+from utils import compression
+from utils.compression import init_compression
+from utils.http_cache import conditional_get
+
+LARGE = 'x' * 5000
+SMALL = 'tiny'
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(compression, 'brotli', None)
+    monkeypatch.setattr(compression, 'precompressed_responses', compression.PrecompressedCache(16))
+    monkeypatch.setattr('utils.http_cache.precompressed_responses', compression.precompressed_responses)
+    app = Flask(__name__)
+    init_compression(app)
+    calls = []
+
+    @app.route('/large')
+    @conditional_get(lambda: 'v1')
+    def large():
+        calls.append('large')
+        return {'body': LARGE}
+
+    @app.route('/small')
+    @conditional_get(lambda: 'v1')
+    def small():
+        calls.append('small')
+        return {'body': SMALL}
+
+    test_client = app.test_client()
+    test_client.calls = calls
+    return test_client
+
+
+def test_compressed_response_carries_suffixed_etag(client):
+    response = client.get('/large', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.get_etag()[0].endswith('-gzip')
+    assert LARGE in gzip.decompress(response.get_data()).decode()
+
+    plain = client.get('/large')
+    assert 'Content-Encoding' not in plain.headers
+    assert response.get_etag()[0] == plain.get_etag()[0] + '-gzip'
+
+
+def test_identity_body_keeps_plain_etag_even_when_gzip_is_accepted(client):
+    accepted = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+    plain = client.get('/small')
+    assert 'Content-Encoding' not in accepted.headers
+    assert accepted.get_etag()[0] == plain.get_etag()[0]
+    assert not accepted.get_etag()[0].endswith('-gzip')
+
+
+def test_revalidation_matches_the_representation_sent(client):
+    compressed = client.get('/large', headers={'Accept-Encoding': 'gzip'}).get_etag()[0]
+    client.calls.clear()
+    response = client.get('/large', headers={'Accept-Encoding': 'gzip', 'If-None-Match': f'"{compressed}"'})
+    assert response.status_code == 304 and response.get_etag()[0] == compressed
+    assert client.calls == []
+
+    # The compressed tag does not validate the identity representation
+    assert client.get('/large', headers={'If-None-Match': f'"{compressed}"'}).status_code == 200
+
+    small = client.get('/small', headers={'Accept-Encoding': 'gzip'}).get_etag()[0]
+    response = client.get('/small', headers={'Accept-Encoding': 'gzip', 'If-None-Match': f'"{small}"'})
+    assert response.status_code == 304 and response.get_etag()[0] == small
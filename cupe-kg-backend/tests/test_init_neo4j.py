@@ -0,0 +1,79 @@
+# cupe-kg-backend/tests/test_init_neo4j.py
+
+import random
+from collections import defaultdict
+from itertools import combinations
+import pytest
+
+init_neo4j = pytest.importorskip('scripts.init_neo4j')
+
+
+class FakeSession:
+    """Answers the block query with fixed rows and records the edge batches written"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.batches = []
+
+    def run(self, query, **params):
+        if 'DELETE r' in query:
+            return FakeResult([{'deleted': 0}])
+        return FakeResult(self.rows)
+
+    def execute_write(self, work, batch):
+        self.batches.append((work.__name__, list(batch)))
+
+
+class FakeResult(list):
+    def single(self):
+        return self[0]
+
+
+def random_rows(seed, count=60):
+    rng = random.Random(seed)
+    tags = [f'tag{i}' for i in range(8)]
+    return [{'id': f'loc{i:03d}', 'tags': rng.sample(tags, rng.randint(0, 4)),
+             'dynasty': rng.choice(['Chola', 'Mughal', 'Maurya', None])}
+            for i in range(count)]
+
+
+def all_pairs_themes(rows):
+    """Reference: every shared-tag pair collected at once"""
+    shared = defaultdict(list)
+    blocks = defaultdict(list)
+    for row in rows:
+        for tag in set(row['tags']):
+            blocks[tag].append(row['id'])
+    for tag, ids in blocks.items():
+        for source, target in combinations(sorted(ids), 2):
+            shared[(source, target)].append(tag)
+    return {pair: sorted(tags) for pair, tags in shared.items()}
+
+
+def test_streamed_theme_pairs_match_all_pairs_reference():
+    rows = random_rows(1)
+    tag_blocks, _ = init_neo4j.relationship_blocks(FakeSession(rows))
+    streamed = {(pair['source'], pair['target']): pair['theme'] for pair in init_neo4j.theme_pairs(tag_blocks)}
+    assert streamed == all_pairs_themes(rows)
+    assert all(source < target for source, target in streamed)
+
+
+def test_oversized_blocks_are_skipped():
+    rows = [{'id': f'loc{i}', 'tags': ['common'] + (['rare'] if i < 3 else []), 'dynasty': 'Chola'}
+            for i in range(10)]
+    tag_blocks, dynasty_blocks = init_neo4j.relationship_blocks(FakeSession(rows), max_block=5)
+    assert set(tag_blocks) == {'rare'}
+    assert dynasty_blocks == {}
+
+
+def test_edges_are_written_in_bounded_batches():
+    rows = random_rows(2)
+    session = FakeSession(rows)
+    init_neo4j.create_relationships(session, batch_size=7)
+    assert all(len(batch) <= 7 for _, batch in session.batches)
+    themes = [pair for name, batch in session.batches if name == '_create_theme_edges' for pair in batch]
+    dynasties = [pair for name, batch in session.batches if name == '_create_dynasty_edges' for pair in batch]
+    assert len(themes) == len(all_pairs_themes(rows))
+    expected_dynasty = sum(len(list(combinations([r for r in rows if r['dynasty'] == d], 2)))
+                           for d in {'Chola', 'Mughal', 'Maurya'})
+    assert len(dynasties) == expected_dynasty
@@ -0,0 +1,149 @@
+# cupe-kg-backend/tests/test_location_cache.py
+
+import pytest
+from models.location import Location
+from services.location_cache import LocationCache
+
+
+def make_location(location_id, **fields):
+    return Location.from_dict({'id': location_id, 'name': location_id.title(),
+                               'coordinates': {'lat': 12.0, 'lng': 77.0}, **fields})
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr('services.location_cache.time.monotonic', fake)
+    return fake
+
+
+@pytest.fixture
+def version():
+    return {'value': 1}
+
+
+@pytest.fixture
+def cache(clock, version):
+    return LocationCache(ttl=60, version_check_interval=5, version_loader=lambda: version['value'])
+
+
+def test_get_all_is_cached_until_ttl(cache, clock):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return [make_location('hampi')]
+
+    assert [loc.id for loc in cache.get_all(loader)] == ['hampi']
+    cache.get_all(loader)
+    assert len(calls) == 1
+
+    clock.now += 61
+    cache.get_all(loader)
+    assert len(calls) == 2
+
+
+def test_list_rows_do_not_answer_by_id_lookups(cache):
+    partial = make_location('hampi')
+    full = make_location('hampi', legends=[{'title': 'Kishkindha', 'story': 'Monkey kingdom'}],
+                         entryFee='40 INR')
+    cache.get_all(lambda: [partial])
+
+    loaded = []
+
+    def load_one(location_id):
+        loaded.append(location_id)
+        return full
+
+    assert cache.get('hampi', load_one) is full
+    assert loaded == ['hampi']
+    assert cache.get_many(['hampi'], lambda ids: pytest.fail("should be cached")) == [full]
+
+
+def test_get_many_loads_only_misses_in_one_call(cache):
+    cache.get('hampi', lambda location_id: make_location(location_id))
+    batches = []
+
+    def load_many(ids):
+        batches.append(list(ids))
+        return [make_location(location_id) for location_id in ids]
+
+    result = cache.get_many(['hampi', 'agra', 'hampi', 'delhi'], load_many)
+    assert batches == [['agra', 'delhi']]
+    assert [loc.id for loc in result] == ['hampi', 'agra', 'hampi', 'delhi']
+
+
+def test_unknown_ids_are_not_cached(cache):
+    loaded = []
+
+    def load_one(location_id):
+        loaded.append(location_id)
+        return None
+
+    assert cache.get('missing', load_one) is None
+    assert cache.get('missing', load_one) is None
+    assert loaded == ['missing', 'missing']
+
+
+def test_version_change_drops_entries_after_check_interval(cache, clock, version):
+    cache.get('hampi', lambda location_id: make_location(location_id))
+    version['value'] = 2
+
+    # Within the check interval the version is not re-polled
+    clock.now += 1
+    cache.get('hampi', lambda location_id: pytest.fail("should be cached"))
+
+    clock.now += 5
+    reloaded = []
+    cache.get('hampi', lambda location_id: reloaded.append(location_id) or make_location(location_id))
+    assert reloaded == ['hampi']
+    assert cache.current_version() == 2
+
+
+def test_version_loader_errors_keep_entries(cache, clock):
+    cache.get('hampi', lambda location_id: make_location(location_id))
+
+    def broken():
+        raise RuntimeError("neo4j down")
+
+    cache._version_loader = broken
+    clock.now += 10
+    assert cache.get('hampi', lambda location_id: pytest.fail("should be cached")).id == 'hampi'
+
+
+def test_lookup_and_store_share_by_id_entries(cache):
+    found, missing = cache.lookup(['hampi', 'badami', 'hampi'])
+    assert found == {} and missing == ['hampi', 'badami']
+
+    hampi = make_location('hampi')
+    cache.store([hampi])
+    assert cache.get('hampi', lambda location_id: pytest.fail('cached id was reloaded')) is hampi
+    found, missing = cache.lookup(['hampi', 'badami'])
+    assert found == {'hampi': hampi} and missing == ['badami']
+
+
+def test_related_locations_are_cached_per_location_and_limit(cache, clock, version):
+    calls = []
+
+    def loader(location_id, max_results):
+        calls.append((location_id, max_results))
+        return [make_location('badami'), make_location('aihole')][:max_results]
+
+    assert [loc.id for loc in cache.get_related('hampi', 2, loader)] == ['badami', 'aihole']
+    assert [loc.id for loc in cache.get_related('hampi', 2, loader)] == ['badami', 'aihole']
+    assert [loc.id for loc in cache.get_related('hampi', 1, loader)] == ['badami']
+    assert calls == [('hampi', 2), ('hampi', 1)]
+    # The related nodes also answer by-id lookups
+    assert cache.lookup(['aihole'])[1] == []
+
+    clock.now += 10
+    version['value'] = 2
+    assert cache.lookup_related('hampi', 2) is None
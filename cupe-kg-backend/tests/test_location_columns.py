@@ -0,0 +1,58 @@
+# cupe-kg-backend/tests/test_location_columns.py
+
+import numpy as np
+from config import Config
+from models.location import Location
+from services.location_columns import LocationColumns
+
+
+def build_columns():
+    locations = [Location.from_dict({'id': f'loc{i}', 'name': f'Loc {i}', 'category': 'historical',
+                                     'coordinates': {'lat': 10.0 + i, 'lng': 75.0 + i}})
+                 for i in range(5)]
+    return LocationColumns.build(locations)
+
+
+def test_cached_mask_is_memoized_and_read_only():
+    columns = build_columns()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return columns.all()
+
+    first = columns.cached_mask('all', build)
+    assert columns.cached_mask('all', build) is first
+    assert len(builds) == 1
+    assert not first.flags.writeable
+
+
+def test_cached_mask_keeps_only_most_recent_keys(monkeypatch):
+    monkeypatch.setattr(Config, 'MASK_CACHE_SIZE', 3)
+    columns = build_columns()
+    for key in range(10):
+        columns.cached_mask(('interest', str(key)), columns.none)
+    columns.cached_mask(('interest', '7'), lambda: np.ones(len(columns), dtype=bool))
+
+    assert list(columns._mask_cache) == [('interest', '8'), ('interest', '9'), ('interest', '7')]
+    assert not columns.cached_mask(('interest', '7'), columns.all).any()
+
+
+def test_distance_matrix_is_built_on_first_use_and_not_pickled():
+    import pickle
+
+    columns = build_columns()
+    assert columns.distance_matrix is None
+    rows = np.array([3, 1])
+    first = columns.distance_submatrix(rows)
+    assert columns.distance_matrix is not None
+    assert pickle.loads(pickle.dumps(columns)).distance_matrix is None
+    np.testing.assert_array_equal(pickle.loads(pickle.dumps(columns)).distance_submatrix(rows), first)
+
+
+def test_distance_submatrix_above_matrix_limit_is_computed_on_demand(monkeypatch):
+    expected = build_columns().distance_submatrix(np.array([0, 4, 2]))
+    monkeypatch.setattr(Config, 'DISTANCE_MATRIX_MAX_LOCATIONS', 3)
+    columns = build_columns()
+    np.testing.assert_allclose(columns.distance_submatrix(np.array([0, 4, 2])), expected, rtol=1e-6)
+    assert columns.distance_matrix is None
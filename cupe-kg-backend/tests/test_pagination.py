@@ -0,0 +1,79 @@
+# cupe-kg-backend/tests/test_pagination.py
+
+import json
+import pytest
+from config import Config
+from models import location as location_module
+from models.location import Location
+from utils.pagination import encode_cursor, decode_cursor, paginate, parse_page_args
+
+
+def make_location():
+    return Location.from_dict({
+        'id': 'hampi', 'name': 'Hampi', 'description': 'Vijayanagara capital', 'category': 'historical',
+        'coordinates': {'lat': 15.335, 'lng': 76.46}, 'period': '14th century', 'tags': ['UNESCO', 'Ruins'],
+        'entryFee': '40 INR'
+    })
+
+
+@pytest.mark.parametrize('offset', [0, 1, 37, 10 ** 6])
+def test_cursor_round_trip(offset):
+    assert decode_cursor(encode_cursor(offset)) == offset
+
+
+@pytest.mark.parametrize('cursor', ['', 'not-base64!', encode_cursor(3)[:-1] + '$', 'eDox'])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_paginate_reports_next_offset_until_the_end():
+    items = list(range(7))
+    assert paginate(items, 0, 3) == ([0, 1, 2], 3)
+    assert paginate(items, 3, 3) == ([3, 4, 5], 6)
+    assert paginate(items, 6, 3) == ([6], None)
+    assert paginate(items, 2, None) == ([2, 3, 4, 5, 6], None)
+
+
+def test_parse_page_args_defaults():
+    assert parse_page_args({}, Location.API_FIELDS) == (0, None, None)
+
+
+def test_parse_page_args_reads_cursor_and_limit():
+    offset, limit, fields = parse_page_args({'cursor': encode_cursor(20), 'limit': '5'}, Location.API_FIELDS)
+    assert (offset, limit, fields) == (20, 5, None)
+
+
+@pytest.mark.parametrize('limit', ['0', '-1', 'ten', str(Config.MAX_PAGE_LIMIT + 1)])
+def test_parse_page_args_rejects_bad_limits(limit):
+    with pytest.raises(ValueError):
+        parse_page_args({'limit': limit}, Location.API_FIELDS)
+
+
+def test_fields_are_canonical_regardless_of_request_order():
+    expected = ('id', 'category', 'name', 'tags')
+    assert parse_page_args({'fields': 'tags,name,category'}, Location.API_FIELDS)[2] == expected
+    assert parse_page_args({'fields': 'name, id,tags,category,name'}, Location.API_FIELDS)[2] == expected
+    assert parse_page_args({'fields': ['category', 'tags', 'name']}, Location.API_FIELDS)[2] == expected
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(ValueError, match='Unknown fields: bogus'):
+        parse_page_args({'fields': 'name,bogus'}, Location.API_FIELDS)
+
+
+def test_projection_output_matches_full_representation():
+    location = make_location()
+    fields = parse_page_args({'fields': 'entryFee,coordinates'}, Location.API_FIELDS)[2]
+    full = json.loads(location.to_json_bytes())
+    assert json.loads(location.to_json_bytes(fields)) == {name: full[name] for name in fields}
+    assert location.to_json_bytes(fields) == json.dumps(
+        {name: full[name] for name in fields}, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def test_projection_cache_is_bounded():
+    location = make_location()
+    for name in Location.API_FIELDS[1:]:
+        location.to_json_bytes(('id', name))
+    assert len(location._projection_cache) == location_module.PROJECTION_CACHE_SIZE
+    assert json.loads(location.to_json_bytes(('id', 'name'))) == {'id': 'hampi', 'name': 'Hampi'}
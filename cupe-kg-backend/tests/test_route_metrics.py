@@ -0,0 +1,73 @@
+# cupe-kg-backend/tests/test_route_metrics.py
+
+import json
+import numpy as np
+import pytest
+from models.route import RouteLocation
+from services.kg_service import KnowledgeGraphService
+from services.route_service import RouteService
+
+
+@pytest.fixture(scope='module')
+def route_service():
+    return RouteService(KnowledgeGraphService(use_placeholder=True, use_snapshot=False))
+
+
+def stop(name, coordinates):
+    return RouteLocation(name=name, coordinates=coordinates, description='')
+
+
+def test_route_metrics_describe_the_ordering(route_service):
+    stops = [stop('Hampi', [15.335, 76.46]), stop('Delhi', [28.61, 77.21]),
+             stop('Badami', [15.92, 75.68]), stop('Agra', [27.18, 78.04])]
+    ordered, metrics = route_service._optimize_route_order(stops, {'lat': 15.3, 'lng': 76.4})
+    assert ordered[0].name == 'Hampi'
+    assert [location.name for location in ordered] == ['Hampi', 'Badami', 'Agra', 'Delhi']
+    assert metrics['optimal'] and not metrics['roundTrip']
+    assert metrics['optimizedLengthKm'] <= metrics['initialLengthKm']
+
+
+def test_route_metrics_with_unusable_coordinates_are_valid_json(route_service):
+    stops = [stop('Hampi', [15.335, 76.46]), stop('Nowhere', []), stop('Badami', [15.92, 75.68])]
+    ordered, metrics = route_service._optimize_route_order(stops, None)
+    assert sorted(location.name for location in ordered) == ['Badami', 'Hampi', 'Nowhere']
+    assert metrics['initialLengthKm'] is None and metrics['improvementPercent'] is None
+    json.dumps(metrics, allow_nan=False)
+
+
+def dataset_locations(route_service, *ids):
+    return [route_service.kg_service.get_location_by_id(location_id) for location_id in ids]
+
+
+def test_round_trip_and_fixed_end_metrics(route_service):
+    locations = dataset_locations(route_service, 'taj-mahal', 'hampi', 'khajuraho', 'ajanta', 'ellora')
+    distances = route_service._travel_matrix(locations)
+
+    ordered, metrics = route_service._find_optimal_route(locations, distances)
+    assert metrics['roundTrip'] and metrics['optimal']
+    assert sorted(location.id for location in ordered) == sorted(location.id for location in locations)
+
+    ordered, metrics = route_service._find_optimal_route(locations, distances, locations[1], locations[0])
+    assert not metrics['roundTrip'] and metrics['optimal']
+    assert (ordered[0].id, ordered[-1].id) == ('hampi', 'taj-mahal')
+    assert metrics['optimizedLengthKm'] <= metrics['initialLengthKm']
+
+
+def test_round_trip_with_a_missing_distance(route_service):
+    locations = dataset_locations(route_service, 'taj-mahal', 'hampi', 'khajuraho', 'ajanta')
+    distances = route_service._travel_matrix(locations).astype(np.float64)
+    # A stop that cannot be measured from anywhere, as _calculate_travel_matrix marks it
+    distances[3, :3] = distances[:3, 3] = np.inf
+    ordered, metrics = route_service._find_optimal_route(locations, distances)
+    assert len(ordered) == 4
+    assert metrics['optimizedLengthKm'] is None and metrics['improvementPercent'] is None
+    json.dumps(metrics, allow_nan=False)
+
+
+def test_personalized_route_response_carries_metrics(route_service):
+    route = route_service.create_personalized_route_with_preferences(
+        {'interests': ['temple', 'fort'], 'max_travel_days': 6, 'start_location': {'lat': 15.3, 'lng': 76.4}})
+    body = json.loads(json.dumps(route.to_dict(), allow_nan=False))
+    assert set(body['metrics']) == {'initialLengthKm', 'optimizedLengthKm', 'improvementPercent',
+                                    'roundTrip', 'optimal'}
+    assert body['metrics']['optimizedLengthKm'] <= body['metrics']['initialLengthKm']
@@ -0,0 +1,29 @@
+# cupe-kg-backend/tests/test_route_selection.py
+
+import random
+import pytest
+from services.kg_service import KnowledgeGraphService
+from services.route_service import RouteService
+
+
+@pytest.fixture(scope='module')
+def route_service():
+    return RouteService(KnowledgeGraphService(use_placeholder=True, use_snapshot=False))
+
+
+@pytest.mark.parametrize('interests', [['temple'], ['fort', 'mughal'], ['buddhist', 'unesco', 'cave']])
+def test_columnar_interest_filter_matches_per_location_scoring_under_a_seed(route_service, interests):
+    columns = route_service.kg_service.get_location_columns()
+    random.seed(42)
+    expected = route_service._filter_locations_by_interests(columns.locations, interests)
+    random.seed(42)
+    assert [loc.id for loc in route_service._filter_rows_by_interests(columns, interests)] == \
+        [loc.id for loc in expected]
+
+
+def test_seeded_personalized_routes_are_reproducible(route_service):
+    preferences = {'interests': ['temple', 'fort'], 'startLocation': 'Delhi', 'maxDays': 5}
+    random.seed(7)
+    first = route_service.create_personalized_route(preferences).to_dict()
+    random.seed(7)
+    assert route_service.create_personalized_route(preferences).to_dict() == first
@@ -0,0 +1,51 @@
+# cupe-kg-backend/tests/test_search.py
+
+import random
+import pytest
+from models.location import Location
+from services.kg_service import KnowledgeGraphService
+from services.location_index import InvertedIndex
+
+
+@pytest.fixture(scope='module')
+def kg_service():
+    return KnowledgeGraphService(use_placeholder=True, use_snapshot=False)
+
+
+def substring_scan(kg_service, query):
+    """The original placeholder search: query as a substring of the searchable text"""
+    return [location.id for location in kg_service._ordered_locations
+            if query.lower() in InvertedIndex.searchable_text(location).lower()]
+
+
+def build_index(*texts):
+    locations = {f'loc{i}': Location.from_dict({'id': f'loc{i}', 'name': text, 'coordinates': {'lat': 0, 'lng': 0}})
+                 for i, text in enumerate(texts)}
+    return InvertedIndex.build(locations)
+
+
+def test_index_matches_whole_tokens_phrases_and_a_trailing_prefix():
+    index = build_index('Taj Mahal', 'Comfortable fort', 'Mahal, Taj')
+    assert index.search('mahal') == ['loc0', 'loc2']
+    assert index.search('taj mah') == ['loc0']
+    assert index.search('Fort') == ['loc1']
+    # Inside a word or out of phrase order: not an index match
+    assert index.search('ahal') == []
+    assert index.search('mahal taj') == ['loc2']
+    assert index.search('fort comfortable') == []
+
+
+def test_substring_queries_fall_back_to_a_scan(kg_service):
+    assert [location.id for location in kg_service.search_locations('ahal')] == substring_scan(kg_service, 'ahal')
+    assert 'taj-mahal' in [location.id for location in kg_service.search_locations('ahal')]
+    assert list(kg_service.iter_search_locations('ahal')) == kg_service.search_locations('ahal')
+    assert kg_service.search_locations('zzzq') == []
+
+
+def test_every_substring_of_the_data_still_finds_results(kg_service):
+    rng = random.Random(0)
+    for _ in range(500):
+        text = InvertedIndex.searchable_text(rng.choice(kg_service._ordered_locations))
+        start = rng.randrange(len(text))
+        query = text[start:start + rng.randint(2, 12)]
+        assert kg_service.search_locations(query), query
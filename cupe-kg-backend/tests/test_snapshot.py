@@ -0,0 +1,32 @@
+# cupe-kg-backend/tests/test_snapshot.py
+
+from services import snapshot
+from services.kg_service import KnowledgeGraphService
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / 'locations.snapshot')
+    built = KnowledgeGraphService(use_placeholder=True, use_snapshot=False)
+    built.save_snapshot(path)
+
+    loaded = KnowledgeGraphService(use_placeholder=True, use_snapshot=False)
+    assert loaded.load_snapshot(path)
+    assert list(loaded.placeholder_locations) == list(built.placeholder_locations)
+    assert loaded.dataset_version == built.dataset_version
+
+
+def test_code_changes_make_the_snapshot_stale(tmp_path, monkeypatch):
+    module = tmp_path / 'location_columns.py'
+    module.write_text('VERSION = 1\n')
+    real_module_path = snapshot.module_path
+
+    def module_path(name):
+        return str(module) if name == 'services.location_columns' else real_module_path(name)
+
+    monkeypatch.setattr(snapshot, 'module_path', module_path)
+    path = str(tmp_path / 'payload.snapshot')
+    snapshot.write_snapshot(path, {'rows': [1, 2]}, snapshot.source_hash('settings'))
+    assert snapshot.read_snapshot(path, snapshot.source_hash('settings')) == {'rows': [1, 2]}
+
+    module.write_text('VERSION = 2\n')
+    assert snapshot.read_snapshot(path, snapshot.source_hash('settings')) is None
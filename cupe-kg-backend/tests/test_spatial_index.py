@@ -0,0 +1,88 @@
+# cupe-kg-backend/tests/test_spatial_index.py
+
+import numpy as np
+import pytest
+from werkzeug.datastructures import MultiDict
+from models.location import Location
+from services.location_columns import LocationColumns
+from services.spatial_index import GridIndex
+from utils.geo import haversine_km, parse_search_area
+
+
+@pytest.fixture(scope='module')
+def points():
+    rng = np.random.default_rng(7)
+    count = 20000
+    # Uniform over the sphere, plus a dense cluster and a few rows without coordinates
+    lat = np.degrees(np.arcsin(rng.uniform(-1, 1, count)))
+    lng = rng.uniform(-180, 180, count)
+    lat[:2000] = rng.uniform(8, 35, 2000)
+    lng[:2000] = rng.uniform(68, 97, 2000)
+    lat[2000:2050] = np.nan
+    return lat, lng
+
+
+def brute_force(lat, lng, query_lat, query_lng, radius_km):
+    with np.errstate(invalid='ignore'):
+        return np.flatnonzero(haversine_km(query_lat, query_lng, lat, lng) <= radius_km)
+
+
+def test_candidates_cover_every_row_within_radius(points):
+    lat, lng = points
+    index = GridIndex.build(lat, lng, 0.5)
+    rng = np.random.default_rng(11)
+    queries = [(rng.uniform(-90, 90), rng.uniform(-180, 180), rng.choice([1, 10, 50, 200, 1000, 5000]))
+               for _ in range(300)]
+    # Poles, the antimeridian and a radius covering the whole globe
+    queries += [(89.9, 179.99, 100), (-89.9, -179.99, 100), (0.0, 179.99, 300), (0.0, -179.99, 300),
+                (20.0, 78.0, 21000)]
+    for query_lat, query_lng, radius_km in queries:
+        candidates = index.candidates(query_lat, query_lng, radius_km)
+        assert np.all(np.diff(candidates) > 0)
+        assert np.isin(brute_force(lat, lng, query_lat, query_lng, radius_km), candidates).all()
+
+
+def test_candidates_skip_rows_without_coordinates(points):
+    lat, lng = points
+    index = GridIndex.build(lat, lng, 0.5)
+    assert len(index) == np.count_nonzero(~np.isnan(lat))
+    assert not np.isin(np.arange(2000, 2050), index.candidates(0.0, 0.0, 25000)).any()
+
+
+def test_rows_within_matches_brute_force():
+    rng = np.random.default_rng(3)
+    locations = [Location.from_dict({'id': f'loc{i}', 'name': f'Loc {i}',
+                                     'coordinates': {'lat': rng.uniform(8, 35), 'lng': rng.uniform(68, 97)}})
+                 for i in range(500)]
+    columns = LocationColumns.build(locations)
+    for radius_km in (5, 50, 300, 5000):
+        rows, distances = columns.rows_within(20.0, 78.0, radius_km)
+        expected = brute_force(columns.lat, columns.lng, 20.0, 78.0, radius_km)
+        np.testing.assert_array_equal(rows, expected)
+        np.testing.assert_allclose(distances, haversine_km(20.0, 78.0, columns.lat[rows], columns.lng[rows]))
+
+
+@pytest.mark.parametrize('radius_km', [-1.0, float('nan')])
+def test_invalid_radius_finds_nothing(points, radius_km):
+    index = GridIndex.build(*points, 0.5)
+    assert len(index.candidates(20.0, 78.0, radius_km)) == 0
+
+
+@pytest.mark.parametrize('radius', ['nan', 'inf', '-inf', '0', '-5', 'far'])
+def test_parse_search_area_rejects_bad_radius(radius):
+    with pytest.raises(ValueError):
+        parse_search_area(MultiDict({'lat': '20', 'lng': '78', 'radius': radius}))
+
+
+@pytest.mark.parametrize('lat, lng', [('nan', '78'), ('20', 'inf'), ('91', '78'), (None, '78')])
+def test_parse_search_area_rejects_bad_coordinates(lat, lng):
+    args = {'lng': lng, 'radius': '50'}
+    if lat is not None:
+        args['lat'] = lat
+    with pytest.raises(ValueError):
+        parse_search_area(MultiDict(args))
+
+
+def test_parse_search_area_defaults_radius():
+    assert parse_search_area(MultiDict({'lat': '20', 'lng': '78'})) == (20.0, 78.0, 50.0)
+    assert parse_search_area(MultiDict({'lat': '20', 'lng': '78', 'radius': '25'}), radius_type=int) == (20.0, 78.0, 25)
@@ -0,0 +1,153 @@
+# cupe-kg-backend/tests/test_tour_optimizer.py
+
+import itertools
+import numpy as np
+import pytest
+from services import tour_optimizer
+from services.tour_optimizer import improve_tour, optimize_order, solve_exact, tour_length
+from utils.geo import haversine_matrix_km
+
+VARIANTS = [('closed', True, False), ('free end', False, False), ('fixed end', False, True)]
+
+
+def random_distances(rng, count):
+    lat = rng.uniform(8, 32, count)
+    lng = rng.uniform(70, 90, count)
+    return haversine_matrix_km(lat, lng).astype(np.float32)
+
+
+def brute_force(order, distances, closed, fixed_end, free_start=False):
+    """Shortest length over every ordering the solver is allowed to pick"""
+    first = [] if free_start else [order[0]]
+    end = [order[-1]] if fixed_end and len(order) > 1 else []
+    rest = [stop for stop in order if stop not in first + end]
+    return min(tour_length(first + list(middle) + end, distances, closed)
+               for middle in itertools.permutations(rest))
+
+
+def nearest_neighbour(distances, start):
+    order = [start]
+    while len(order) < len(distances):
+        unvisited = [stop for stop in range(len(distances)) if stop not in order]
+        order.append(min(unvisited, key=lambda stop: distances[order[-1], stop]))
+    return order
+
+
+@pytest.mark.parametrize('name, closed, fixed_end', VARIANTS)
+def test_solve_exact_matches_brute_force(name, closed, fixed_end):
+    rng = np.random.default_rng(5)
+    for _ in range(40):
+        count = int(rng.integers(1, 8))
+        distances = random_distances(rng, count)
+        if count > 2 and rng.random() < 0.3:
+            # Missing legs are allowed and must be avoided when possible
+            distances[1, 2] = distances[2, 1] = np.inf
+        order = [int(stop) for stop in rng.permutation(count)]
+
+        result = solve_exact(order, distances, closed=closed, fixed_end=fixed_end)
+        assert sorted(result.order) == sorted(order)
+        assert result.order[0] == order[0]
+        if fixed_end:
+            assert result.order[-1] == order[-1]
+        finite = np.where(np.isfinite(distances), distances, 1e12)
+        assert tour_length(result.order, finite, closed) == pytest.approx(
+            brute_force(order, finite, closed, fixed_end), rel=1e-5)
+        assert result.exact
+
+
+@pytest.mark.parametrize('name, closed, fixed_end', VARIANTS)
+def test_improve_tour_keeps_constraints_and_never_gets_longer(name, closed, fixed_end):
+    rng = np.random.default_rng(3)
+    for _ in range(30):
+        count = int(rng.integers(3, 16))
+        distances = random_distances(rng, count)
+        order = nearest_neighbour(distances, 0)
+        if fixed_end:
+            order.remove(count - 1)
+            order.append(count - 1)
+
+        result = improve_tour(order, distances, closed=closed, fixed_end=fixed_end, time_budget_ms=1000)
+        assert sorted(result.order) == list(range(count))
+        assert result.order[0] == order[0]
+        if fixed_end:
+            assert result.order[-1] == order[-1]
+        assert result.final_length == pytest.approx(tour_length(result.order, distances, closed), rel=1e-5)
+        assert result.final_length <= result.initial_length + 1e-3
+        if count <= 7:
+            # Local search is not exact, but on tiny tours it stays close to the optimum
+            assert result.final_length <= 1.2 * brute_force(order, distances, closed, fixed_end) + 1e-3
+
+
+def test_free_start_matches_brute_force_over_every_first_stop():
+    rng = np.random.default_rng(9)
+    for _ in range(30):
+        count = int(rng.integers(2, 8))
+        distances = random_distances(rng, count)
+        order = list(range(count))
+
+        result = optimize_order(order, distances, free_start=True)
+        assert sorted(result.order) == order
+        assert result.exact
+        assert result.final_length == pytest.approx(tour_length(result.order, distances), rel=1e-5)
+        assert result.initial_length == pytest.approx(tour_length(order, distances), rel=1e-5)
+        assert result.final_length == pytest.approx(brute_force(order, distances, False, False, free_start=True),
+                                                    rel=1e-5)
+
+
+def test_free_start_is_ignored_for_round_trips():
+    distances = random_distances(np.random.default_rng(1), 6)
+    assert optimize_order(list(range(6)), distances, closed=True, free_start=True).order[0] == 0
+
+
+def test_optimize_order_falls_back_to_local_search_above_exact_limit(monkeypatch):
+    monkeypatch.setattr(tour_optimizer.Config, 'EXACT_ROUTE_MAX_STOPS', 5)
+    distances = random_distances(np.random.default_rng(2), 9)
+    order = nearest_neighbour(distances, 0)
+    assert optimize_order(order[:5], distances).exact
+    assert not optimize_order(order, distances).exact
+
+
+def test_metrics_with_missing_distance_serialize_as_json():
+    import json
+    from models.route import Route
+
+    inf = np.inf
+    distances = np.array([[0, 1, inf], [1, 0, 2], [inf, 2, 0]])
+    metrics = optimize_order([0, 2, 1], distances).to_metrics()
+    assert metrics['initialLengthKm'] is None
+    assert metrics['improvementPercent'] is None
+    assert metrics['optimizedLengthKm'] == 3.0
+    route = Route(id='r', name='R', description='', color='#000', metrics=metrics)
+    json.dumps(route.to_dict(), allow_nan=False)
+
+
+def test_metrics_report_lengths_and_improvement():
+    distances = random_distances(np.random.default_rng(4), 7)
+    result = optimize_order(nearest_neighbour(distances, 0)[::-1], distances)
+    metrics = result.to_metrics()
+    assert metrics['initialLengthKm'] == round(result.initial_length, 1)
+    assert metrics['optimizedLengthKm'] == round(result.final_length, 1)
+    assert metrics['improvementPercent'] == round(100 * (1 - result.final_length / result.initial_length), 1)
+    assert metrics['optimal'] and not metrics['roundTrip']
+
+
+def test_free_start_at_the_stop_limit_is_solved_exactly(monkeypatch):
+    monkeypatch.setattr(tour_optimizer.Config, 'EXACT_ROUTE_MAX_STOPS', 6)
+    distances = random_distances(np.random.default_rng(6), 7)
+    at_limit = optimize_order(list(range(6)), distances, free_start=True)
+    assert at_limit.exact
+    assert at_limit.final_length == pytest.approx(
+        brute_force(list(range(6)), distances, False, False, free_start=True), rel=1e-5)
+    assert not optimize_order(list(range(7)), distances, free_start=True).exact
+
+
+def test_exact_stop_limit_is_capped():
+    import os
+    import subprocess
+    import sys
+
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, '-c', 'from config import Config; print(Config.EXACT_ROUTE_MAX_STOPS)'],
+                            cwd=backend, env={**os.environ, 'EXACT_ROUTE_MAX_STOPS': '40'},
+                            capture_output=True, text=True, check=True).stdout
+    assert output.strip() == '16'
@@ -0,0 +1,58 @@
+# cupe-kg-backend/tests/test_travel_matrix.py
+
+import os
+import numpy as np
+import pytest
+from models.location import Location
+from services import travel_matrix
+from services.location_columns import LocationColumns
+
+
+def build_columns(count):
+    return LocationColumns.build([
+        Location.from_dict({'id': f'loc{i}', 'name': f'Loc {i}',
+                            'coordinates': {'lat': 10.0 + i, 'lng': 75.0 + 0.5 * i}})
+        for i in range(count)
+    ])
+
+
+def test_written_matrix_matches_in_memory_distances(tmp_path):
+    columns = build_columns(7)
+    sizes = travel_matrix.write_matrices(columns, str(tmp_path), 'v1', block_rows=3)
+    assert set(sizes) == {travel_matrix.DISTANCE_FILE, travel_matrix.MANIFEST_FILE}
+    assert sorted(os.listdir(tmp_path)) == sorted(sizes)
+
+    store = travel_matrix.open_matrices(str(tmp_path), 'v1', len(columns))
+    rows = np.array([4, 0, 6])
+    np.testing.assert_allclose(store.distances(rows), columns.distance_submatrix(rows), rtol=1e-5)
+
+
+def test_stale_matrices_are_ignored(tmp_path):
+    columns = build_columns(4)
+    travel_matrix.write_matrices(columns, str(tmp_path), 'v1')
+    assert travel_matrix.open_matrices(str(tmp_path), 'v2', len(columns)) is None
+    assert travel_matrix.open_matrices(str(tmp_path), 'v1', len(columns) + 1) is None
+
+
+def test_rebuild_leaves_mapped_matrix_readable(tmp_path):
+    travel_matrix.write_matrices(build_columns(4), str(tmp_path), 'v1')
+    old = travel_matrix.open_matrices(str(tmp_path), 'v1', 4)
+    before = np.array(old.distance)
+
+    travel_matrix.write_matrices(build_columns(6), str(tmp_path), 'v2')
+    np.testing.assert_array_equal(old.distance, before)
+    assert travel_matrix.open_matrices(str(tmp_path), 'v2', 6) is not None
+
+
+def test_failed_build_keeps_previous_matrices(tmp_path, monkeypatch):
+    columns = build_columns(4)
+    travel_matrix.write_matrices(columns, str(tmp_path), 'v1')
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(travel_matrix, 'haversine_matrix_km', fail)
+    with pytest.raises(RuntimeError):
+        travel_matrix.write_matrices(columns, str(tmp_path), 'v2')
+    assert sorted(os.listdir(tmp_path)) == [travel_matrix.DISTANCE_FILE, travel_matrix.MANIFEST_FILE]
+    assert travel_matrix.open_matrices(str(tmp_path), 'v1', len(columns)) is not None
@@ -0,0 +1,112 @@
+# cupe-kg-backend/utils/compression.py
+
+"""
+Response compression for CuPe-KG
+Negotiates brotli (when the brotli package is installed) or gzip from Accept-Encoding,
+and keeps precompressed bodies for responses that only change with the dataset
+"""
+
+import gzip
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from flask import request
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:
+    # Brotli is optional; without it only gzip is offered
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/plain', 'text/html')
+
+
+def available_encodings() -> List[str]:
+    """Supported content codings, most preferred first"""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def negotiate_encoding() -> Optional[str]:
+    """Best content coding the current request accepts, or None for identity"""
+    return request.accept_encodings.best_match(available_encodings())
+
+
+def compress(body: bytes, encoding: str, best: bool = False) -> bytes:
+    """
+    Compress body with the given coding. best trades time for size and is meant for
+    bodies that are compressed once and served many times.
+    """
+    if encoding == 'br':
+        return brotli.compress(body, quality=11 if best else Config.BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=9 if best else Config.GZIP_LEVEL)
+
+
+def is_compressible(response) -> bool:
+    return (response.status_code == 200
+            and response.mimetype in COMPRESSIBLE_MIMETYPES
+            and not response.is_streamed
+            and 'Content-Encoding' not in response.headers)
+
+
+def compress_response(response, encoding: str, best: bool = False):
+    """Compress a buffered response in place if it is large enough to benefit"""
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    if len(body) < Config.COMPRESSION_MIN_SIZE:
+        return response
+    response.set_data(compress(body, encoding, best))
+    response.headers['Content-Encoding'] = encoding
+    # The encoded bytes are a distinct representation and need their own validator
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak)
+    return response
+
+
+class PrecompressedCache:
+    """
+    Bounded LRU of compressed responses keyed by ETag. The ETag already covers the
+    path, query, dataset version and content coding, so a new dataset version simply
+    stops hitting old entries, which age out.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Tuple[bytes, List[Tuple[str, str]]]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag: str) -> Optional[Tuple[bytes, List[Tuple[str, str]]]]:
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is not None:
+                self._entries.move_to_end(etag)
+            return entry
+
+    def put(self, etag: str, response):
+        entry = (response.get_data(), response.headers.to_wsgi_list())
+        with self._lock:
+            self._entries[etag] = entry
+            self._entries.move_to_end(etag)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+precompressed_responses = PrecompressedCache(Config.PRECOMPRESSED_CACHE_SIZE)
+
+
+def init_compression(app):
+    """Compress every eligible buffered response on the fly (conditional_get views are already encoded)"""
+    @app.after_request
+    def compress_after_request(response):
+        if not is_compressible(response):
+            return response
+        encoding = negotiate_encoding()
+        if encoding:
+            compress_response(response, encoding)
+        else:
+            response.vary.add('Accept-Encoding')
+        return response
@@ -0,0 +1,98 @@
+# cupe-kg-backend/utils/geo.py
+
+"""
+Coordinate normalization and vectorized great-circle distance helpers for CuPe-KG
+"""
+
+import math
+from typing import Iterable, Optional, Tuple
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+
+
+def to_latlng(value) -> Optional[Tuple[float, float]]:
+    """
+    (lat, lng) floats from any coordinate format used in the app: a Coordinates object,
+    a {'lat', 'lng'} dict, a [lat, lng] sequence, or a Location / dict carrying one of
+    those under 'coordinates'. Returns None when no usable pair can be read.
+    """
+    if hasattr(value, 'coordinates'):
+        value = value.coordinates
+    elif isinstance(value, dict) and 'coordinates' in value:
+        value = value['coordinates']
+
+    try:
+        if isinstance(value, dict):
+            lat, lng = value['lat'], value['lng']
+        elif hasattr(value, 'lat') and hasattr(value, 'lng'):
+            lat, lng = value.lat, value.lng
+        elif isinstance(value, (list, tuple)) and len(value) >= 2:
+            lat, lng = value[0], value[1]
+        else:
+            return None
+        lat, lng = float(lat), float(lng)
+    except (KeyError, TypeError, ValueError):
+        return None
+    if math.isnan(lat) or math.isnan(lng):
+        return None
+    return lat, lng
+
+
+def parse_search_area(args, default_radius_km=50, radius_type=float) -> Tuple[float, float, float]:
+    """
+    lat, lng and radius (km, read with radius_type) of a nearby search from request args.
+    Coordinates must be finite and in range and the radius finite and positive; raises
+    ValueError with a client-facing message otherwise.
+    """
+    try:
+        lat = float(args.get('lat'))
+        lng = float(args.get('lng'))
+        radius_km = radius_type(args.get('radius', default_radius_km))
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError("Invalid latitude, longitude or radius")
+    if not (math.isfinite(lat) and math.isfinite(lng)) or abs(lat) > 90 or abs(lng) > 180:
+        raise ValueError("Invalid latitude or longitude")
+    if not (math.isfinite(radius_km) and radius_km > 0):
+        raise ValueError("radius must be a positive number of kilometres")
+    return lat, lng, radius_km
+
+
+def coordinate_arrays(values: Iterable) -> Tuple[np.ndarray, np.ndarray]:
+    """float64 lat and lng arrays for a sequence of coordinate-bearing values (NaN where unusable)"""
+    pairs = [to_latlng(value) or (np.nan, np.nan) for value in values]
+    points = np.array(pairs, dtype=np.float64).reshape(-1, 2)
+    return points[:, 0].copy(), points[:, 1].copy()
+
+
+def haversine_km(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Haversine distance in kilometres from one point to every point in lats/lngs"""
+    lat_rad = np.radians(lat)
+    lats_rad = np.radians(lats)
+    delta_lat = lats_rad - lat_rad
+    delta_lng = np.radians(lngs) - np.radians(lng)
+
+    a = (np.sin(delta_lat / 2) ** 2 +
+         np.cos(lat_rad) * np.cos(lats_rad) * np.sin(delta_lng / 2) ** 2)
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def haversine_matrix_km(lats_a: np.ndarray, lngs_a: np.ndarray,
+                        lats_b: Optional[np.ndarray] = None, lngs_b: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Haversine distances in kilometres between every point of a (rows) and every point of
+    b (columns); b defaults to a, giving the symmetric pairwise matrix
+    """
+    if lats_b is None:
+        lats_b, lngs_b = lats_a, lngs_a
+    return haversine_km(np.asarray(lats_a)[:, None], np.asarray(lngs_a)[:, None],
+                        np.asarray(lats_b)[None, :], np.asarray(lngs_b)[None, :])
+
+
+def distance_km(point_a, point_b) -> float:
+    """Haversine distance between two coordinate-bearing values (see to_latlng); inf if either is unusable"""
+    a = to_latlng(point_a)
+    b = to_latlng(point_b)
+    if a is None or b is None:
+        return float('inf')
+    return float(haversine_km(a[0], a[1], b[0], b[1]))
@@ -0,0 +1,15 @@
+# cupe-kg-backend/utils/helpers.py
+
+"""
+Small shared helpers for CuPe-KG
+"""
+
+import hashlib
+
+
+def content_hash(chunks) -> str:
+    """Short hex digest over an iterable of bytes, used as a dataset version"""
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.hexdigest()[:16]
@@ -0,0 +1,84 @@
+# cupe-kg-backend/utils/http_cache.py
+
+"""
+Conditional GET support for read endpoints whose output only changes with the dataset
+"""
+
+import hashlib
+from functools import wraps
+from typing import Callable, Optional, Sequence
+from flask import Response, request, make_response
+from config import Config
+from utils.compression import negotiate_encoding, compress_response, precompressed_responses
+
+
+def make_etag(version: str, vary: Sequence[str] = ()) -> str:
+    """
+    Strong (unquoted) ETag for the current request under a dataset version; request headers
+    listed in vary select between representations and are part of the tag
+    """
+    key = ':'.join([version, request.full_path] + [request.headers.get(header, '') for header in vary])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+
+
+def _not_modified(etag: str, max_age: int, vary: Sequence[str]) -> Response:
+    response = make_response('', 304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f"public, max-age={max_age}"
+    response.vary.update(vary)
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def conditional_get(version_loader: Callable[[], Optional[str]], max_age: Optional[int] = None,
+                    vary: Sequence[str] = ()):
+    """
+    Decorate a GET view whose response is fully determined by its URL, the vary request
+    headers and a dataset version.
+    Successful responses carry a strong ETag and Cache-Control; compressed ones get the
+    content coding appended to the tag (see compress_response), so the tag always matches
+    the bytes sent. A matching If-None-Match is answered with 304, before the view runs
+    whenever the tag identifies the negotiated representation. Buffered responses are
+    compressed once per URL, version and content coding and then served from
+    precompressed_responses without running the view. Without a version nothing is cached.
+    """
+    if max_age is None:
+        max_age = Config.HTTP_CACHE_MAX_AGE
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version = version_loader()
+            if version is None:
+                return view(*args, **kwargs)
+
+            encoding = negotiate_encoding()
+            etag = make_etag(version, vary)
+            # A plain tag under a negotiated coding is only known to match once the view
+            # has run: the body may be too small to compress
+            selected = f"{etag}-{encoding}" if encoding else etag
+            if request.if_none_match.contains_weak(selected):
+                return _not_modified(selected, max_age, vary)
+            if encoding:
+                cached = precompressed_responses.get(selected)
+                if cached is not None:
+                    body, headers = cached
+                    return Response(body, headers=headers)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = f"public, max-age={max_age}"
+            response.vary.update(vary)
+            response.vary.add('Accept-Encoding')
+            if encoding and not response.is_streamed:
+                compress_response(response, encoding, best=True)
+                if 'Content-Encoding' in response.headers:
+                    precompressed_responses.put(selected, response)
+            sent_etag = response.get_etag()[0]
+            if sent_etag != selected and request.if_none_match.contains_weak(sent_etag):
+                return _not_modified(sent_etag, max_age, vary)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,69 @@
+# cupe-kg-backend/utils/pagination.py
+
+"""
+limit/cursor pagination and fields= projection parameters for list endpoints
+"""
+
+import base64
+import binascii
+from typing import Optional, Sequence, Tuple
+from config import Config
+
+
+def encode_cursor(offset: int) -> str:
+    """Opaque cursor pointing at the item at offset"""
+    return base64.urlsafe_b64encode(f"o:{offset}".encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> int:
+    """Offset encoded in a cursor from encode_cursor; raises ValueError if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        prefix, offset = base64.urlsafe_b64decode(padded.encode('ascii')).decode('ascii').split(':', 1)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if prefix != 'o' or not offset.isdigit():
+        raise ValueError("Invalid cursor")
+    return int(offset)
+
+
+def paginate(items: Sequence, offset: int, limit: Optional[int]) -> Tuple[Sequence, Optional[int]]:
+    """Slice one page out of items; returns the page and the offset of the next one (or None)"""
+    if limit is None:
+        return items[offset:], None
+    end = offset + limit
+    return items[offset:end], end if end < len(items) else None
+
+
+def parse_page_args(args, allowed_fields: Sequence[str]) -> Tuple[int, Optional[int], Optional[Tuple[str, ...]]]:
+    """
+    Read offset (from cursor), limit and fields from request args or a JSON body.
+    Without limit every remaining item is returned; without fields every field is.
+    A projection always includes 'id' and is returned in canonical order ('id' first, then
+    sorted), so equivalent requests share cached encodings. Raises ValueError with a
+    client-facing message.
+    """
+    offset = decode_cursor(str(args['cursor'])) if args.get('cursor') else 0
+
+    limit = None
+    if args.get('limit') not in (None, ''):
+        try:
+            limit = int(args['limit'])
+        except (TypeError, ValueError):
+            raise ValueError("limit must be an integer")
+        if limit < 1 or limit > Config.MAX_PAGE_LIMIT:
+            raise ValueError(f"limit must be between 1 and {Config.MAX_PAGE_LIMIT}")
+
+    fields = None
+    if args.get('fields'):
+        # Comma-separated in a query string, or a list in a JSON body
+        requested = args['fields']
+        if isinstance(requested, str):
+            requested = requested.split(',')
+        requested = [str(name).strip() for name in requested if str(name).strip()]
+        unknown = [name for name in requested if name not in allowed_fields]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        fields = ('id',) + tuple(sorted(set(requested) - {'id'}))
+
+    return offset, limit, fields